@@ -0,0 +1,304 @@
+# api_server.py
+"""
+Long-running asyncio JSON service over the analysis engine.
+
+    python api_server.py --port 8080 --workers 4
+
+Endpoints (POST a birth record as in bulk_analysis.py: birth_date,
+birth_time, optional utc_offset, latitude/longitude or birth_city):
+    POST /analysis     full_analysis report
+    POST /divisional   Shodashvarga charts; optional "division", e.g. "D9"
+    POST /dashas       current dasha plus periods; optional "on_date"
+                       ("YYYY-MM-DD") and "depth" (1-3, default 1)
+    POST /rectify      birth-time rectification around the given time;
+                       optional "window_minutes" (default 120),
+                       "step_seconds" (60), "top" (10) and "events"
+                       ([{"date", "kind", "weight"}], see charts/rectification.py)
+    GET  /health
+    GET  /metrics      Prometheus text (with --metrics); /metrics.json for JSON
+
+Rules, compiled yogas, the report cache (rules_engine/report_cache.py),
+ephemeris tables and the gazetteer are loaded once per executor worker at
+startup, from the prebuilt snapshot (rules_engine/snapshot.py) when current. Chart math runs in the executor so the event
+loop only parses requests and writes responses; responses are encoded to
+JSON in the worker too. Concurrent requests with the same endpoint and
+normalized body share one computation, and at most --max-inflight distinct
+computations are queued at a time.
+
+Without pyswisseph or built Chebyshev tables, /analysis falls back to the
+demo positions of run_analysis.py, so the service runs fully offline.
+Service.handle() answers a request without a socket, for local testing.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from config import ENGINE_SNAPSHOT_PATH
+from bulk_analysis import parse_birth_record
+from charts.chart_state import ChartBatch
+from charts.ephemeris import compute_positions_batch, available_backend
+from charts.rectification import rectify
+from charts.vargas import vargas_to_dict, BODIES, SHODASHVARGA
+from rules_engine.dashas import Dashas
+from run_analysis import compute_planet_positions
+from utils import metrics
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_RECTIFY_MINUTES = 12 * 60
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Per-worker state set up by warm()
+_analysis = None
+
+
+class ServiceError(Exception):
+    """An error with the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def warm(data_path="data", cache_db=None, collect_metrics=False):
+    """Executor initializer: load rules, report cache, ephemeris tables and gazetteer once."""
+    global _analysis
+    if collect_metrics:
+        metrics.enable()
+    from rules_engine.analysis import AstrologyAnalysis
+    from rules_engine.report_cache import ReportCache
+    from rules_engine.snapshot import load_snapshot
+    from utils.gazetteer import get_gazetteer
+    load_snapshot(ENGINE_SNAPSHOT_PATH, data_path)
+    _analysis = AstrologyAnalysis(data_path=data_path, cache=ReportCache(data_path, sqlite_path=cache_db))
+    available_backend()
+    get_gazetteer()
+
+
+def _chart(birth, latitude, longitude):
+    """ChartState for one birth, or None when no ephemeris backend is available."""
+    if available_backend() is None:
+        return None
+    return ChartBatch.from_positions(compute_positions_batch([birth], latitude, longitude))[0]
+
+
+def compute(endpoint, body):
+    """
+    Worker entry point: run one endpoint and return (status, JSON text,
+    metrics recorded since the last call or None).
+    Module-level so process pools can pickle it.
+    """
+    status, text = _compute(endpoint, body)
+    return status, text, metrics.drain() if metrics.enabled() else None
+
+
+def _compute(endpoint, body):
+    if _analysis is None:
+        warm()
+    try:
+        birth, latitude, longitude = parse_birth_record(body)
+        chart = _chart(birth, latitude, longitude)
+        if endpoint == "analysis":
+            result = _full_analysis(birth, latitude, longitude, chart)
+        elif endpoint == "divisional":
+            result = _divisional(chart, body.get("division"))
+        elif endpoint == "rectify":
+            result = _rectify(birth, latitude, longitude, body)
+        else:
+            result = _dashas(birth, chart, body.get("on_date"), int(body.get("depth", 1)))
+    except ServiceError as e:
+        return e.status, json.dumps({"error": str(e)})
+    except (KeyError, ValueError, TypeError) as e:
+        return 400, json.dumps({"error": f"{type(e).__name__}: {e}"})
+    except Exception as e:
+        # swisseph.Error (e.g. Placidus inside the polar circle), RuntimeError, ...
+        return 500, json.dumps({"error": f"{type(e).__name__}: {e}"})
+    return 200, json.dumps(result, default=str)
+
+
+def _full_analysis(birth, latitude, longitude, chart):
+    if chart is None:
+        planets_in_houses, planets_with_signs = compute_planet_positions(birth, latitude, longitude)
+        _analysis.set_birth(birth)
+        return _analysis.full_analysis(planets_in_houses, planets_with_signs)
+    planets_in_houses, planets_with_signs = chart.to_dicts()
+    longitudes = chart.planet_longitudes()
+    _analysis.set_birth(birth, moon_longitude=longitudes["Moon"])
+    return _analysis.full_analysis(planets_in_houses, planets_with_signs, longitudes)
+
+
+def _divisional(chart, division=None):
+    if chart is None:
+        raise ServiceError(503, "Divisional charts need an ephemeris backend")
+    if division is not None and division not in SHODASHVARGA:
+        raise ValueError(f"{division} not supported")
+    charts = vargas_to_dict(*chart.vargas, bodies=BODIES)
+    return {division: charts[division]} if division else charts
+
+
+def _dashas(birth, chart, on_date=None, depth=1):
+    if not 1 <= depth <= 3:
+        raise ValueError("depth must be 1-3")
+    moon = None if chart is None else chart.planet_longitudes()["Moon"]
+    dashas = Dashas(birth_date=birth, moon_longitude=moon)
+    when = datetime.strptime(on_date, "%Y-%m-%d") if on_date else None
+    return {
+        "current": dashas.get_current_dasha(when),
+        "periods": [{"lords": p.lords, "start": p.start.date(), "end": p.end.date()}
+                    for p in dashas.iter_periods(depth=depth)],
+    }
+
+
+def _rectify(birth, latitude, longitude, body):
+    if available_backend() is None:
+        raise ServiceError(503, "Rectification needs an ephemeris backend")
+    window = float(body.get("window_minutes", 120))
+    step = float(body.get("step_seconds", 60))
+    if not 0 < window <= MAX_RECTIFY_MINUTES or step < 1:
+        raise ValueError(f"window_minutes must be 0-{MAX_RECTIFY_MINUTES} and step_seconds at least 1")
+    return rectify(birth, latitude, longitude, window_minutes=window, step_seconds=step,
+                   events=body.get("events", ()), top=int(body.get("top", 10)))
+
+
+class Service:
+    """
+    Request router with coalescing of identical in-flight computations.
+    executor: a ProcessPoolExecutor whose workers ran warm(). Not a thread
+    pool: _full_analysis points each worker's shared _analysis at the
+    request's birth with set_birth, so concurrent threads would race.
+    """
+    ENDPOINTS = {"/analysis": "analysis", "/divisional": "divisional", "/dashas": "dashas",
+                 "/rectify": "rectify"}
+
+    def __init__(self, executor, max_inflight=256):
+        self.executor = executor
+        self.inflight = {}     # (endpoint, normalized body) -> asyncio.Future
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.stats = {"requests": 0, "computations": 0, "coalesced": 0}
+
+    async def handle(self, method, path, body=b""):
+        """Answer one request; returns (status, JSON text)."""
+        self.stats["requests"] += 1
+        if path == "/health":
+            return 200, json.dumps({"status": "ok", "backend": available_backend(), **self.stats})
+        if path == "/metrics":
+            return 200, metrics.prometheus_text()
+        if path == "/metrics.json":
+            return 200, json.dumps(metrics.snapshot())
+        endpoint = self.ENDPOINTS.get(path)
+        if endpoint is None:
+            return 404, json.dumps({"error": f"Unknown path {path}"})
+        if method != "POST":
+            return 405, json.dumps({"error": "Use POST"})
+        try:
+            params = json.loads(body or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("Body must be a JSON object")
+        except ValueError as e:
+            return 400, json.dumps({"error": f"Invalid JSON: {e}"})
+
+        key = (endpoint, json.dumps(params, sort_keys=True))
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            async with self.slots:
+                self.stats["computations"] += 1
+                with metrics.stage("request", endpoint=endpoint):
+                    status, text, delta = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, compute, endpoint, params)
+            metrics.merge(delta)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # a crashed worker or broken pool still gets an answer
+            status, text = 500, json.dumps({"error": f"{type(e).__name__}: {e}"})
+        finally:
+            del self.inflight[key]
+        metrics.incr("requests_total", endpoint=endpoint, status=status)
+        future.set_result((status, text))
+        return status, text
+
+    async def serve_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive and Content-Length bodies."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                path = path.split("?")[0]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, text = 413, json.dumps({"error": "Body too large"})
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, text = await self.handle(method, path, body)
+                    keep_alive = (headers.get("connection", "").lower() != "close"
+                                  and version == "HTTP/1.1")
+                payload = text.encode("utf-8")
+                content_type = "text/plain; version=0.0.4" if path == "/metrics" else "application/json"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8080, workers=None, data_path="data", max_inflight=256,
+                cache_db=None, collect_metrics=False):
+    workers = workers or os.cpu_count() or 1
+    if collect_metrics:
+        metrics.enable()
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm,
+                             initargs=(data_path, cache_db, collect_metrics)) as executor:
+        # Start every worker now so the first requests do not pay for warm-up
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(executor, os.getpid)
+                               for _ in range(workers)))
+        service = Service(executor, max_inflight=max_inflight)
+        server = await asyncio.start_server(service.serve_connection, host, port)
+        print(f"Serving on http://{host}:{port} with {workers} workers")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve full_analysis, divisional charts and dashas over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, help="executor processes (default: all cores)")
+    parser.add_argument("--max-inflight", type=int, default=256, help="distinct computations queued at once")
+    parser.add_argument("--data-path", default="data")
+    parser.add_argument("--cache-db", help="SQLite file for reports shared by all workers")
+    parser.add_argument("--metrics", action="store_true", help="collect stage timers and counters for /metrics")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.workers, args.data_path, args.max_inflight, args.cache_db,
+                      args.metrics))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# AstroAgent/benchmarks/llm_polish.py
+"""
+Offline throughput and latency of LLMLayer against the deterministic
+LocalBackend (rules_engine/llm_backends.py).
+
+    python -m benchmarks.llm_polish --reports 2000 --latency 0.05 --batch-size 32 --concurrency 4
+
+Reports are rendered from seeded synthetic charts, so the share of repeated
+texts (and therefore the cache hit ratio) matches real traffic. Each report
+is submitted as its own concurrent request. Prints JSON with reports/sec,
+per-report latency percentiles, model calls and cache hits, plus the
+time to first token of a streamed report.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_charts
+
+
+def render_reports(n, seed=0, data_path="data"):
+    """n report texts (without the dasha section) from synthetic charts."""
+    from rules_engine.analysis import AstrologyAnalysis
+    from rules_engine.explanation_layer import ExplanationLayer
+
+    analysis = AstrologyAnalysis(data_path=data_path)
+    explainer = ExplanationLayer()
+    _, batch = generate_charts(n, seed)
+    texts = []
+    for i in range(n):
+        planets_in_houses, planets_with_signs = batch[i].to_dicts()
+        texts.append(explainer.generate_full_report(analysis.placement_report(planets_in_houses, planets_with_signs)))
+    return texts
+
+
+async def _measure(llm, texts):
+    latencies = np.zeros(len(texts))
+
+    async def one(i):
+        start = time.perf_counter()
+        await llm.apolish(texts[i])
+        latencies[i] = time.perf_counter() - start
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(len(texts))))
+    wall = time.perf_counter() - started
+
+    llm._cache.clear()
+    start = time.perf_counter()
+    first_token = None
+    async for _ in llm.stream_polish(texts[0]):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+    return wall, latencies, first_token
+
+
+def run(reports=1000, latency=0.05, token_latency=0.0, batch_size=16, concurrency=4, max_wait=0.005, seed=0):
+    from rules_engine.llm_backends import LocalBackend
+    from rules_engine.llm_layer import LLMLayer
+
+    texts = render_reports(reports, seed)
+    backend = LocalBackend(latency=latency, token_latency=token_latency, max_batch_size=batch_size)
+    llm = LLMLayer(backend, max_wait=max_wait, concurrency=concurrency)
+    wall, latencies, first_token = asyncio.run(_measure(llm, texts))
+    ms = latencies * 1000.0
+    return {
+        "reports": reports,
+        "distinct_reports": len(set(texts)),
+        "reports_per_sec": reports / wall,
+        "latency_ms": {"p50": float(np.percentile(ms, 50)), "p90": float(np.percentile(ms, 90)),
+                       "p99": float(np.percentile(ms, 99)), "max": float(ms.max())},
+        "model_calls": backend.calls,
+        "cache_hits": llm.stats["hits"],
+        "coalesced": llm.stats["coalesced"],
+        "first_token_ms": first_token * 1000.0,
+        "settings": {"latency": latency, "token_latency": token_latency, "batch_size": batch_size,
+                     "concurrency": concurrency, "max_wait": max_wait, "seed": seed},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure LLMLayer throughput against the offline backend.")
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per model call")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="simulated seconds per streamed token")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-wait", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.reports, args.latency, args.token_latency, args.batch_size, args.concurrency,
+                         args.max_wait, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
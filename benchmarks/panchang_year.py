@@ -0,0 +1,77 @@
+# AstroAgent/benchmarks/panchang_year.py
+"""
+Time a year of daily panchang (charts/panchang.py) for many locations.
+
+    python -m benchmarks.panchang_year --cities 5000 --year 2025 --chunk 1000 -o panchang.npz
+
+Locations are seeded random points between 60°S and 60°N, or the gazetteer
+cities with --gazetteer. Locations are processed --chunk at a time so
+memory stays bounded; -o saves the int8 limbs and float32 sunrise/sunset
+(hours UT after each date's midnight) for every location and day.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+
+def locations(cities, seed=0, gazetteer=False):
+    if gazetteer:
+        from utils.gazetteer import get_gazetteer
+        entries = get_gazetteer().cities[:cities] if cities else get_gazetteer().cities
+        return (np.array([c.latitude for c in entries]), np.array([c.longitude for c in entries]))
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-60.0, 60.0, cities), rng.uniform(-180.0, 180.0, cities)
+
+
+def run(cities=5000, year=2025, chunk=1000, seed=0, gazetteer=False, output=None):
+    from charts.ephemeris import julian_days
+    from charts.panchang import daily_panchang
+
+    latitudes, longitudes = locations(cities, seed, gazetteer)
+    start = np.datetime64(f"{year}-01-01", "D")
+    days = int((np.datetime64(f"{year + 1}-01-01", "D") - start).astype(int))
+    midnight = julian_days(start + np.arange(days))
+    fields = ("tithi", "yoga", "karana", "nakshatra", "pada", "vara")
+    result = {name: np.empty((len(latitudes), days), dtype=np.int8) for name in fields}
+    result["sunrise"] = np.empty((len(latitudes), days), dtype=np.float32)
+    result["sunset"] = np.empty((len(latitudes), days), dtype=np.float32)
+
+    started = time.perf_counter()
+    for lo in range(0, len(latitudes), chunk):
+        hi = min(lo + chunk, len(latitudes))
+        panchang = daily_panchang(str(start), days, latitudes[lo:hi], longitudes[lo:hi])
+        for name in fields:
+            result[name][lo:hi] = panchang[name]
+        result["sunrise"][lo:hi] = (panchang["sunrise"] - midnight) * 24.0
+        result["sunset"][lo:hi] = (panchang["sunset"] - midnight) * 24.0
+    elapsed = time.perf_counter() - started
+
+    if output:
+        np.savez_compressed(output, latitudes=latitudes, longitudes=longitudes, **result)
+    return {
+        "locations": len(latitudes),
+        "days": days,
+        "seconds": elapsed,
+        "location_days_per_sec": len(latitudes) * days / elapsed,
+        "no_sunrise": int(np.isnan(result["sunrise"]).sum()),
+        "settings": {"year": year, "chunk": chunk, "seed": seed, "gazetteer": gazetteer},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute a year of daily panchang for many locations.")
+    parser.add_argument("--cities", type=int, default=5000)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--chunk", type=int, default=1000, help="locations per vectorized call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gazetteer", action="store_true", help="use the gazetteer cities")
+    parser.add_argument("-o", "--output", help="save the arrays to this .npz file")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.cities, args.year, args.chunk, args.seed, args.gazetteer, args.output), indent=2))
+
+
+if __name__ == "__main__":
+    main()
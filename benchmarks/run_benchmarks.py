@@ -0,0 +1,233 @@
+# AstroAgent/benchmarks/run_benchmarks.py
+"""
+Per-stage pipeline benchmark over seeded synthetic charts.
+
+    python -m benchmarks.run_benchmarks --sizes 1,1000,1000000 -o bench.json
+    python -m benchmarks.run_benchmarks --sizes 1000 --compare bench.json
+
+Stages, timed separately for every chart:
+    positions      compute_positions_batch (vectorized; per-chart time is
+                   the chunk time divided by the chunk size)
+    to_dicts       ChartState -> planets_in_houses / planets_with_signs
+    houses         AstrologyAnalysis.analyze_houses
+    strengths      AstrologyAnalysis.analyze_planet_strengths
+    aspects        AstrologyAnalysis.analyze_aspects (with exact longitudes)
+    yogas          AstrologyAnalysis.analyze_yogas
+    dashas         Dashas(...).get_current_dasha on a fixed date
+    divisional     all sixteen vargas for the chart
+    explanation    ExplanationLayer.generate_full_report
+    polish         LLMLayer.polish_report
+
+Each size runs in a fresh process, so the peak RSS reported is that size's
+own. cold_start records the median time from the first import to the first
+full_analysis report in fresh interpreters, without and with an engine
+snapshot (rules_engine/snapshot.py). Charts are processed in chunks, so memory stays bounded at 1M charts.
+Results are JSON; --compare exits with status 1 when any stage's p50,
+overall charts/sec or a cold start time is worse than the baseline by more
+than --tolerance.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic import generate_births, synthetic_positions
+
+STAGES = ("positions", "to_dicts", "houses", "strengths", "aspects", "yogas", "dashas",
+          "divisional", "explanation", "polish")
+DEFAULT_SIZES = (1, 1000, 1_000_000)
+CHUNK = 10_000
+DASHA_DATE = datetime(2025, 1, 1)  # fixed so runs are comparable
+
+
+def _percentiles(ns):
+    us = ns / 1000.0
+    return {
+        "p50_us": float(np.percentile(us, 50)),
+        "p90_us": float(np.percentile(us, 90)),
+        "p99_us": float(np.percentile(us, 99)),
+        "max_us": float(us.max()),
+        "mean_us": float(us.mean()),
+        "total_s": float(us.sum() / 1e6),
+    }
+
+
+def run_size(n, seed=0, data_path="data"):
+    """Benchmark n charts in this process; returns the result dict for one size."""
+    from charts.chart_state import ChartBatch
+    from charts.ephemeris import compute_positions_batch, available_backend
+    from charts.vargas import chart_vargas
+    from rules_engine.analysis import AstrologyAnalysis
+    from rules_engine.dashas import Dashas
+    from rules_engine.explanation_layer import ExplanationLayer
+    from rules_engine.llm_layer import LLMLayer
+
+    analysis = AstrologyAnalysis(data_path=data_path)
+    explainer = ExplanationLayer()
+    llm = LLMLayer()
+    backend = available_backend()
+    timings = {stage: np.zeros(n, dtype=np.int64) for stage in STAGES}
+    clock = time.perf_counter_ns
+
+    started = time.perf_counter()
+    for start in range(0, n, CHUNK):
+        size = min(CHUNK, n - start)
+        births = generate_births(size, seed=(seed, start))
+        t0 = clock()
+        if backend is not None:
+            positions = compute_positions_batch(births["datetimes"], births["latitudes"], births["longitudes"])
+        else:
+            positions = synthetic_positions(births, seed=(seed, start))
+        timings["positions"][start:start + size] = (clock() - t0) // size
+        batch = ChartBatch.from_positions(positions)
+        stamps = births["datetimes"].astype(datetime)
+
+        for i in range(size):
+            row = start + i
+            chart = batch[i]
+
+            t0 = clock()
+            planets_in_houses, planets_with_signs = chart.to_dicts()
+            longitudes = chart.planet_longitudes()
+            t1 = clock()
+            report = analysis.analyze_houses(planets_in_houses)
+            t2 = clock()
+            report["planet_strengths"] = analysis.analyze_planet_strengths(planets_with_signs)
+            t3 = clock()
+            report["aspects"] = analysis.analyze_aspects(planets_with_signs, longitudes)
+            t4 = clock()
+            report["yogas"] = analysis.analyze_yogas(planets_in_houses, planets_with_signs)
+            t5 = clock()
+            report["current_dasha"] = Dashas(stamps[i], moon_longitude=longitudes["Moon"]).get_current_dasha(DASHA_DATE)
+            t6 = clock()
+            chart_vargas(chart.longitudes, chart.ascendant)
+            t7 = clock()
+            text = explainer.generate_full_report(report)
+            t8 = clock()
+            llm.polish_report(text)
+            t9 = clock()
+
+            timings["to_dicts"][row] = t1 - t0
+            timings["houses"][row] = t2 - t1
+            timings["strengths"][row] = t3 - t2
+            timings["aspects"][row] = t4 - t3
+            timings["yogas"][row] = t5 - t4
+            timings["dashas"][row] = t6 - t5
+            timings["divisional"][row] = t7 - t6
+            timings["explanation"][row] = t8 - t7
+            timings["polish"][row] = t9 - t8
+    wall = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # kilobytes on Linux
+    return {
+        "charts": n,
+        "backend": backend or "synthetic",
+        "wall_s": wall,
+        "charts_per_sec": n / wall if wall else None,
+        "peak_rss_mb": peak_kb / 1024.0,
+        "stages": {stage: _percentiles(timings[stage]) for stage in STAGES},
+    }
+
+
+def _metadata(seed):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+    }
+
+
+def run(sizes=DEFAULT_SIZES, seed=0, data_path="data", cold_start_runs=5):
+    """Every size in its own spawned process; returns the full results document."""
+    from rules_engine.snapshot import measure_cold_start
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for n in sizes:
+        with context.Pool(1) as pool:
+            results[str(n)] = pool.apply(run_size, (n, seed, data_path))
+        print(f"{n:>9} charts: {results[str(n)]['charts_per_sec']:.1f} charts/s, "
+              f"peak {results[str(n)]['peak_rss_mb']:.0f} MB", file=sys.stderr)
+    document = {"meta": _metadata(seed), "results": results}
+    if cold_start_runs:
+        document["cold_start"] = measure_cold_start(data_path, runs=cold_start_runs)
+        print(f"cold start: {document['cold_start']['no_snapshot']['import_to_report_s'] * 1000:.1f} ms, "
+              f"{document['cold_start']['snapshot']['import_to_report_s'] * 1000:.1f} ms with snapshot",
+              file=sys.stderr)
+    return document
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Regressions of current against baseline, for sizes present in both:
+    a list of (size, metric, baseline value, current value).
+    """
+    regressions = []
+    for size, result in current["results"].items():
+        base = baseline["results"].get(size)
+        if base is None:
+            continue
+        if result["charts_per_sec"] < base["charts_per_sec"] * (1 - tolerance):
+            regressions.append((size, "charts_per_sec", base["charts_per_sec"], result["charts_per_sec"]))
+        for stage, stats in result["stages"].items():
+            old = base["stages"].get(stage)
+            if old and stats["p50_us"] > old["p50_us"] * (1 + tolerance):
+                regressions.append((size, f"{stage}.p50_us", old["p50_us"], stats["p50_us"]))
+    for mode, stats in current.get("cold_start", {}).items():
+        old = baseline.get("cold_start", {}).get(mode)
+        if old and stats["import_to_report_s"] > old["import_to_report_s"] * (1 + tolerance):
+            regressions.append(("cold_start", f"{mode}.import_to_report_s",
+                                old["import_to_report_s"], stats["import_to_report_s"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic charts.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated chart counts (default: 1,1000,1000000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-path", default="data")
+    parser.add_argument("-o", "--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--cold-start-runs", type=int, default=5,
+                        help="fresh interpreters per cold start measurement; 0 skips it (default: 5)")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    document = run([int(s) for s in args.sizes.split(",")], args.seed, args.data_path, args.cold_start_runs)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(document, baseline, args.tolerance)
+        for size, metric, old, new in regressions:
+            label = size if size == "cold_start" else f"{size} charts"
+            print(f"REGRESSION {label} {metric}: {old:.4f} -> {new:.4f}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
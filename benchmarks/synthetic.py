@@ -0,0 +1,113 @@
+# AstroAgent/benchmarks/synthetic.py
+"""
+Seeded generator of realistic birth records and charts for benchmarks.
+
+Births are spread uniformly over 1930-2020 (UT, minute resolution) and
+placed at gazetteer cities drawn in proportion to population, so the
+latitude mix and city-name lookups look like real traffic. The same seed
+always yields the same records.
+
+Charts come from the ephemeris when a backend is available. Otherwise
+synthetic_positions() draws longitudes with the constraints that shape real
+placements: Mercury within 28° and Venus within 47° of the Sun, and Ketu
+opposite Rahu.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from config import PLANETS
+from charts.chart_state import ChartBatch
+from charts.ephemeris import compute_positions_batch, available_backend, julian_days
+from utils.gazetteer import get_gazetteer
+
+EPOCH_START = np.datetime64("1930-01-01T00:00")
+EPOCH_END = np.datetime64("2020-12-31T23:59")
+
+_COL = {planet: i for i, planet in enumerate(PLANETS)}
+
+
+def _cities():
+    cities = get_gazetteer().cities
+    weights = np.array([max(c.population, 1) for c in cities], dtype=np.float64)
+    return cities, weights / weights.sum()
+
+
+def generate_births(n, seed=0):
+    """
+    n births as arrays: datetimes (datetime64[m], UT), latitudes, longitudes,
+    and city (index into the gazetteer's cities).
+    """
+    rng = np.random.default_rng(seed)
+    cities, weights = _cities()
+    span = int((EPOCH_END - EPOCH_START) / np.timedelta64(1, "m"))
+    minutes = rng.integers(0, span, size=n)
+    city = rng.choice(len(cities), size=n, p=weights)
+    latitudes = np.array([c.latitude for c in cities])[city]
+    longitudes = np.array([c.longitude for c in cities])[city]
+    return {
+        "datetimes": EPOCH_START + minutes.astype("timedelta64[m]"),
+        "latitudes": latitudes,
+        "longitudes": longitudes,
+        "city": city,
+    }
+
+
+def iter_records(n, seed=0, chunk=100_000):
+    """
+    Birth records as dicts in the bulk_analysis.py input format, streamed in
+    chunks; half give birth_city, half explicit coordinates.
+    """
+    cities = get_gazetteer().cities
+    for start in range(0, n, chunk):
+        births = generate_births(min(chunk, n - start), seed=(seed, start))
+        stamps = births["datetimes"].astype(datetime)
+        for i, stamp in enumerate(stamps):
+            record = {
+                "id": f"synthetic-{start + i}",
+                "birth_date": stamp.strftime("%Y-%m-%d"),
+                "birth_time": stamp.strftime("%H:%M"),
+            }
+            if (start + i) % 2:
+                record["birth_city"] = cities[births["city"][i]].name
+            else:
+                record["latitude"] = float(births["latitudes"][i])
+                record["longitude"] = float(births["longitudes"][i])
+            yield record
+
+
+def synthetic_positions(births, seed=0):
+    """
+    Placeholder positions with realistic planet relationships, for machines
+    without an ephemeris backend. Same keys as compute_positions_batch.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(births["datetimes"])
+    lons = rng.uniform(0.0, 360.0, size=(n, len(PLANETS)))
+    lons[:, _COL["Mercury"]] = lons[:, _COL["Sun"]] + rng.uniform(-28.0, 28.0, n)
+    lons[:, _COL["Venus"]] = lons[:, _COL["Sun"]] + rng.uniform(-47.0, 47.0, n)
+    lons[:, _COL["Ketu"]] = lons[:, _COL["Rahu"]] + 180.0
+    lons %= 360.0
+    ascendant = rng.uniform(0.0, 360.0, n)
+    cusps = (ascendant[:, None] + 30.0 * np.arange(12)) % 360.0
+    speeds = np.ones_like(lons)
+    return {
+        "julian_day": julian_days(births["datetimes"]),
+        "longitudes": lons,
+        "speeds": speeds,
+        "signs": (lons // 30).astype(np.int8),
+        "houses": ((lons - ascendant[:, None]) % 360.0 // 30 + 1).astype(np.int8),
+        "cusps": cusps,
+        "ascendant": ascendant,
+    }
+
+
+def generate_charts(n, seed=0):
+    """(births, ChartBatch) for n synthetic births, from the ephemeris when available."""
+    births = generate_births(n, seed)
+    if available_backend() is not None:
+        positions = compute_positions_batch(births["datetimes"], births["latitudes"], births["longitudes"])
+    else:
+        positions = synthetic_positions(births, seed)
+    return births, ChartBatch.from_positions(positions)
@@ -0,0 +1,295 @@
+# bulk_analysis.py
+"""
+Batch runner: stream birth records from JSONL or CSV, run full_analysis on a
+process pool and write one JSON result per line.
+
+Each record needs birth_date ("YYYY-MM-DD") and birth_time ("HH:MM", UT
+unless utc_offset hours are given), plus latitude/longitude or birth_city.
+An "id" field is copied to the output; the input line number is used otherwise.
+
+    python bulk_analysis.py births.jsonl -o reports.jsonl --ordered \\
+        --checkpoint reports.ckpt
+
+Records are read in batches of --batch-size. At most --max-pending batches
+are in flight or waiting to be written, so memory stays bounded and reading
+pauses while workers are busy. Workers are warmed once (rule sets, compiled
+yogas, ephemeris tables, gazetteer; mapped from config.ENGINE_SNAPSHOT_PATH
+when a current snapshot exists) and compute positions for a whole batch
+in one vectorized call. Reports for repeated placements come from a
+ReportCache (per-worker LRU, plus the --cache-db SQLite file when given). With --checkpoint, progress is saved after every
+write; rerunning the same command resumes where it stopped.
+"""
+
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from config import ENGINE_SNAPSHOT_PATH
+from charts.ephemeris import compute_positions_batch, batch_to_dicts, available_backend, PLANET_INDEX
+from utils.geocode_utils import get_lat_lon
+from utils import metrics
+
+DEFAULT_BATCH_SIZE = 256
+
+# Per-process state set up by _init_worker
+_analysis = None
+
+
+def iter_records(path, fmt=None):
+    """Yield birth records (dicts) from a JSONL or CSV file, one at a time."""
+    fmt = fmt or ("csv" if str(path).lower().endswith(".csv") else "jsonl")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_batches(records, batch_size):
+    """Yield (seq, [(line_no, record), ...]) batches; seq numbers are deterministic."""
+    numbered = enumerate(records, start=1)
+    seq = 0
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        yield seq, batch
+        seq += 1
+
+
+def _init_worker(data_path, cache_db=None, collect_metrics=False, profile=False):
+    """Load everything a worker needs once, before it receives records."""
+    global _analysis
+    if collect_metrics:
+        metrics.enable()
+    if profile:
+        metrics.start_profiler()
+    from rules_engine.analysis import AstrologyAnalysis
+    from rules_engine.report_cache import ReportCache
+    from rules_engine.snapshot import load_snapshot
+    load_snapshot(ENGINE_SNAPSHOT_PATH, data_path)  # no-op when missing or stale
+    _analysis = AstrologyAnalysis(data_path=data_path, cache=ReportCache(data_path, sqlite_path=cache_db))
+    available_backend()  # opens the Chebyshev tables when present
+
+
+def parse_birth_record(record):
+    """(UT datetime, latitude, longitude) of a birth record; see the module docstring for fields."""
+    birth = datetime.strptime(f"{record['birth_date']} {record['birth_time']}", "%Y-%m-%d %H:%M")
+    offset = record.get("utc_offset")
+    if offset not in (None, ""):
+        birth -= timedelta(hours=float(offset))
+    lat, lon = record.get("latitude"), record.get("longitude")
+    if lat in (None, "") or lon in (None, ""):
+        lat, lon = get_lat_lon(record["birth_city"])
+    lat, lon = float(lat), float(lon)
+    if not -90.0 <= lat <= 90.0:
+        raise ValueError(f"latitude {lat} outside -90..90")
+    if not -180.0 <= lon <= 180.0:
+        raise ValueError(f"longitude {lon} outside -180..180")
+    return birth, lat, lon
+
+
+def _error_line(key, e):
+    return json.dumps({"id": key, "error": f"{type(e).__name__}: {e}"})
+
+
+def _batch_positions(parsed, lines):
+    """
+    [(i, key, birth, positions, row)] for parsed records. Positions come from
+    one batch call; if it fails, each record is computed alone so only the
+    records that fail (e.g. Placidus cusps inside the polar circle) get an
+    error line.
+    """
+    try:
+        positions = compute_positions_batch([p[2] for p in parsed], [p[3] for p in parsed], [p[4] for p in parsed])
+        return [(i, key, birth, positions, row) for row, (i, key, birth, _, _) in enumerate(parsed)]
+    except Exception:
+        pass
+    located = []
+    for i, key, birth, lat, lon in parsed:
+        try:
+            located.append((i, key, birth, compute_positions_batch([birth], [lat], [lon]), 0))
+        except Exception as e:
+            lines[i] = _error_line(key, e)
+    return located
+
+
+def analyze_batch(batch):
+    """
+    Worker entry point: (seq, numbered records) -> (seq, output lines,
+    metrics recorded since the last batch or None).
+    Positions for the batch are computed in one call; a bad record (invalid
+    fields, coordinates out of range, positions that cannot be computed)
+    yields an error line instead of failing the batch.
+    """
+    seq, items = batch
+    lines = [None] * len(items)
+    parsed = []
+    for i, (line_no, record) in enumerate(items):
+        key = record.get("id", line_no)
+        try:
+            parsed.append((i, key) + parse_birth_record(record))
+        except (KeyError, ValueError, TypeError) as e:
+            lines[i] = _error_line(key, e)
+
+    if parsed:
+        for i, key, birth, positions, row in _batch_positions(parsed, lines):
+            try:
+                planets_in_houses, planets_with_signs = batch_to_dicts(positions, row)
+                longitudes = dict(zip(PLANET_INDEX, positions["longitudes"][row].tolist()))
+                _analysis.set_birth(birth, moon_longitude=longitudes["Moon"])
+                report = _analysis.full_analysis(planets_in_houses, planets_with_signs, longitudes)
+                lines[i] = json.dumps({"id": key, "report": report}, default=str)
+            except Exception as e:
+                lines[i] = _error_line(key, e)
+    return seq, lines, metrics.drain() if metrics.enabled() else None
+
+
+class Checkpoint:
+    """
+    Resumable progress: the batch size, the batches already written (every
+    seq below prefix, plus the out-of-order ones in extra) and the output size
+    at that moment. Saved atomically after each write; extra never holds more
+    than --max-pending entries, so saving stays cheap on long runs.
+    """
+
+    def __init__(self, path, batch_size):
+        self.path = Path(path) if path else None
+        self.batch_size = batch_size
+        self.prefix = 0
+        self.extra = set()
+        self.output_bytes = 0
+
+    def __contains__(self, seq):
+        return seq < self.prefix or seq in self.extra
+
+    def add(self, seq):
+        self.extra.add(seq)
+        while self.prefix in self.extra:
+            self.extra.remove(self.prefix)
+            self.prefix += 1
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["batch_size"] != self.batch_size:
+            raise ValueError(f"Checkpoint was written with --batch-size {state['batch_size']}")
+        self.prefix = state["prefix"]
+        self.extra = set(state["extra"])
+        self.output_bytes = state["output_bytes"]
+        return True
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"batch_size": self.batch_size, "prefix": self.prefix,
+                       "extra": sorted(self.extra), "output_bytes": self.output_bytes}, f)
+        os.replace(tmp, self.path)
+
+
+def run(input_path, output_path, fmt=None, workers=None, batch_size=DEFAULT_BATCH_SIZE,
+        max_pending=None, ordered=False, checkpoint_path=None, data_path="data", cache_db=None,
+        metrics_path=None, profile_path=None):
+    """
+    Stream input_path through the pool into output_path. Returns the number
+    of records written by this run. metrics_path / profile_path receive the
+    merged metrics snapshot (JSON) and collapsed profiler stacks of all workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    checkpoint = Checkpoint(checkpoint_path, batch_size)
+    resumed = checkpoint.load()
+
+    out = open(output_path, "r+b" if resumed else "wb")
+    out.truncate(checkpoint.output_bytes)   # drop anything written after the last checkpoint
+    out.seek(checkpoint.output_bytes)
+
+    batches = ((seq, items) for seq, items in iter_batches(iter_records(input_path, fmt), batch_size)
+               if seq not in checkpoint)
+    pending = set()
+    finished = {}          # seq -> lines, held back only in ordered mode
+    next_seq = checkpoint.prefix
+    written = 0
+
+    def write(seq, lines):
+        nonlocal written
+        out.write(("\n".join(lines) + "\n").encode("utf-8"))
+        out.flush()
+        checkpoint.add(seq)
+        checkpoint.output_bytes = out.tell()
+        checkpoint.save()
+        written += len(lines)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_path, cache_db, bool(metrics_path or profile_path),
+                                       bool(profile_path))) as pool:
+        exhausted = False
+        while True:
+            # Backpressure: read more only while the window has room
+            while not exhausted and len(pending) + len(finished) < max_pending:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(analyze_batch, batch))
+            if not pending:
+                break
+            completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                seq, lines, delta = future.result()
+                metrics.merge(delta)
+                if ordered:
+                    finished[seq] = lines
+                else:
+                    write(seq, lines)
+            while ordered and (next_seq in finished or next_seq in checkpoint):
+                if next_seq in finished:
+                    write(next_seq, finished.pop(next_seq))
+                next_seq += 1
+
+    out.close()
+    if metrics_path:
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            json.dump(metrics.snapshot(), f, indent=2)
+    if profile_path:
+        with open(profile_path, "w", encoding="utf-8") as f:
+            f.write(metrics.collapsed_stacks() + "\n")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run full_analysis over a file of birth records.")
+    parser.add_argument("input", help="JSONL or CSV file of birth records")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file for the results")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from extension)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-pending", type=int, help="batches in flight or buffered (default: 2 x workers)")
+    parser.add_argument("--ordered", action="store_true", help="write results in input order")
+    parser.add_argument("--checkpoint", help="progress file; rerun with the same file to resume")
+    parser.add_argument("--data-path", default="data")
+    parser.add_argument("--cache-db", help="SQLite file for reports shared by all workers")
+    parser.add_argument("--metrics", help="write a JSON metrics snapshot of the run here")
+    parser.add_argument("--profile", help="sample worker stacks and write collapsed stacks here")
+    args = parser.parse_args(argv)
+
+    written = run(args.input, args.output, fmt=args.format, workers=args.workers,
+                  batch_size=args.batch_size, max_pending=args.max_pending, ordered=args.ordered,
+                  checkpoint_path=args.checkpoint, data_path=args.data_path, cache_db=args.cache_db,
+                  metrics_path=args.metrics, profile_path=args.profile)
+    print(f"Wrote {written} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
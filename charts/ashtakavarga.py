@@ -0,0 +1,98 @@
+# AstroAgent/charts/ashtakavarga.py
+"""
+Ashtakavarga bindu tables for any number of charts as integer arrays.
+
+Each of the seven planets Sun-Saturn has a Bhinnashtakavarga (BAV): a bindu
+count 0-8 for every sign, one possible bindu from each of eight
+contributors (the seven planets and the lagna) in the houses counted from
+that contributor listed in BENEFIC_PLACES (Parashara). The
+Sarvashtakavarga (SAV) is the sum of the seven BAVs, 337 bindus in all.
+
+BAV_TABLE[target, contributor, house - 1] holds those places once, and
+CONTRIBUTIONS[contributor, contributor sign] is the (7, 12) block of bindus
+that contributor adds to every BAV, so a batch costs eight gathers and adds:
+
+    bav, sav = ashtakavarga_batch(longitudes, ascendant)   # (N, 7, 12), (N, 12)
+"""
+
+import numpy as np
+
+from config import PLANETS
+
+TARGETS = tuple(PLANETS[:7])                  # Sun-Saturn; the nodes have no Ashtakavarga
+CONTRIBUTORS = TARGETS + ("Lagna",)
+
+# target -> contributor -> houses (counted from the contributor) that give a bindu
+BENEFIC_PLACES = {
+    "Sun": {"Sun": (1, 2, 4, 7, 8, 9, 10, 11), "Moon": (3, 6, 10, 11), "Mars": (1, 2, 4, 7, 8, 9, 10, 11),
+            "Mercury": (3, 5, 6, 9, 10, 11, 12), "Jupiter": (5, 6, 9, 11), "Venus": (6, 7, 12),
+            "Saturn": (1, 2, 4, 7, 8, 9, 10, 11), "Lagna": (3, 4, 6, 10, 11, 12)},
+    "Moon": {"Sun": (3, 6, 7, 8, 10, 11), "Moon": (1, 3, 6, 7, 10, 11), "Mars": (2, 3, 5, 6, 9, 10, 11),
+             "Mercury": (1, 3, 4, 5, 7, 8, 10, 11), "Jupiter": (1, 4, 7, 8, 10, 11, 12),
+             "Venus": (3, 4, 5, 7, 9, 10, 11), "Saturn": (3, 5, 6, 11), "Lagna": (3, 6, 10, 11)},
+    "Mars": {"Sun": (3, 5, 6, 10, 11), "Moon": (3, 6, 11), "Mars": (1, 2, 4, 7, 8, 10, 11),
+             "Mercury": (3, 5, 6, 11), "Jupiter": (6, 10, 11, 12), "Venus": (6, 8, 11, 12),
+             "Saturn": (1, 4, 7, 8, 9, 10, 11), "Lagna": (1, 3, 6, 10, 11)},
+    "Mercury": {"Sun": (5, 6, 9, 11, 12), "Moon": (2, 4, 6, 8, 10, 11), "Mars": (1, 2, 4, 7, 8, 9, 10, 11),
+                "Mercury": (1, 3, 5, 6, 9, 10, 11, 12), "Jupiter": (6, 8, 11, 12),
+                "Venus": (1, 2, 3, 4, 5, 8, 9, 11), "Saturn": (1, 2, 4, 7, 8, 9, 10, 11),
+                "Lagna": (1, 2, 4, 6, 8, 10, 11)},
+    "Jupiter": {"Sun": (1, 2, 3, 4, 7, 8, 9, 10, 11), "Moon": (2, 5, 7, 9, 11), "Mars": (1, 2, 4, 7, 8, 10, 11),
+                "Mercury": (1, 2, 4, 5, 6, 9, 10, 11), "Jupiter": (1, 2, 3, 4, 7, 8, 10, 11),
+                "Venus": (2, 5, 6, 9, 10, 11), "Saturn": (3, 5, 6, 12), "Lagna": (1, 2, 4, 5, 6, 7, 9, 10, 11)},
+    "Venus": {"Sun": (8, 11, 12), "Moon": (1, 2, 3, 4, 5, 8, 9, 11, 12), "Mars": (3, 5, 6, 9, 11, 12),
+              "Mercury": (3, 5, 6, 9, 11), "Jupiter": (5, 8, 9, 10, 11), "Venus": (1, 2, 3, 4, 5, 8, 9, 10, 11),
+              "Saturn": (3, 4, 5, 8, 9, 10, 11), "Lagna": (1, 2, 3, 4, 5, 8, 9, 11)},
+    "Saturn": {"Sun": (1, 2, 4, 7, 8, 10, 11), "Moon": (3, 6, 11), "Mars": (3, 5, 6, 10, 11, 12),
+               "Mercury": (6, 8, 9, 10, 11, 12), "Jupiter": (5, 6, 11, 12), "Venus": (6, 11, 12),
+               "Saturn": (3, 5, 6, 11), "Lagna": (1, 3, 4, 6, 10, 11)},
+}
+
+
+def _build():
+    table = np.zeros((len(TARGETS), len(CONTRIBUTORS), 12), dtype=np.int8)
+    for t, target in enumerate(TARGETS):
+        for c, contributor in enumerate(CONTRIBUTORS):
+            table[t, c, [h - 1 for h in BENEFIC_PLACES[target][contributor]]] = 1
+    # contributions[c, s, t, sign] = table[t, c, (sign - s) % 12]
+    houses = (np.arange(12)[None, :] - np.arange(12)[:, None]) % 12       # [s, sign]
+    contributions = np.ascontiguousarray(table[:, :, houses].transpose(1, 2, 0, 3))
+    return table, contributions
+
+
+BAV_TABLE, CONTRIBUTIONS = _build()
+BAV_TOTALS = BAV_TABLE.sum(axis=(1, 2))     # 48, 49, 39, 54, 56, 52, 39
+
+
+def ashtakavarga_batch(longitudes, ascendant):
+    """
+    longitudes: (N, 9) or (N, 7) longitudes ordered as config.PLANETS
+    ascendant: (N,) lagna longitudes
+    Returns (bav (N, 7, 12) int8, sav (N, 12) int16); sign axis 0 = Aries.
+    """
+    longitudes = np.atleast_2d(np.asarray(longitudes, dtype=np.float64))
+    n = len(longitudes)
+    signs = np.empty((n, len(CONTRIBUTORS)), dtype=np.intp)
+    signs[:, :7] = longitudes[:, :7] // 30
+    signs[:, 7] = np.asarray(ascendant, dtype=np.float64).reshape(n) // 30
+    signs %= 12
+
+    bav = np.zeros((n, len(TARGETS), 12), dtype=np.int8)
+    for c in range(len(CONTRIBUTORS)):
+        bav += CONTRIBUTIONS[c][signs[:, c]]
+    return bav, bav.sum(axis=1, dtype=np.int16)
+
+
+def planet_bindus(bav, longitudes):
+    """(N, 7) bindus each planet receives in its own BAV in the sign it occupies."""
+    longitudes = np.atleast_2d(np.asarray(longitudes, dtype=np.float64))
+    signs = (longitudes[:, :7] // 30).astype(np.intp) % 12
+    return np.take_along_axis(bav, signs[:, :, None], axis=2)[:, :, 0]
+
+
+def ashtakavarga_to_dict(bav, sav):
+    """One chart's tables as {"bhinna": {planet: [12 bindus]}, "sarva": [12 bindus]}."""
+    return {
+        "bhinna": {planet: bav[t].tolist() for t, planet in enumerate(TARGETS)},
+        "sarva": sav.tolist(),
+    }
@@ -0,0 +1,290 @@
+# AstroAgent/charts/ashtakoota.py
+"""
+Ashtakoota (guna milan) compatibility for one profile against many, or
+many against many, as table lookups.
+
+Every koota depends only on the two Moons' nakshatra and rasi, and both
+are fixed by the Moon's pada (108 padas of 3°20', nine to a rasi). So each
+koota is a (108, 108) table indexed [boy pada, girl pada], built once at
+import, and TOTAL_TABLE is their sum (0-36 gunas):
+
+    varna 1, vashya 2, tara 3, yoni 4, graha maitri 5, gana 6, bhakoot 7, nadi 8
+
+A chart reduces to a Signatures row: the Moon's sidereal pada (Lahiri
+ayanamsa by default, see Signatures.from_longitudes), the columns derived
+from it (nakshatra, rasi, varna, vashya, yoni, gana, nadi) and the manglik
+level, all small int arrays. Scoring a profile against N candidates is one
+gather, TOTAL_TABLE[profile pada, candidate padas]; top_matches() pushes
+the dosha filters down first (nadi and bhakoot dosha and the minimum score
+become a 108-entry allowed-pada mask, manglik a column comparison) and
+takes the best k with np.argpartition; score_many_to_many() applies the
+same filters to one block per (pada, manglik) group of profiles.
+
+    signatures = Signatures.from_batch(batch)
+    rows, scores = top_matches(signatures, profile=0, k=20, profile_is_boy=True)
+"""
+
+import numpy as np
+
+from config import PLANETS, SIGN_LORDS
+from charts.panchang import PADA_SPAN, resolve_ayanamsa
+from charts.shadbala import NATURAL
+
+MOON = PLANETS.index("Moon")
+MARS = PLANETS.index("Mars")
+PADAS = 108
+KOOTAS = ("varna", "vashya", "tara", "yoni", "graha_maitri", "gana", "bhakoot", "nadi")
+MAX_POINTS = (1, 2, 3, 4, 5, 6, 7, 8)
+
+# rasi -> varna (higher is the more senior varna): Brahmin 3, Kshatriya 2, Vaishya 1, Shudra 0
+VARNA = np.array([2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3], dtype=np.int8)
+# rasi -> vashya group, taken per whole rasi (Sagittarius as Manava, Capricorn as Jalachara)
+VASHYA_GROUPS = ("Chatushpada", "Manava", "Jalachara", "Vanachara", "Keeta")
+VASHYA = np.array([0, 0, 1, 2, 3, 1, 1, 4, 1, 2, 1, 2], dtype=np.int8)
+VASHYA_POINTS = np.array([      # [boy group, girl group]
+    [2.0, 1.0, 1.0, 0.5, 1.0],
+    [1.0, 2.0, 0.5, 0.0, 1.0],
+    [1.0, 0.5, 2.0, 1.0, 1.0],
+    [0.5, 0.0, 1.0, 2.0, 0.0],
+    [1.0, 1.0, 1.0, 0.0, 2.0],
+])
+# Taras 3, 5 and 7 (Vipat, Pratyari, Vadha) counted from the other's nakshatra are inauspicious
+TARA_GOOD = np.array([True, True, False, True, False, True, False, True, True])
+
+YONIS = ("Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat", "Cow", "Buffalo", "Tiger",
+         "Deer", "Monkey", "Mongoose", "Lion")
+YONI = np.array([0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1],
+                dtype=np.int8)
+YONI_POINTS = np.array([
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+], dtype=np.float64)
+
+# Rasi lords' natural relationship both ways -> graha maitri points
+# (sorted pair of -1 enemy / 0 neutral / 1 friend)
+MAITRI_POINTS = {(1, 1): 5.0, (0, 1): 4.0, (0, 0): 3.0, (-1, 1): 1.0, (-1, 0): 0.5, (-1, -1): 0.0}
+
+GANAS = ("Deva", "Manushya", "Rakshasa")
+GANA = np.array([0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0],
+                dtype=np.int8)
+GANA_POINTS = np.array([        # [boy gana, girl gana]
+    [6.0, 6.0, 1.0],
+    [5.0, 6.0, 0.0],
+    [1.0, 0.0, 6.0],
+])
+# Rasi distance girl -> boy (1-12) of 2/12, 5/9 and 6/8 is bhakoot dosha
+BHAKOOT_DOSHA_DISTANCES = (2, 12, 5, 9, 6, 8)
+
+NADIS = ("Adi", "Madhya", "Antya")
+NADI = np.array([(0, 1, 2, 2, 1, 0)[n % 6] for n in range(27)], dtype=np.int8)
+
+# Mars in these houses (from the lagna, and from the Moon) makes a chart manglik
+MANGLIK_HOUSES = (1, 2, 4, 7, 8, 12)
+
+
+def _build():
+    pada = np.arange(PADAS)
+    nakshatra = pada // 4
+    rasi = pada // 9
+    boy_n, girl_n = nakshatra[:, None], nakshatra[None, :]
+    boy_r, girl_r = rasi[:, None], rasi[None, :]
+
+    lord = np.array([PLANETS.index(l) for l in SIGN_LORDS])
+    maitri = np.zeros((12, 12))
+    for b in range(12):
+        for g in range(12):
+            if lord[b] == lord[g]:
+                maitri[b, g] = 5.0
+            else:
+                pair = tuple(sorted((int(NATURAL[lord[b], lord[g]]), int(NATURAL[lord[g], lord[b]]))))
+                maitri[b, g] = MAITRI_POINTS[pair]
+
+    distance = (boy_r - girl_r) % 12 + 1
+    tables = np.stack([
+        1.0 * (VARNA[boy_r] >= VARNA[girl_r]),
+        VASHYA_POINTS[VASHYA[boy_r], VASHYA[girl_r]],
+        1.5 * TARA_GOOD[(boy_n - girl_n) % 27 % 9] + 1.5 * TARA_GOOD[(girl_n - boy_n) % 27 % 9],
+        YONI_POINTS[YONI[boy_n], YONI[girl_n]],
+        maitri[boy_r, girl_r],
+        GANA_POINTS[GANA[boy_n], GANA[girl_n]],
+        7.0 * ~np.isin(distance, BHAKOOT_DOSHA_DISTANCES),
+        8.0 * (NADI[boy_n] != NADI[girl_n]),
+    ]).astype(np.float32)
+    return tables, tables.sum(axis=0), NADI[boy_n] == NADI[girl_n], np.isin(distance, BHAKOOT_DOSHA_DISTANCES)
+
+
+KOOTA_TABLES, TOTAL_TABLE, NADI_DOSHA, BHAKOOT_DOSHA = _build()
+
+
+class Signatures:
+    """
+    Columnar compatibility signatures of N charts: pada (int16 0-107) and
+    int8 nakshatra, rasi, varna, vashya, yoni, gana, nadi and manglik
+    (0 none, 1 from the lagna or the Moon, 2 from both).
+    """
+    __slots__ = ("pada", "nakshatra", "rasi", "varna", "vashya", "yoni", "gana", "nadi", "manglik")
+
+    def __init__(self, pada, manglik=None):
+        self.pada = np.asarray(pada, dtype=np.int16)
+        self.nakshatra = (self.pada // 4).astype(np.int8)
+        self.rasi = (self.pada // 9).astype(np.int8)
+        self.varna = VARNA[self.rasi]
+        self.vashya = VASHYA[self.rasi]
+        self.yoni = YONI[self.nakshatra]
+        self.gana = GANA[self.nakshatra]
+        self.nadi = NADI[self.nakshatra]
+        self.manglik = (np.zeros(len(self.pada), dtype=np.int8) if manglik is None
+                        else np.asarray(manglik, dtype=np.int8))
+
+    @classmethod
+    def from_longitudes(cls, longitudes, houses=None, ayanamsa=None, julian_day=None):
+        """
+        longitudes: (N, 9) tropical, ordered as config.PLANETS
+        houses: (N, 9) house numbers, for the manglik check from the lagna
+        ayanamsa: degrees (scalar or (N,)) subtracted to get the sidereal
+            Moon and Mars; Lahiri at julian_day ((N,)) when None, so one of
+            the two is required (0.0 for sidereal longitudes)
+        """
+        longitudes = np.atleast_2d(np.asarray(longitudes, dtype=np.float64))
+        ayanamsa = np.reshape(resolve_ayanamsa(ayanamsa, julian_day), (-1, 1))
+        longitudes = (longitudes - ayanamsa) % 360.0
+        pada = np.minimum((longitudes[:, MOON] % 360.0 / PADA_SPAN).astype(np.int16), PADAS - 1)
+        from_moon = ((longitudes[:, MARS] // 30 - longitudes[:, MOON] // 30) % 12 + 1).astype(np.int8)
+        manglik = np.isin(from_moon, MANGLIK_HOUSES).astype(np.int8)
+        if houses is not None:
+            manglik += np.isin(np.asarray(houses)[:, MARS], MANGLIK_HOUSES)
+        return cls(pada, manglik)
+
+    @classmethod
+    def from_batch(cls, batch, ayanamsa=None):
+        """Signatures of a charts.chart_state.ChartBatch (see from_longitudes for ayanamsa)."""
+        return cls.from_longitudes(batch.longitudes, batch.houses, ayanamsa, batch.julian_day)
+
+    def __len__(self):
+        return len(self.pada)
+
+    def __getitem__(self, rows):
+        """Signatures of a subset of rows (index array, slice or mask)."""
+        return Signatures(self.pada[rows], self.manglik[rows])
+
+    def columns(self):
+        """{name: array} of every column, e.g. for np.savez."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def koota_scores(boy_pada, girl_pada):
+    """{koota: points} plus "total" for one couple."""
+    points = KOOTA_TABLES[:, int(boy_pada), int(girl_pada)]
+    result = {name: float(p) for name, p in zip(KOOTAS, points)}
+    result["total"] = float(points.sum())
+    return result
+
+
+def score_one_to_many(profile_pada, candidate_pada, profile_is_boy=True):
+    """(N,) float32 gunas of one profile against N candidates."""
+    if profile_is_boy:
+        return TOTAL_TABLE[int(profile_pada)][candidate_pada]
+    return TOTAL_TABLE[:, int(profile_pada)][candidate_pada]
+
+
+def allowed_padas(profile_pada, profile_is_boy=True, min_score=0.0, nadi_dosha=True, bhakoot_dosha=True):
+    """
+    (108,) bool: candidate padas that reach min_score and, unless allowed,
+    carry no nadi or bhakoot dosha with the profile.
+    """
+    p = int(profile_pada)
+    pick = (lambda table: table[p]) if profile_is_boy else (lambda table: table[:, p])
+    allowed = pick(TOTAL_TABLE) >= min_score
+    if not nadi_dosha:
+        allowed &= ~pick(NADI_DOSHA)
+    if not bhakoot_dosha:
+        allowed &= ~pick(BHAKOOT_DOSHA)
+    return allowed
+
+
+def _top_k(scores, k):
+    """Indexes of the k largest scores, best first (argpartition, then sort k)."""
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+def top_matches(candidates, profile, k=10, profile_is_boy=True, min_score=18.0, nadi_dosha=False,
+                bhakoot_dosha=True, manglik="match", exclude=None):
+    """
+    Best k candidates for one profile.
+
+    candidates: Signatures of the pool
+    profile: row index into candidates, or a one-row Signatures
+    min_score: minimum gunas (18 of 36 is the customary threshold)
+    nadi_dosha, bhakoot_dosha: False drops candidates with that dosha
+    manglik: "match" keeps candidates whose manglik status equals the
+        profile's (dosha cancels between two manglik charts), "ignore" keeps all
+    exclude: optional (N,) bool mask of rows to skip (e.g. same gender)
+    Returns (row indexes, scores), best first.
+    """
+    if isinstance(profile, Signatures):
+        profile_pada, profile_manglik = int(profile.pada[0]), int(profile.manglik[0])
+    else:
+        profile_pada, profile_manglik = int(candidates.pada[profile]), int(candidates.manglik[profile])
+    mask = allowed_padas(profile_pada, profile_is_boy, min_score, nadi_dosha, bhakoot_dosha)[candidates.pada]
+    if manglik == "match":
+        mask &= (candidates.manglik > 0) == (profile_manglik > 0)
+    if exclude is not None:
+        mask &= ~exclude
+    if not isinstance(profile, Signatures):
+        mask[profile] = False
+    rows = np.flatnonzero(mask)
+    scores = score_one_to_many(profile_pada, candidates.pada[rows], profile_is_boy)
+    best = _top_k(scores, k)
+    return rows[best], scores[best]
+
+
+def score_many_to_many(boys, girls, k=10, min_score=18.0, nadi_dosha=False, bhakoot_dosha=True,
+                       manglik="match", chunk=16):
+    """
+    Best k girls for every boy: (N, k) girl indexes and (N, k) scores, best
+    first, with the filters of top_matches pushed down before ranking. Boys
+    with the same Moon pada and manglik status share a ranking, so at most
+    216 rows of the score matrix are built, chunk rows at a time; filtered
+    girls score -inf. Boys with fewer than k eligible girls get index -1
+    and score -inf in the remaining slots.
+    """
+    k = min(k, len(girls))
+    groups, inverse = np.unique(boys.pada.astype(np.int32) * 2 + (boys.manglik > 0), return_inverse=True)
+    girl_manglik = girls.manglik > 0
+    group_indexes = np.empty((len(groups), k), dtype=np.intp)
+    group_scores = np.empty((len(groups), k), dtype=np.float32)
+    for lo in range(0, len(groups), chunk):
+        keys = groups[lo:lo + chunk]
+        padas = keys // 2
+        allowed = np.array([allowed_padas(p, True, min_score, nadi_dosha, bhakoot_dosha) for p in padas])
+        mask = allowed[:, girls.pada]                                            # (chunk, M)
+        if manglik == "match":
+            mask &= girl_manglik[None, :] == (keys % 2 == 1)[:, None]
+        block = np.where(mask, TOTAL_TABLE[padas[:, None], girls.pada[None, :]], -np.inf).astype(np.float32)
+        if k < block.shape[1]:
+            part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(block.shape[1]), block.shape)
+        part_scores = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        indexes = np.take_along_axis(part, order, axis=1)
+        scores = np.take_along_axis(part_scores, order, axis=1)
+        group_indexes[lo:lo + chunk] = np.where(np.isfinite(scores), indexes, -1)
+        group_scores[lo:lo + chunk] = scores
+    return group_indexes[inverse.ravel()], group_scores[inverse.ravel()]
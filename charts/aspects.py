@@ -1,6 +1,10 @@
-# AstroAgent/rules_engine/aspects.py
+# AstroAgent/charts/aspects.py
 
-from config import PLANETS, SIGNS
+import numpy as np
+
+from config import PLANETS, ASPECT_ORB
+from utils.chart_utils import sign_index
+from utils.math_utils import distance_in_degrees
 
 # Vedic aspects: 1-7th, 5th, 9th, etc. For simplicity, we'll start with classical aspects
 VEDIC_ASPECTS = {
@@ -15,29 +19,172 @@ VEDIC_ASPECTS = {
     "Ketu": [7]
 }
 
+# DRISHTI_TABLE[p, from_sign, to_sign]: planet p in from_sign aspects to_sign
+DRISHTI_TABLE = np.zeros((len(PLANETS), 12, 12), dtype=bool)
+for _p, _planet in enumerate(PLANETS):
+    for _n in VEDIC_ASPECTS.get(_planet, []):
+        for _s in range(12):
+            DRISHTI_TABLE[_p, _s, (_s + _n - 1) % 12] = True
+
+ASPECT_TYPES = {1: "conjunction", 7: "opposition"}
+
+# aspects_rules.json category -> houses (counted from the source) it describes
+RULE_HOUSES = {"conjunctions": (1,), "opposition": (7,), "trine": (5, 9)}
+
+
+def rule_category(aspect_rules, source, target, house):
+    """
+    First aspects_rules.json category of source that lists target and
+    describes the computed geometry (RULE_HOUSES), or None; e.g. a Sun to
+    Jupiter opposition is not labelled by Sun's "trine" list.
+    """
+    for category, planets_list in aspect_rules.get(source, {}).items():
+        if target in planets_list and house in RULE_HOUSES.get(category, ()):
+            return category
+    return None
+
+
+def compute_aspects_batch(longitudes=None, signs=None, orb=ASPECT_ORB):
+    """
+    Graha drishti and conjunctions for N charts as array operations.
+
+    longitudes: (N, 9) exact longitudes (preferred), or
+    signs: (N, 9) sign indexes 0-11 when longitudes are unknown.
+
+    Returns a dict of (N, 9, 9) arrays indexed [chart, from_planet, to_planet]:
+        drishti: from_planet aspects to_planet by sign
+        conjunction: both planets in the same sign
+        deviation: degrees from the exact aspect point (NaN without longitudes)
+        within_orb: deviation <= orb (False without longitudes)
+    """
+    if longitudes is not None:
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        signs = (longitudes // 30).astype(np.int64) % 12
+    else:
+        signs = np.asarray(signs, dtype=np.int64)
+
+    n, p = signs.shape
+    planet_axis = np.arange(p)[None, :, None]
+    drishti = DRISHTI_TABLE[planet_axis, signs[:, :, None], signs[:, None, :]]
+    conjunction = signs[:, :, None] == signs[:, None, :]
+    off_diagonal = ~np.eye(p, dtype=bool)
+    drishti &= off_diagonal
+    conjunction &= off_diagonal
+
+    if longitudes is not None:
+        sign_distance = (signs[:, None, :] - signs[:, :, None]) % 12
+        exact_points = longitudes[:, :, None] + 30.0 * sign_distance
+        deviation = distance_in_degrees(longitudes[:, None, :], exact_points)
+        within_orb = deviation <= orb
+    else:
+        deviation = np.full((n, p, p), np.nan)
+        within_orb = np.zeros((n, p, p), dtype=bool)
+
+    return {"drishti": drishti, "conjunction": conjunction, "deviation": deviation, "within_orb": within_orb}
+
+
+def aspect_records(planet_signs, planet_longitudes=None, orb=ASPECT_ORB, aspect_rules=None):
+    """
+    Structured aspects for one chart.
+
+    planet_signs: {planet: sign name or index}
+    planet_longitudes: optional {planet: exact longitude}; enables orb checks
+    aspect_rules: optional aspects_rules.json mapping; when the pair is listed
+        there under a category matching the geometry (see rule_category),
+        that category is attached as "rule"
+
+    Returns a list of dicts:
+        {"from", "to", "type": "conjunction" | "opposition" | "drishti",
+         "house": aspect counted from the source (1 for conjunction),
+         "deviation": degrees from exact or None, "within_orb": bool or None}
+    Conjunctions are reported once per pair.
+    """
+    present = [i for i, pl in enumerate(PLANETS) if pl in planet_signs]
+    signs = np.zeros((1, len(PLANETS)), dtype=np.int64)
+    for i in present:
+        signs[0, i] = sign_index(planet_signs[PLANETS[i]])
+    longitudes = None
+    if planet_longitudes is not None and all(PLANETS[i] in planet_longitudes for i in present):
+        longitudes = np.zeros((1, len(PLANETS)))
+        for i in present:
+            longitudes[0, i] = planet_longitudes[PLANETS[i]]
+    result = compute_aspects_batch(longitudes, signs, orb)
+
+    records = []
+    for i in present:
+        for j in present:
+            conjunct = result["conjunction"][0, i, j] and i < j
+            if not (conjunct or result["drishti"][0, i, j]):
+                continue
+            source, target = PLANETS[i], PLANETS[j]
+            house = (int(signs[0, j]) - int(signs[0, i])) % 12 + 1
+            record = {
+                "from": source,
+                "to": target,
+                "type": ASPECT_TYPES.get(house, "drishti"),
+                "house": house,
+                "deviation": None if longitudes is None else round(float(result["deviation"][0, i, j]), 2),
+                "within_orb": None if longitudes is None else bool(result["within_orb"][0, i, j]),
+            }
+            if aspect_rules is not None:
+                category = rule_category(aspect_rules, source, target, house)
+                if category is not None:
+                    record["rule"] = category
+            records.append(record)
+    return records
+
+
+def with_orbs(records, planet_longitudes, orb=ASPECT_ORB):
+    """
+    Records from aspect_records(planet_signs) without longitudes, returned as
+    new dicts with deviation and within_orb filled in from exact longitudes,
+    exactly as aspect_records would have. The input records are not modified
+    (they may be shared, e.g. cached); returned unchanged when a planet's
+    longitude is missing.
+    """
+    if not records or not all(r["from"] in planet_longitudes and r["to"] in planet_longitudes
+                              for r in records):
+        return records
+    sources = np.array([float(planet_longitudes[r["from"]]) for r in records])
+    targets = np.array([float(planet_longitudes[r["to"]]) for r in records])
+    offsets = np.array([30.0 * (r["house"] - 1) for r in records])
+    deviation = distance_in_degrees(targets, sources + offsets)
+    return [dict(r, deviation=round(float(d), 2), within_orb=bool(d <= orb))
+            for r, d in zip(records, deviation)]
+
 
 class Aspects:
     def __init__(self, planet_positions):
         """
         planet_positions: dictionary of planet → {"sign": 0-11, "degree": float, "house": int}
+        ("longitude" may be given instead of "degree")
         """
         self.planet_positions = planet_positions
         self.aspect_table = {}  # planet → list of planets it aspects
 
-    def compute_aspects(self):
-        self.aspect_table = {planet: [] for planet in PLANETS}
+    def _signs_and_longitudes(self):
+        signs, longitudes = {}, {}
+        for planet, info in self.planet_positions.items():
+            if "error" in info:
+                continue
+            if "longitude" in info:
+                longitudes[planet] = float(info["longitude"])
+                signs[planet] = int(longitudes[planet] // 30)
+            else:
+                signs[planet] = sign_index(info["sign"])
+                if "degree" in info:
+                    longitudes[planet] = signs[planet] * 30 + float(info["degree"])
+        return signs, (longitudes if len(longitudes) == len(signs) else None)
 
-        for p1 in PLANETS:
-            sign1 = self.planet_positions[p1]["sign"]
-            for p2 in PLANETS:
-                if p1 == p2:
-                    continue
-                sign2 = self.planet_positions[p2]["sign"]
-                distance = (sign2 - sign1) % 12
-                for aspect in VEDIC_ASPECTS.get(p1, []):
-                    if distance == (aspect % 12):
-                        self.aspect_table[p1].append(p2)
+    def aspect_records(self, orb=ASPECT_ORB):
+        signs, longitudes = self._signs_and_longitudes()
+        return aspect_records(signs, longitudes, orb)
 
+    def compute_aspects(self):
+        self.aspect_table = {planet: [] for planet in PLANETS}
+        for record in self.aspect_records():
+            if record["type"] != "conjunction":
+                self.aspect_table[record["from"]].append(record["to"])
         return self.aspect_table
 
     def print_aspects(self):
@@ -0,0 +1,257 @@
+# AstroAgent/charts/chart_state.py
+"""
+Array-backed chart representations.
+
+ChartState holds one chart in fixed-width arrays (planet axis ordered as
+config.PLANETS): float64[9] longitudes, int8[9] signs 0-11 and int8[9]
+houses 1-12. Houses (from cusps) and vargas are computed on first access
+and cached. ChartBatch is the struct-of-arrays form for many charts: one
+(N, 9) array per field, with rows handed out as ChartState views.
+
+Both convert to and from the dict shapes the analyzers take:
+    planets_in_houses   {"1st House": ["Sun", ...], ...}
+    planets_with_signs  {"Sun": "Gemini", ...}
+    planet_positions    {"Sun": {"sign", "longitude", "house"}, ...}  (NatalChart)
+"""
+
+import numpy as np
+
+from config import PLANETS, ZODIAC_SIGNS, HOUSES
+from charts.ashtakavarga import ashtakavarga_batch
+from charts.ephemeris import assign_houses
+from charts.panchang import nakshatra_pada, resolve_ayanamsa
+from charts.shadbala import shadbala_batch
+from charts.vargas import VARGA_INDEX, chart_vargas
+from utils.chart_utils import house_number, sign_index
+
+# House of a planet whose house is unknown (partial planets_in_houses)
+NO_HOUSE = -1
+
+
+def _whole_sign_houses(signs, ascendant):
+    """Houses counted from the lagna sign, used when no cusps are known."""
+    lagna_sign = (np.asarray(ascendant) // 30).astype(np.int8)
+    return ((signs - lagna_sign[..., None]) % 12 + 1).astype(np.int8)
+
+
+class ChartState:
+    """
+    One chart as fixed-width arrays. Pass houses directly, or cusps (or just
+    an ascendant, for whole-sign houses) to have them derived on first use.
+    Longitudes may be NaN when only signs are known (e.g. from_dicts()),
+    in which case vargas are unavailable; a house of NO_HOUSE marks a planet
+    whose house is unknown, and to_dicts() leaves it out.
+    """
+    __slots__ = ("longitudes", "speeds", "signs", "ascendant", "cusps", "julian_day",
+                 "_houses", "_vargas")
+
+    def __init__(self, longitudes, signs=None, houses=None, ascendant=None, cusps=None,
+                 speeds=None, julian_day=None):
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        if signs is None:
+            signs = self.longitudes // 30
+        self.signs = np.asarray(signs, dtype=np.int8)
+        self.speeds = None if speeds is None else np.asarray(speeds, dtype=np.float64)
+        self.ascendant = None if ascendant is None else float(ascendant)
+        self.cusps = None if cusps is None else np.asarray(cusps, dtype=np.float64)
+        self.julian_day = None if julian_day is None else float(julian_day)
+        self._houses = None if houses is None else np.asarray(houses, dtype=np.int8)
+        self._vargas = None
+
+    @property
+    def houses(self):
+        """int8[9] house numbers 1-12, derived from cusps or the lagna if not given."""
+        if self._houses is None:
+            if self.cusps is not None:
+                self._houses = assign_houses(self.longitudes[None, :], self.cusps[None, :])[0]
+            elif self.ascendant is not None:
+                self._houses = _whole_sign_houses(self.signs, self.ascendant)
+            else:
+                raise ValueError("Chart has no houses, cusps or ascendant")
+        return self._houses
+
+    @property
+    def vargas(self):
+        """
+        (signs, degrees) of all Shodashvarga charts, shape (bodies, 16): the
+        nine planets, plus the lagna when the ascendant is known.
+        """
+        if self._vargas is None:
+            if np.isnan(self.longitudes).any():
+                raise ValueError("Vargas need planet longitudes")
+            self._vargas = chart_vargas(self.longitudes, self.ascendant)
+        return self._vargas
+
+    def varga_signs(self, division):
+        """Sign index 0-11 of every body in one divisional chart, e.g. "D9"."""
+        return self.vargas[0][:, VARGA_INDEX[division]]
+
+    @classmethod
+    def from_dicts(cls, planets_in_houses, planets_with_signs, planet_longitudes=None):
+        """
+        Build from the analyzers' dict pair; longitudes are optional. Every
+        planet needs a sign; planets missing from planets_in_houses get
+        NO_HOUSE and are left out again by to_dicts().
+        """
+        missing = [planet for planet in PLANETS if planet not in planets_with_signs]
+        if missing:
+            raise ValueError(f"planets_with_signs has no sign for {', '.join(missing)}")
+        longitudes = np.full(len(PLANETS), np.nan)
+        signs = np.zeros(len(PLANETS), dtype=np.int8)
+        houses = np.full(len(PLANETS), NO_HOUSE, dtype=np.int8)
+        for i, planet in enumerate(PLANETS):
+            signs[i] = sign_index(planets_with_signs[planet])
+            if planet_longitudes and planet in planet_longitudes:
+                longitudes[i] = planet_longitudes[planet]
+        for house, planets in planets_in_houses.items():
+            for planet in planets:
+                houses[PLANETS.index(planet)] = house_number(house)
+        return cls(longitudes, signs=signs, houses=houses)
+
+    @classmethod
+    def from_planet_positions(cls, planet_positions, ascendant=None):
+        """
+        Build from NatalChart.planet_positions ({planet: {"sign", "longitude", "house"}}).
+        Raises ValueError for planets that are missing or carry an "error" entry.
+        """
+        failed = {p: planet_positions.get(p, {"error": "missing"}).get("error") for p in PLANETS
+                  if "longitude" not in planet_positions.get(p, {})}
+        if failed:
+            raise ValueError("No position for " + ", ".join(f"{p} ({e})" for p, e in failed.items()))
+        longitudes = [planet_positions[p]["longitude"] for p in PLANETS]
+        houses = [planet_positions[p]["house"] for p in PLANETS]
+        return cls(longitudes, houses=houses, ascendant=ascendant)
+
+    def to_dicts(self):
+        """(planets_in_houses, planets_with_signs) for the analyzers."""
+        planets_in_houses = {}
+        planets_with_signs = {}
+        houses = self.houses
+        for i, planet in enumerate(PLANETS):
+            planets_with_signs[planet] = ZODIAC_SIGNS[self.signs[i]]
+            if houses[i] != NO_HOUSE:
+                planets_in_houses.setdefault(HOUSES[houses[i] - 1], []).append(planet)
+        return planets_in_houses, planets_with_signs
+
+    def planet_longitudes(self):
+        """{planet: longitude}, skipping planets whose longitude is unknown."""
+        return {p: float(lon) for p, lon in zip(PLANETS, self.longitudes) if not np.isnan(lon)}
+
+    def to_planet_positions(self):
+        """{planet: {"sign", "longitude", "house"}}, the NatalChart.planet_positions shape."""
+        houses = self.houses
+        return {
+            planet: {"sign": ZODIAC_SIGNS[self.signs[i]], "longitude": float(self.longitudes[i]),
+                     "house": int(houses[i])}
+            for i, planet in enumerate(PLANETS)
+        }
+
+
+class ChartBatch:
+    """
+    Struct-of-arrays store for N charts: longitudes and speeds (N, 9) float64,
+    signs and houses (N, 9) int8, ascendant (N,), cusps (N, 12), julian_day (N,).
+    Vargas for the whole batch are computed in one pass on first access;
+    ashtakavarga() and shadbala() score the whole batch in array operations.
+    """
+    __slots__ = ("longitudes", "speeds", "signs", "houses", "ascendant", "cusps", "julian_day",
+                 "_vargas")
+
+    def __init__(self, longitudes, signs=None, houses=None, ascendant=None, cusps=None,
+                 speeds=None, julian_day=None):
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        n = len(self.longitudes)
+        self.signs = (self.longitudes // 30).astype(np.int8) if signs is None else np.asarray(signs, dtype=np.int8)
+        self.speeds = None if speeds is None else np.asarray(speeds, dtype=np.float64)
+        self.ascendant = None if ascendant is None else np.asarray(ascendant, dtype=np.float64)
+        self.cusps = None if cusps is None else np.asarray(cusps, dtype=np.float64)
+        self.julian_day = None if julian_day is None else np.asarray(julian_day, dtype=np.float64)
+        if houses is None:
+            if self.cusps is not None:
+                houses = assign_houses(self.longitudes, self.cusps)
+            elif self.ascendant is not None:
+                houses = _whole_sign_houses(self.signs, self.ascendant)
+            else:
+                houses = np.ones((n, len(PLANETS)), dtype=np.int8)
+        self.houses = np.asarray(houses, dtype=np.int8)
+        self._vargas = None
+
+    @classmethod
+    def from_positions(cls, batch):
+        """Wrap a charts.ephemeris.compute_positions_batch result without copying."""
+        return cls(batch["longitudes"], signs=batch["signs"], houses=batch["houses"],
+                   ascendant=batch["ascendant"], cusps=batch["cusps"],
+                   speeds=batch["speeds"], julian_day=batch["julian_day"])
+
+    @classmethod
+    def from_states(cls, states):
+        """Stack ChartState objects (all with or all without an ascendant)."""
+        states = list(states)
+        ascendant = None
+        if states and all(s.ascendant is not None for s in states):
+            ascendant = [s.ascendant for s in states]
+        return cls(np.stack([s.longitudes for s in states]),
+                   signs=np.stack([s.signs for s in states]),
+                   houses=np.stack([s.houses for s in states]),
+                   ascendant=ascendant)
+
+    def __len__(self):
+        return len(self.longitudes)
+
+    def __getitem__(self, i):
+        """Row i as a ChartState whose arrays are views into this batch."""
+        def row(field):
+            return None if field is None else field[i]
+        state = ChartState(self.longitudes[i], signs=self.signs[i], houses=self.houses[i],
+                           ascendant=row(self.ascendant), cusps=row(self.cusps),
+                           speeds=row(self.speeds), julian_day=row(self.julian_day))
+        if self._vargas is not None:
+            state._vargas = (self._vargas[0][i], self._vargas[1][i])
+        return state
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def vargas(self, with_degrees=True):
+        """
+        (signs, degrees) of shape (N, bodies, 16) for every chart, computed once.
+        Sign-only requests are not cached; pass with_degrees=False for large
+        batches that only need varga signs.
+        """
+        if self._vargas is not None:
+            return self._vargas
+        result = chart_vargas(self.longitudes, self.ascendant, with_degrees=with_degrees)
+        if with_degrees:
+            self._vargas = result
+        return result
+
+    def varga_signs(self, division):
+        """(N, bodies) sign indexes in one divisional chart, e.g. "D9"."""
+        if self._vargas is not None:
+            return self._vargas[0][:, :, VARGA_INDEX[division]]
+        return chart_vargas(self.longitudes, self.ascendant, vargas=(division,), with_degrees=False)[0][..., 0]
+
+    def ashtakavarga(self):
+        """(bav (N, 7, 12) int8, sav (N, 12) int16) bindu tables; needs the ascendant."""
+        return ashtakavarga_batch(self.longitudes, self.ascendant)
+
+    def moon_nakshatra(self, ayanamsa=None):
+        """
+        (nakshatra int8 0-26, pada int8 1-4, elapsed fraction) of every chart's
+        Moon. ayanamsa (degrees, scalar or (N,)) defaults to Lahiri at each
+        chart's julian_day; batches without one must pass it.
+        """
+        ayanamsa = resolve_ayanamsa(ayanamsa, self.julian_day)
+        return nakshatra_pada(self.longitudes[:, PLANETS.index("Moon")], ayanamsa)
+
+    def shadbala(self, geo_longitudes=None):
+        """Shadbala components for every chart (see charts.shadbala.shadbala_batch)."""
+        midheaven = None if self.cusps is None or not self.cusps.any() else self.cusps[:, 9]
+        return shadbala_batch(self.longitudes, self.speeds, self.ascendant, self.julian_day,
+                              geo_longitudes, midheaven)
+
+    def to_dicts(self, i):
+        """(planets_in_houses, planets_with_signs) of chart i."""
+        return self[i].to_dicts()
+
@@ -0,0 +1,370 @@
+# AstroAgent/charts/chart_store.py
+"""
+Persistent columnar store of computed charts with bitmap indexes.
+
+A store is a directory of immutable segments plus manifest.json. Each
+segment holds one .npy file per column, memory-mapped on open, so reads
+hand out views of the page cache rather than copies:
+
+    ids        (N,) int64        caller's chart/user id
+    longitudes (N, 9) float64    planet axis ordered as config.PLANETS
+    signs      (N, 9) int8       0-11
+    houses     (N, 9) int8       1-12
+    ascendant  (N,) float64
+    vargas     (N, bodies, 16) int8 varga signs (charts.vargas.SHODASHVARGA)
+    yogas      (N, Y) bool       columns follow manifest "yogas"
+    bitmaps    (9 + 9 + Y, 12, B) uint8, bits packed over rows (B = ceil(N / 8)):
+               rows 0-8 (planet, sign), 9-17 (planet, house - 1), then one
+               row per yoga (sign axis unused, index 0)
+
+A placement query ANDs (and within one planet ORs) bitmap rows, so
+"Jupiter exalted in the 10th and Moon in Scorpio" is three bitmap
+intersections per segment with no chart decoded; dignities resolve to
+signs through the classical table charts.shadbala.DIGNITY_SIGNS, the one
+shadbala uses (planet_strength.json does not follow the classical
+exaltation signs), and match nothing for Rahu and Ketu. Varga conditions
+are checked on the surviving rows only.
+
+    store = ChartStore("charts.store")
+    store.append(ids, batch)                     # batch: charts.chart_state.ChartBatch
+    ids = store.query(dignity={"Jupiter": "exalted"}, house={"Jupiter": 10}, sign={"Moon": "Scorpio"})
+
+append() writes a new segment; appending an id again supersedes its
+earlier row (the newest segment wins). compact() rewrites the live rows of
+many small segments into one and drops superseded rows.
+
+    python -m charts.chart_store charts.store query --sign Moon=Scorpio --dignity Jupiter=exalted
+    python -m charts.chart_store charts.store compact
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from config import PLANETS
+from charts.chart_state import ChartBatch
+from charts.shadbala import DIGNITY_SIGNS
+from charts.vargas import VARGA_INDEX
+from utils.chart_utils import house_number, sign_index
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+COLUMNS = ("ids", "longitudes", "signs", "houses", "ascendant", "vargas", "yogas")
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+SIGN_ROWS = 0
+HOUSE_ROWS = len(PLANETS)
+YOGA_ROWS = 2 * len(PLANETS)
+
+
+def build_bitmaps(signs, houses, yogas):
+    """(18 + Y, 12, ceil(N / 8)) uint8 packed row bitmaps for one segment."""
+    n = len(signs)
+    slots = np.arange(12)
+    planes = np.zeros((YOGA_ROWS + yogas.shape[1], 12, n), dtype=bool)
+    planes[SIGN_ROWS:HOUSE_ROWS] = (signs.T[:, None, :] == slots[None, :, None])
+    planes[HOUSE_ROWS:YOGA_ROWS] = ((houses.T - 1)[:, None, :] == slots[None, :, None])
+    planes[YOGA_ROWS:, 0] = yogas.T
+    return np.packbits(planes, axis=2)
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class Segment:
+    """One immutable segment: memory-mapped columns and bitmaps."""
+
+    def __init__(self, path, rows):
+        self.path = Path(path)
+        self.rows = rows
+        self.columns = {name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+        self.bitmaps = np.load(self.path / "bitmaps.npy", mmap_mode="r")
+        self.live = None    # packed bitmap of rows not superseded by a later segment
+
+    def rows_of(self, bits):
+        """Row indexes set in a packed bitmap."""
+        return np.flatnonzero(np.unpackbits(bits, count=self.rows))
+
+
+class ChartStore:
+    """
+    Columnar chart store in a directory (see the module docstring).
+    data_path: rules folder used for detecting yogas when append() is not
+    given them.
+    """
+
+    def __init__(self, path, data_path="data"):
+        self.path = Path(path)
+        self.data_path = data_path
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.path / MANIFEST
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{self.path}: unsupported store version {self.manifest.get('version')}")
+        else:
+            self.manifest = {"version": FORMAT_VERSION, "yogas": None, "segments": [], "next_segment": 1}
+        self._open()
+
+    # ---- layout ----
+
+    def _open(self):
+        self.segments = [Segment(self.path / seg["name"], seg["rows"]) for seg in self.manifest["segments"]]
+        self._mark_live()
+
+    def _mark_live(self):
+        """Newest row per id is live: scan segments newest first, skipping ids already seen."""
+        seen = np.empty(0, dtype=np.int64)
+        for segment in reversed(self.segments):
+            ids = np.asarray(segment.columns["ids"])
+            # within a segment the last row of an id wins as well
+            _, last = np.unique(ids[::-1], return_index=True)
+            live = np.zeros(segment.rows, dtype=bool)
+            live[segment.rows - 1 - last] = True
+            live &= ~np.isin(ids, seen)
+            segment.live = np.packbits(live)
+            seen = np.union1d(seen, ids)
+
+    def _write_manifest(self):
+        tmp = self.path / (MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.path / MANIFEST)
+
+    def _write_segment(self, columns):
+        name = f"seg-{self.manifest['next_segment']:06d}"
+        self.manifest["next_segment"] += 1
+        tmp = self.path / (name + ".tmp")
+        tmp.mkdir()
+        for column in COLUMNS:
+            np.save(tmp / f"{column}.npy", np.ascontiguousarray(columns[column]))
+        np.save(tmp / "bitmaps.npy", build_bitmaps(columns["signs"], columns["houses"], columns["yogas"]))
+        os.replace(tmp, self.path / name)
+        return {"name": name, "rows": int(len(columns["ids"]))}
+
+    @property
+    def yoga_names(self):
+        return self.manifest["yogas"] or []
+
+    def __len__(self):
+        """Live charts."""
+        return int(sum(np.unpackbits(s.live, count=s.rows).sum() for s in self.segments))
+
+    # ---- writes ----
+
+    def _detect_yogas(self, batch):
+        from rules_engine.rule_registry import get_rules
+        from rules_engine.yoga_compiler import compile_yogas, encode_batch
+
+        compiled = compile_yogas(get_rules(f"{self.data_path}/house_rules")["yogas.json"])
+        lagna = None if batch.ascendant is None else (batch.ascendant // 30).astype(np.int8)
+        return compiled.names, compiled.detect_batch(encode_batch(batch.signs, batch.houses, lagna))
+
+    def append(self, ids, batch, yogas=None):
+        """
+        Add N charts as a new segment. ids: (N,) ints; batch: ChartBatch;
+        yogas: optional (names, (N, Y) bool), detected from the yoga rules
+        when None. Returns the segment name.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(batch):
+            raise ValueError(f"{len(ids)} ids for {len(batch)} charts")
+        names, mask = yogas if yogas is not None else self._detect_yogas(batch)
+        if self.manifest["yogas"] is None:
+            self.manifest["yogas"] = list(names)
+        elif list(names) != self.manifest["yogas"]:
+            raise ValueError("Yoga columns differ from the store's; rebuild the store to change them")
+        ascendant = np.zeros(len(ids)) if batch.ascendant is None else batch.ascendant
+        entry = self._write_segment({
+            "ids": ids,
+            "longitudes": batch.longitudes,
+            "signs": batch.signs,
+            "houses": batch.houses,
+            "ascendant": ascendant,
+            "vargas": batch.vargas(with_degrees=False)[0],
+            "yogas": np.asarray(mask, dtype=bool),
+        })
+        self.manifest["segments"].append(entry)
+        self._write_manifest()
+        self._open()
+        return entry["name"]
+
+    def rebuild_yogas(self):
+        """
+        Recompute every segment's yoga column and bitmaps from the current
+        yoga rules (after yogas.json changed); other columns are untouched.
+        Returns the new yoga names.
+        """
+        from rules_engine.rule_registry import get_rules
+        from rules_engine.yoga_compiler import compile_yogas
+
+        names = compile_yogas(get_rules(f"{self.data_path}/house_rules", revalidate=True)["yogas.json"]).names
+        for segment in self.segments:
+            batch = self.charts(segment, slice(None))
+            mask = self._detect_yogas(batch)[1]
+            bitmaps = build_bitmaps(batch.signs, batch.houses, mask)
+            for name, array in (("yogas", mask), ("bitmaps", bitmaps)):
+                tmp = segment.path / f"{name}.npy.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp, segment.path / f"{name}.npy")
+        self.manifest["yogas"] = list(names)
+        self._write_manifest()
+        self._open()
+        return list(names)
+
+    def compact(self, max_rows=None):
+        """
+        Merge segments into one, keeping only live rows. With max_rows, only
+        segments smaller than that are merged. Returns the new segment name,
+        or None when there was nothing to merge.
+        """
+        chosen = [i for i, s in enumerate(self.segments) if max_rows is None or s.rows < max_rows]
+        if not chosen or (len(chosen) == 1 and len(self.segments[chosen[0]].rows_of(self.segments[chosen[0]].live))
+                          == self.segments[chosen[0]].rows):
+            return None
+        merged = {}
+        for column in COLUMNS:
+            merged[column] = np.concatenate([
+                self.segments[i].columns[column][self.segments[i].rows_of(self.segments[i].live)]
+                for i in chosen])
+        entry = self._write_segment(merged)
+        old = [self.manifest["segments"][i]["name"] for i in chosen]
+        # the merged segment takes the place of the newest one it replaces, so ids
+        # appended later still supersede it
+        segments = [seg for i, seg in enumerate(self.manifest["segments"]) if i not in chosen[:-1]]
+        segments[segments.index(self.manifest["segments"][chosen[-1]])] = entry
+        self.manifest["segments"] = segments
+        self._write_manifest()
+        self._open()
+        for name in old:
+            shutil.rmtree(self.path / name, ignore_errors=True)
+        return entry["name"]
+
+    # ---- reads ----
+
+    @staticmethod
+    def _dignity_signs(planet, dignity):
+        if dignity not in DIGNITY_SIGNS["Sun"]:
+            raise ValueError(f"Unknown dignity {dignity!r}; use one of {', '.join(DIGNITY_SIGNS['Sun'])}")
+        return _as_list(DIGNITY_SIGNS.get(planet, {}).get(dignity, []))
+
+    def _bitmap_rows(self, sign=None, house=None, dignity=None, yogas=None):
+        """[[bitmap row (plane, slot)] OR-ed] lists to be AND-ed."""
+        terms = []
+        for planet, values in (sign or {}).items():
+            terms.append([(SIGN_ROWS + PLANET_INDEX[planet], sign_index(v)) for v in _as_list(values)])
+        for planet, values in (house or {}).items():
+            terms.append([(HOUSE_ROWS + PLANET_INDEX[planet], house_number(v) - 1) for v in _as_list(values)])
+        for planet, values in (dignity or {}).items():
+            signs = [s for v in _as_list(values) for s in self._dignity_signs(planet, v)]
+            terms.append([(SIGN_ROWS + PLANET_INDEX[planet], s) for s in signs])
+        for name in yogas or ():
+            if name not in self.yoga_names:
+                raise ValueError(f"Unknown yoga {name!r}")
+            terms.append([(YOGA_ROWS + self.yoga_names.index(name), 0)])
+        return terms
+
+    def select(self, sign=None, house=None, dignity=None, yogas=None, varga=None):
+        """
+        Matching live rows as [(segment, row indexes)].
+
+        sign:    {planet: sign name/index or list of them}
+        house:   {planet: house number/label or list}
+        dignity: {planet: "exalted" | "debilitated" | "moolatrikona" | "own_sign" or list}
+        yogas:   yoga names that must all be present
+        varga:   {"D9": {body: sign or list}} (body may be "Lagna"),
+                 checked on the rows left by the bitmaps
+        """
+        terms = self._bitmap_rows(sign, house, dignity, yogas)
+        result = []
+        for segment in self.segments:
+            bits = segment.live.copy()
+            for term in terms:
+                if not term:
+                    bits[:] = 0
+                    break
+                planes, slots = zip(*term)
+                bits &= np.bitwise_or.reduce(segment.bitmaps[list(planes), list(slots)], axis=0)
+            rows = segment.rows_of(bits)
+            for division, placements in (varga or {}).items():
+                column = VARGA_INDEX[division]
+                for body, values in placements.items():
+                    b = PLANET_INDEX.get(body, len(PLANETS))
+                    found = segment.columns["vargas"][rows, b, column]
+                    rows = rows[np.isin(found, [sign_index(v) for v in _as_list(values)])]
+            if len(rows):
+                result.append((segment, rows))
+        return result
+
+    def query(self, **conditions):
+        """ids of the live charts matching select(**conditions)."""
+        parts = [np.asarray(segment.columns["ids"][rows]) for segment, rows in self.select(**conditions)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def count(self, **conditions):
+        return sum(len(rows) for _, rows in self.select(**conditions))
+
+    def read(self, column, selection):
+        """Values of one column for a select() result, concatenated."""
+        parts = [segment.columns[column][rows] for segment, rows in selection]
+        if not parts:
+            return np.empty((0,) + self.segments[0].columns[column].shape[1:]) if self.segments else np.empty(0)
+        return np.concatenate(parts)
+
+    def charts(self, segment, rows):
+        """ChartBatch of rows of one segment (for re-running the analyzers)."""
+        columns = segment.columns
+        return ChartBatch(columns["longitudes"][rows], signs=columns["signs"][rows],
+                          houses=columns["houses"][rows], ascendant=columns["ascendant"][rows])
+
+    def live_rows(self):
+        """[(segment, row indexes)] of every live chart."""
+        return [(segment, segment.rows_of(segment.live)) for segment in self.segments]
+
+    def column(self, name):
+        """Per-segment read-only memory maps of a column (no copy)."""
+        return [segment.columns[name] for segment in self.segments]
+
+
+def _parse_conditions(pairs):
+    """["Moon=Scorpio", "Jupiter=10,11"] -> {"Moon": ["Scorpio"], "Jupiter": [10, 11]}"""
+    conditions = {}
+    for pair in pairs or ():
+        planet, _, values = pair.partition("=")
+        conditions[planet] = [int(v) if v.isdigit() else v for v in values.split(",")]
+    return conditions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect, query or compact a chart store.")
+    parser.add_argument("store")
+    parser.add_argument("command", choices=("info", "query", "compact"))
+    parser.add_argument("--sign", action="append", help="PLANET=SIGN[,SIGN...]")
+    parser.add_argument("--house", action="append", help="PLANET=HOUSE[,HOUSE...]")
+    parser.add_argument("--dignity", action="append", help="PLANET=exalted|debilitated|moolatrikona|own_sign")
+    parser.add_argument("--yoga", action="append", help="yoga name (repeatable)")
+    parser.add_argument("--max-rows", type=int, help="compact only segments smaller than this")
+    parser.add_argument("--data", default="data")
+    args = parser.parse_args(argv)
+
+    store = ChartStore(args.store, data_path=args.data)
+    if args.command == "compact":
+        result = {"segment": store.compact(args.max_rows)}
+    elif args.command == "query":
+        ids = store.query(sign=_parse_conditions(args.sign), house=_parse_conditions(args.house),
+                          dignity=_parse_conditions(args.dignity), yogas=args.yoga)
+        result = {"count": len(ids), "ids": ids.tolist()}
+    else:
+        result = {"charts": len(store), "yogas": store.yoga_names, "segments": store.manifest["segments"]}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
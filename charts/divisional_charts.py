@@ -1,9 +1,10 @@
 # AstroAgent/charts/divisional_charts.py
 
-from flatlib.chart import Chart
-from flatlib import const
-from flatlib import ephem
+import numpy as np
+
 from config import PLANETS, DIVISIONAL_CHARTS
+from charts.vargas import SHODASHVARGA, chart_vargas, vargas_to_dict
+
 
 class DivisionalCharts:
     def __init__(self, natal_chart):
@@ -13,60 +14,47 @@ class DivisionalCharts:
         self.natal_chart = natal_chart
         self.divisional_positions = {}
 
+    def _longitudes(self):
+        """Natal planet longitudes in PLANETS order (NaN where unavailable) and the lagna."""
+        lons = np.full(len(PLANETS), np.nan)
+        for i, planet in enumerate(PLANETS):
+            planet_info = self.natal_chart.planet_positions.get(planet)
+            if planet_info and 'error' not in planet_info:
+                lons[i] = planet_info['longitude']
+        first_house = next(iter(getattr(self.natal_chart, "house_positions", {}).values()), None)
+        ascendant = None
+        if first_house and 'error' not in first_house:
+            ascendant = first_house['cuspal_degree']
+        return lons, ascendant
+
+    def get_all_divisional_charts(self):
+        """
+        Compute all sixteen Shodashvarga charts at once.
+        Returns {division: {planet: {"longitude", "sign", "degree"}}}, with a
+        "Lagna" entry when the natal chart has house cusps.
+        """
+        lons, ascendant = self._longitudes()
+        available = ~np.isnan(lons)
+        signs, degrees = chart_vargas(np.where(available, lons, 0.0), ascendant)
+        charts = vargas_to_dict(signs, degrees)
+        for i, planet in enumerate(PLANETS):
+            if not available[i]:
+                for chart in charts.values():
+                    chart[planet] = {"error": "Planet not available"}
+        self.divisional_positions.update(charts)
+        return charts
+
     def get_divisional_chart(self, division='D9'):
         """
         Compute divisional chart planet positions.
-        Supported: D9, D10, D24
+        Supported: the sixteen Shodashvarga charts in DIVISIONAL_CHARTS (D1-D60)
         """
-        if division not in DIVISIONAL_CHARTS:
+        if division not in DIVISIONAL_CHARTS or division not in SHODASHVARGA:
             raise ValueError(f"{division} not supported")
-
-        self.divisional_positions[division] = {}
-
-        for planet in PLANETS:
-            planet_info = self.natal_chart.planet_positions.get(planet)
-            if not planet_info or 'error' in planet_info:
-                self.divisional_positions[division][planet] = {"error": "Planet not available"}
-                continue
-
-            # Get longitude from natal chart
-            lon = planet_info['longitude']
-
-            # Compute divisional longitude
-            divisional_lon = self._compute_divisional_longitude(lon, division)
-            # Determine sign and degree in divisional chart
-            sign_index = int(divisional_lon // 30) % 12
-            degree_in_sign = divisional_lon % 30
-
-            self.divisional_positions[division][planet] = {
-                "longitude": divisional_lon,
-                "sign": sign_index,  # 0-Aries, 1-Taurus, etc.
-                "degree": degree_in_sign
-            }
-
+        if division not in self.divisional_positions:
+            self.get_all_divisional_charts()
         return self.divisional_positions[division]
 
-    def _compute_divisional_longitude(self, lon, division):
-        """
-        Computes the planet's longitude in the divisional chart.
-        Uses classical method: divide each sign into n parts based on division.
-        """
-        if division == 'D9':
-            # Navamsa: 1 sign = 9 parts → each 3°20'
-            part_size = 3 + 20/60  # degrees
-            divisional_lon = (lon // part_size) * part_size % 360
-        elif division == 'D10':
-            # Dasamsa: 1 sign = 10 parts → each 3°
-            part_size = 3  # degrees
-            divisional_lon = (lon // part_size) * part_size % 360
-        elif division == 'D24':
-            # Siddhamsa: 1 sign = 24 parts → each 1°15'
-            part_size = 1 + 15/60
-            divisional_lon = (lon // part_size) * part_size % 360
-        else:
-            divisional_lon = lon  # fallback
-        return divisional_lon
-
     def print_divisional_chart(self, division='D9'):
         chart = self.divisional_positions.get(division)
         if not chart:
@@ -0,0 +1,224 @@
+# AstroAgent/charts/ephemeris.py
+
+import numpy as np
+
+from config import PLANETS, ZODIAC_SIGNS, HOUSES
+from charts import chebyshev_ephemeris
+from utils import metrics
+from utils.optional_imports import optional_module
+
+# Column order of every (N, 9) array returned here follows config.PLANETS
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+RAHU = PLANET_INDEX["Rahu"]
+KETU = PLANET_INDEX["Ketu"]
+
+J2000 = np.datetime64("2000-01-01T12:00:00", "us")
+J2000_JD = 2451545.0
+MICROSECONDS_PER_DAY = 86400 * 1_000_000
+
+
+def _body_ids():
+    """
+    Swiss Ephemeris body ids for every planet except Ketu,
+    which is always derived as the point opposite Rahu (mean node).
+    """
+    swe = optional_module("swisseph")
+    ids = {}
+    for planet in PLANETS:
+        if planet == "Rahu":
+            ids[planet] = swe.MEAN_NODE
+        elif planet != "Ketu":
+            ids[planet] = getattr(swe, planet.upper())
+    return ids
+
+
+def julian_days(datetimes):
+    """
+    Convert a sequence of naive (UT) datetimes into a float64 array of Julian days.
+    Matches swe.julday for Gregorian dates, but runs as a single array operation.
+    """
+    stamps = np.asarray(datetimes, dtype="datetime64[us]")
+    micros = (stamps - J2000).astype(np.int64)
+    return J2000_JD + micros / MICROSECONDS_PER_DAY
+
+
+def datetimes_from_jd(jd):
+    """Inverse of julian_days: datetime64[us] array (UT) for an array of Julian days."""
+    micros = np.round((np.asarray(jd, dtype=np.float64) - J2000_JD) * MICROSECONDS_PER_DAY)
+    return J2000 + micros.astype("timedelta64[us]")
+
+
+def body_positions(planet, jd, backend="auto"):
+    """
+    (longitudes, speeds) of one planet over an array of Julian days, from the
+    Chebyshev tables (vectorized) or swisseph (one call per instant).
+    """
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    if backend == "auto":
+        backend = available_backend(jd)
+    metrics.incr("ephemeris_evaluations_total", len(jd), backend=str(backend))
+    if backend == "chebyshev":
+        return chebyshev_ephemeris.load_default().body_positions(planet, jd)
+    swe = optional_module("swisseph")
+    if backend is None or swe is None:
+        raise RuntimeError("Ephemeris needs pyswisseph or built Chebyshev tables")
+
+    body = swe.MEAN_NODE if planet in ("Rahu", "Ketu") else getattr(swe, planet.upper())
+    lons = np.empty(len(jd))
+    speeds = np.empty(len(jd))
+    for i, t in enumerate(jd.tolist()):
+        xx = swe.calc_ut(t, body, swe.FLG_SPEED)[0]
+        lons[i], speeds[i] = xx[0], xx[3]
+    if planet == "Ketu":
+        lons = (lons + 180.0) % 360.0
+    return lons, speeds
+
+
+def planet_positions(jd, backend="auto"):
+    """(longitudes, speeds) of all nine planets, each (N, 9), for an array of Julian days."""
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    if backend == "auto":
+        backend = available_backend(jd)
+    metrics.incr("ephemeris_evaluations_total", len(jd) * len(PLANETS), backend=str(backend))
+    if backend == "chebyshev":
+        return chebyshev_ephemeris.load_default().positions(jd)
+    swe = optional_module("swisseph")
+    if backend is None or swe is None:
+        raise RuntimeError("Ephemeris needs pyswisseph or built Chebyshev tables")
+
+    body_ids = _body_ids()
+    lons = np.empty((len(jd), len(PLANETS)), dtype=np.float64)
+    speeds = np.empty((len(jd), len(PLANETS)), dtype=np.float64)
+    for i, t in enumerate(jd.tolist()):
+        for planet, body in body_ids.items():
+            xx = swe.calc_ut(t, body, swe.FLG_SPEED)[0]
+            col = PLANET_INDEX[planet]
+            lons[i, col] = xx[0]
+            speeds[i, col] = xx[3]
+    lons[:, KETU] = lons[:, RAHU] + 180.0
+    speeds[:, KETU] = speeds[:, RAHU]
+    return lons % 360.0, speeds
+
+
+def assign_houses(longitudes, cusps):
+    """
+    longitudes: (N, P) ecliptic longitudes
+    cusps: (N, 12) house cusps, cusp 1 first
+    Returns (N, P) int8 house numbers 1-12: each planet falls in the house
+    whose cusp it passed most recently, wrapping correctly through 0° Aries.
+    """
+    offsets = (longitudes[:, :, None] - cusps[:, None, :]) % 360.0
+    return (np.argmin(offsets, axis=2) + 1).astype(np.int8)
+
+
+def ascendant_and_equal_cusps(jd, latitudes, longitudes):
+    """
+    Vectorized ascendant from sidereal time and obliquity, with equal-house cusps.
+    Used when swisseph is not installed; agrees with swe.houses to ~0.01°
+    for the ascendant (no nutation), but cusps are equal houses, not Placidus.
+    Returns (ascendant (N,), cusps (N, 12)).
+    """
+    t = (jd - J2000_JD) / 36525.0
+    gmst = 280.46061837 + 360.98564736629 * (jd - J2000_JD) + 0.000387933 * t * t - t ** 3 / 38710000.0
+    ramc = np.radians((gmst + longitudes) % 360.0)
+    eps = np.radians(23.4392911 - 0.0130042 * t)
+    phi = np.radians(latitudes)
+    asc = np.degrees(np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps)))) % 360.0
+    cusps = (asc[:, None] + 30.0 * np.arange(12)) % 360.0
+    return asc, cusps
+
+
+def house_cusps(jd, latitudes, longitudes, house_system=b"P"):
+    """
+    (ascendant (N,), cusps (N, 12)) for arrays of Julian days and places:
+    swe.houses per instant, or equal houses from ascendant_and_equal_cusps
+    when swisseph is not installed.
+    """
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    n = len(jd)
+    lats = np.broadcast_to(np.asarray(latitudes, dtype=np.float64), (n,))
+    lons = np.broadcast_to(np.asarray(longitudes, dtype=np.float64), (n,))
+    swe = optional_module("swisseph")
+    metrics.incr("house_calculations_total", n, method="swisseph" if swe is not None else "equal")
+    if swe is None:
+        return ascendant_and_equal_cusps(jd, lats, lons)
+    cusps = np.empty((n, 12), dtype=np.float64)
+    ascendant = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        chart_cusps, ascmc = swe.houses(float(jd[i]), float(lats[i]), float(lons[i]), house_system)
+        cusps[i] = chart_cusps[:12]
+        ascendant[i] = ascmc[0]
+    return ascendant, cusps
+
+
+def available_backend(jd=None):
+    """
+    Name of the backend compute_positions_batch would pick for "auto":
+    the precomputed Chebyshev tables when built and covering jd, else swisseph.
+    Returns None when neither is available.
+    """
+    table = chebyshev_ephemeris.load_default()
+    if table is not None and (jd is None or table.covers(jd)):
+        return "chebyshev"
+    if optional_module("swisseph") is not None:
+        return "swisseph"
+    return None
+
+
+def compute_positions_batch(datetimes, latitudes=None, longitudes=None, house_system=b"P", backend="auto"):
+    """
+    Compute planetary positions for many births in one call.
+
+    datetimes: sequence of N naive UT datetimes
+    latitudes, longitudes: sequences of N floats (or scalars broadcast to N).
+        When None, houses are not computed and every planet is placed in house 1.
+    backend: "swisseph", "chebyshev" (precomputed tables, see
+        charts/chebyshev_ephemeris.py) or "auto" to prefer the tables when they
+        cover every date. Without swisseph, houses fall back to equal houses.
+
+    Returns a dict of NumPy arrays (planet axis ordered as config.PLANETS):
+        julian_day (N,), longitudes (N, 9), speeds (N, 9),
+        signs (N, 9) int8 0-11, houses (N, 9) int8 1-12,
+        cusps (N, 12), ascendant (N,)
+    House cusps are computed once per chart and shared by all nine planets.
+    """
+    jd = julian_days(datetimes)
+    n = len(jd)
+    with_houses = latitudes is not None and longitudes is not None
+
+    cusps = np.zeros((n, 12), dtype=np.float64)
+    ascendant = np.zeros(n, dtype=np.float64)
+
+    with metrics.stage("positions"):
+        planet_lons, planet_speeds = planet_positions(jd, backend)
+
+    if with_houses:
+        ascendant, cusps = house_cusps(jd, latitudes, longitudes, house_system)
+        houses = assign_houses(planet_lons, cusps)
+    else:
+        houses = np.ones((n, len(PLANETS)), dtype=np.int8)
+
+    return {
+        "julian_day": jd,
+        "longitudes": planet_lons,
+        "speeds": planet_speeds,
+        "signs": (planet_lons // 30).astype(np.int8),
+        "houses": houses,
+        "cusps": cusps,
+        "ascendant": ascendant,
+    }
+
+
+def batch_to_dicts(batch, index):
+    """
+    Convert one row of a compute_positions_batch result into the
+    (planets_in_houses, planets_with_signs) dict pair used by the analyzers.
+    """
+    planets_in_houses = {}
+    planets_with_signs = {}
+    signs = batch["signs"][index]
+    houses = batch["houses"][index]
+    for col, planet in enumerate(PLANETS):
+        planets_with_signs[planet] = ZODIAC_SIGNS[signs[col]]
+        planets_in_houses.setdefault(HOUSES[houses[col] - 1], []).append(planet)
+    return planets_in_houses, planets_with_signs
@@ -0,0 +1,199 @@
+# AstroAgent/charts/events.py
+"""
+Streaming finder for sign ingresses, nakshatra transitions, retrograde and
+direct stations, and exact aspects over arbitrary date ranges.
+
+The range is scanned in chunks. Within a chunk every body is sampled on a
+fixed grid (fine enough that the Moon cannot cross two nakshatras between
+samples), events are bracketed from the samples, and every bracket is then
+refined together by vectorized Illinois (false position) root finding. With the
+Chebyshev tables built (charts/chebyshev_ephemeris.py) a 200-year scan takes
+seconds; find_events_parallel() spreads chunks over a process pool.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from config import PLANETS, ZODIAC_SIGNS, NAKSHATRAS
+from charts.aspects import VEDIC_ASPECTS
+from charts.ephemeris import julian_days, datetimes_from_jd, planet_positions, body_positions
+
+EVENT_KINDS = ("ingress", "nakshatra", "station", "aspect")
+NAKSHATRA_SPAN = 360.0 / 27
+
+# Moon moves at most ~15.4°/day: 6 hours keeps it well inside one nakshatra
+SAMPLE_STEP_DAYS = 0.25
+REFINE_ITERATIONS = 8  # Illinois iterations; well below a second on 6-hour brackets
+
+# Bodies whose speed can change sign (Sun, Moon and the mean nodes never station)
+STATIONING = ("Mars", "Mercury", "Jupiter", "Venus", "Saturn")
+
+# detail by kind: "ingress" the sign entered, "nakshatra" the nakshatra
+# entered, "station" (direction "retrograde" | "direct", longitude),
+# "aspect" (target planet, angle)
+Event = namedtuple("Event", ["time", "julian_day", "kind", "planet", "detail"])
+
+
+def _wrap180(x):
+    return (x + 180.0) % 360.0 - 180.0
+
+
+def _boundary_crossings(t, unwrapped, width, offset=0.0):
+    """
+    Brackets where an unwrapped longitude series crosses offset + k * width.
+    Returns (bracket indexes into t, crossed boundary values, direction +1/-1).
+    """
+    k = np.floor((unwrapped - offset) / width)
+    idx = np.nonzero(np.diff(k))[0]
+    direction = np.sign(k[idx + 1] - k[idx])
+    boundary = offset + width * np.maximum(k[idx], k[idx + 1])
+    return idx, boundary, direction
+
+
+class _Brackets:
+    """
+    Accumulates brackets of every kind so they can all be refined by one
+    vectorized root finder. Each bracket's residual is either the speed of a
+    body, or the wrapped longitude of a body (minus another body's
+    longitude for aspects) minus a target value.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.meta = []
+
+    def add(self, a, b, body, other, target, use_speed, kind, planet, details):
+        n = len(a)
+        self.parts.append((a, b, np.full(n, body), np.full(n, other), np.broadcast_to(target, (n,)),
+                           np.full(n, use_speed)))
+        self.meta.extend((kind, planet, detail) for detail in details)
+
+    def refine(self, backend, iterations=REFINE_ITERATIONS):
+        """
+        Illinois (modified false position) on every bracket at once. Each
+        iteration evaluates a body only at the brackets that involve it.
+        """
+        if not self.parts:
+            return np.empty(0)
+        a, b, body, other, target, use_speed = (np.concatenate(cols) for cols in zip(*self.parts))
+        groups = [(p, np.nonzero(body == p)[0], np.nonzero(other == p)[0]) for p in range(len(PLANETS))]
+
+        def residual(times):
+            value = np.zeros(len(times))
+            for p, primary, secondary in groups:
+                if len(primary) == 0 and len(secondary) == 0:
+                    continue
+                needed = np.union1d(primary, secondary)
+                lons, speeds = body_positions(PLANETS[p], times[needed], backend)
+                where = np.searchsorted(needed, primary)
+                value[primary] += np.where(use_speed[primary], speeds[where], lons[where])
+                value[secondary] -= lons[np.searchsorted(needed, secondary)]
+            return np.where(use_speed, value, _wrap180(value - target))
+
+        fa, fb = residual(a), residual(b)
+        side = np.zeros(len(a), dtype=np.int8)
+        c = 0.5 * (a + b)
+        for _ in range(iterations):
+            denom = fb - fa
+            c = np.where(denom != 0, b - fb * (b - a) / np.where(denom != 0, denom, 1.0), 0.5 * (a + b))
+            fc = residual(c)
+            left = np.sign(fc) == np.sign(fa)   # root lies in [c, b]
+            # Illinois: halve the value of an endpoint kept twice in a row
+            fb = np.where(left & (side == 1), 0.5 * fb, fb)
+            fa = np.where(~left & (side == -1), 0.5 * fa, fa)
+            a, fa = np.where(left, c, a), np.where(left, fc, fa)
+            b, fb = np.where(left, b, c), np.where(left, fb, fc)
+            side = np.where(left, 1, -1).astype(np.int8)
+        return c
+
+
+def scan_chunk(start_jd, end_jd, planets=PLANETS, kinds=EVENT_KINDS, backend="auto"):
+    """
+    All events with start_jd < time <= end_jd, sorted by time.
+    Returns a list of Event tuples (module-level so process pools can pickle it).
+    """
+    t = np.arange(start_jd, end_jd, SAMPLE_STEP_DAYS)
+    t = np.append(t, end_jd) if t[-1] < end_jd else t
+    lons, speeds = planet_positions(t, backend)
+    unwrapped = np.unwrap(lons, period=360.0, axis=0)
+    col = {p: PLANETS.index(p) for p in PLANETS}
+    brackets = _Brackets()
+
+    for planet in planets:
+        u = unwrapped[:, col[planet]]
+        if "ingress" in kinds:
+            idx, boundary, direction = _boundary_crossings(t, u, 30.0)
+            entered = ((boundary // 30).astype(int) - (direction < 0)) % 12
+            brackets.add(t[idx], t[idx + 1], col[planet], -1, boundary % 360.0, False,
+                         "ingress", planet, [ZODIAC_SIGNS[s] for s in entered])
+        if "nakshatra" in kinds:
+            idx, boundary, direction = _boundary_crossings(t, u, NAKSHATRA_SPAN)
+            entered = (np.round(boundary / NAKSHATRA_SPAN).astype(int) - (direction < 0)) % 27
+            brackets.add(t[idx], t[idx + 1], col[planet], -1, boundary % 360.0, False,
+                         "nakshatra", planet, [NAKSHATRAS[n] for n in entered])
+        if "station" in kinds and planet in STATIONING:
+            speed = speeds[:, col[planet]]
+            idx = np.nonzero(np.diff(np.sign(speed)) != 0)[0]
+            for i in idx:
+                direction = "retrograde" if speed[i] > 0 else "direct"
+                brackets.add(t[i:i + 1], t[i + 1:i + 2], col[planet], -1, 0.0, True,
+                             "station", planet, [direction])
+
+    if "aspect" in kinds:
+        for source in planets:
+            for target in planets:
+                if source == target or {source, target} == {"Rahu", "Ketu"}:
+                    continue
+                angles = {30.0 * (n - 1) for n in VEDIC_ASPECTS.get(source, [])}
+                if col[source] < col[target]:
+                    angles.add(0.0)  # conjunction, once per pair
+                separation = unwrapped[:, col[target]] - unwrapped[:, col[source]]
+                for angle in sorted(angles):
+                    idx, _, _ = _boundary_crossings(t, separation, 360.0, angle)
+                    brackets.add(t[idx], t[idx + 1], col[target], col[source], angle, False,
+                                 "aspect", source, [(target, int(angle))] * len(idx))
+
+    times = brackets.refine(backend)
+    stamps = datetimes_from_jd(times).astype(datetime)
+    station_lons = planet_positions(times, backend)[0] if len(times) else None
+    events = []
+    for i, (kind, planet, detail) in enumerate(brackets.meta):
+        if kind == "station":
+            detail = (detail, round(float(station_lons[i, col[planet]]), 4))
+        events.append(Event(stamps[i], float(times[i]), kind, planet, detail))
+    events.sort(key=lambda e: e.julian_day)
+    return events
+
+
+def _chunks(start, end, chunk_days):
+    start_jd, end_jd = julian_days([start, end])
+    edges = np.append(np.arange(start_jd, end_jd, chunk_days), end_jd)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def find_events(start, end, planets=PLANETS, kinds=EVENT_KINDS, chunk_days=365.25, backend="auto"):
+    """
+    Generator over Event tuples between two UT datetimes, in time order.
+    Only one chunk of samples is held in memory at a time.
+    """
+    for start_jd, end_jd in _chunks(start, end, chunk_days):
+        yield from scan_chunk(start_jd, end_jd, planets, kinds, backend)
+
+
+def _scan_chunk_args(args):
+    return scan_chunk(*args)
+
+
+def find_events_parallel(start, end, planets=PLANETS, kinds=EVENT_KINDS, chunk_days=365.25,
+                         backend="auto", workers=None):
+    """
+    Like find_events, but chunks are scanned on a process pool (workers=None
+    uses every core). Results are still yielded in time order.
+    """
+    jobs = [(a, b, tuple(planets), tuple(kinds), backend) for a, b in _chunks(start, end, chunk_days)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for events in pool.map(_scan_chunk_args, jobs):
+            yield from events
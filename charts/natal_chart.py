@@ -1,11 +1,9 @@
 # AstroAgent/charts/natal_chart.py
 
-from flatlib.chart import Chart
-from flatlib.datetime import Datetime
-from flatlib.geopos import GeoPos
-from flatlib import const
+from functools import cached_property
 
 from config import PLANETS, HOUSES
+from charts.chart_state import ChartState
 
 class NatalChart:
     def __init__(self, birth_date, birth_time, timezone, latitude, longitude):
@@ -21,11 +19,31 @@ class NatalChart:
         self.timezone = timezone
         self.latitude = latitude
         self.longitude = longitude
-        self.chart = self._generate_chart()
-        self.planet_positions = self._get_planet_positions()
-        self.house_positions = self._get_house_positions()
+        # chart, planet_positions, house_positions and state are built on first access
+
+    @cached_property
+    def chart(self):
+        return self._generate_chart()
+
+    @cached_property
+    def planet_positions(self):
+        return self._get_planet_positions()
+
+    @cached_property
+    def house_positions(self):
+        return self._get_house_positions()
+
+    @cached_property
+    def state(self):
+        """The chart as a ChartState (fixed-width arrays, lazy vargas)."""
+        ascendant = self.house_positions[HOUSES[0]].get("cuspal_degree")
+        return ChartState.from_planet_positions(self.planet_positions, ascendant=ascendant)
 
     def _generate_chart(self):
+        from flatlib.chart import Chart
+        from flatlib.datetime import Datetime
+        from flatlib.geopos import GeoPos
+
         dt = Datetime(f"{self.birth_date} {self.birth_time}", self.timezone)
         pos = GeoPos(self.latitude, self.longitude)
         chart = Chart(dt, pos)
@@ -46,16 +64,17 @@ class NatalChart:
         return positions
 
     def _get_house_positions(self):
+        from flatlib import const
         houses = {}
         for i in range(1, 13):
             try:
                 house = self.chart.get(const.HOUSES[i-1])
-                houses[f"{i}th House"] = {
+                houses[HOUSES[i-1]] = {
                     "sign": house.sign,
                     "cuspal_degree": float(house.lon)
                 }
             except Exception as e:
-                houses[f"{i}th House"] = {"error": str(e)}
+                houses[HOUSES[i-1]] = {"error": str(e)}
         return houses
 
     def print_chart(self):
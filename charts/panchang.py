@@ -0,0 +1,249 @@
+# AstroAgent/charts/panchang.py
+"""
+Nakshatra and pada of the Moon, and the daily panchang, as arrays.
+
+nakshatra_pada() splits any Moon longitudes into the 27 nakshatras of
+13°20' and their four padas of 3°20'; moon_nakshatra() does it for a birth
+from the ephemeris, which is how rules_engine.dashas seeds the balance of
+the first mahadasha.
+
+daily_panchang() gives, for C locations over D consecutive days, the five
+limbs at local sunrise plus sunrise and sunset themselves, every field a
+(C, D) array:
+
+    tithi    1-30, elongation Moon - Sun in steps of 12° (1-15 Shukla)
+    yoga     0-26, Sun + Moon in steps of 13°20' (YOGAS)
+    karana   0-10, half tithis of 6° (KARANAS; 7 movable, 4 fixed)
+    vara     0-6, Sunday first (VARAS)
+    nakshatra 0-26 (config.NAKSHATRAS)
+
+Sunrise and sunset come from a closed-form solar position (~0.01°, about
+a minute of time) and the standard -0.833° altitude; the Sun and Moon at
+sunrise come from the ephemeris in one vectorized call per body. Days are
+civil days in local mean time (from the location's longitude), so no time
+zone data is needed. Where the Sun does not rise or set (polar day and
+night) sunrise/sunset are NaN and the limbs are taken at local noon.
+
+The ephemeris longitudes are tropical. Nakshatras, padas and yogas are
+sidereal: the Lahiri ayanamsa at each instant is subtracted unless an
+ayanamsa (degrees) is given; pass 0.0 for longitudes that are already
+sidereal. Tithi and karana do not depend on it.
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+
+from config import NAKSHATRAS
+from charts.ephemeris import J2000_JD, available_backend, body_positions, datetimes_from_jd, julian_days
+
+NAKSHATRA_SPAN = 360.0 / 27
+PADA_SPAN = NAKSHATRA_SPAN / 4
+TITHI_SPAN = 12.0
+KARANA_SPAN = 6.0
+
+TITHIS = (
+    "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi", "Saptami", "Ashtami",
+    "Navami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi",
+)
+# tithi 1-30 -> name; the 15th is Purnima in Shukla and Amavasya in Krishna paksha
+TITHI_NAMES = TITHIS + ("Purnima",) + TITHIS + ("Amavasya",)
+YOGAS = (
+    "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda", "Sukarma", "Dhriti",
+    "Shula", "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata",
+    "Variyana", "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti",
+)
+KARANAS = (
+    "Bava", "Balava", "Kaulava", "Taitila", "Garaja", "Vanija", "Vishti",   # movable
+    "Shakuni", "Chatushpada", "Naga", "Kimstughna",                         # fixed
+)
+VARAS = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+
+# Half tithi 0-59 -> KARANAS index: Kimstughna opens the month, the movable
+# seven repeat eight times, Shakuni, Chatushpada and Naga close it
+KARANA_OF_HALF = np.array([10] + [k % 7 for k in range(56)] + [7, 8, 9], dtype=np.int8)
+
+SUNRISE_ALTITUDE = -0.833     # refraction plus the solar semi-diameter
+LAHIRI_J2000 = 23.857         # degrees at J2000
+PRECESSION_PER_DAY = 50.29 / 3600.0 / 365.25
+
+
+def nakshatra_pada(moon_longitudes, ayanamsa=0.0):
+    """
+    moon_longitudes: array (any shape) of Moon longitudes
+    Returns (nakshatra int8 0-26, pada int8 1-4, elapsed), elapsed being the
+    fraction 0-1 of the nakshatra already traversed.
+    """
+    lon = (np.asarray(moon_longitudes, dtype=np.float64) - ayanamsa) % 360.0
+    position = lon / NAKSHATRA_SPAN
+    nakshatra = np.minimum(position.astype(np.int8), 26)
+    elapsed = position - nakshatra
+    pada = (np.minimum(elapsed * 4, 3.999).astype(np.int8) + 1)
+    return nakshatra, pada, elapsed
+
+
+def lahiri_ayanamsa(jd):
+    """Approximate Lahiri ayanamsa in degrees (linear precession; ~0.01° over 1900-2100)."""
+    return LAHIRI_J2000 + (np.asarray(jd, dtype=np.float64) - J2000_JD) * PRECESSION_PER_DAY
+
+
+def resolve_ayanamsa(ayanamsa, jd):
+    """
+    ayanamsa as given, or the Lahiri ayanamsa at jd (scalar or array) when it
+    is None. Raises ValueError when neither is known.
+    """
+    if ayanamsa is not None:
+        return ayanamsa
+    if jd is None:
+        raise ValueError("Julian day unknown: pass ayanamsa (0.0 for sidereal longitudes)")
+    return lahiri_ayanamsa(jd)
+
+
+def moon_longitude(when, backend="auto"):
+    """Moon longitude at a naive UT datetime, or None without an ephemeris backend."""
+    jd = julian_days([when])
+    if backend == "auto":
+        backend = available_backend(jd)
+    if backend is None:
+        return None
+    return float(body_positions("Moon", jd, backend)[0][0])
+
+
+def moon_nakshatra(when, ayanamsa=None, backend="auto"):
+    """
+    {"nakshatra", "index", "pada", "elapsed", "moon_longitude"} of the Moon at
+    a naive UT datetime, or None without an ephemeris backend. moon_longitude
+    is tropical; ayanamsa defaults to Lahiri at that instant.
+    """
+    lon = moon_longitude(when, backend)
+    if lon is None:
+        return None
+    index, pada, elapsed = nakshatra_pada(lon, resolve_ayanamsa(ayanamsa, julian_days([when])[0]))
+    return {
+        "nakshatra": NAKSHATRAS[int(index)],
+        "index": int(index),
+        "pada": int(pada),
+        "elapsed": float(elapsed),
+        "moon_longitude": lon,
+    }
+
+
+def solar_coordinates(jd):
+    """
+    Closed-form apparent Sun (Astronomical Almanac low-precision formulae):
+    returns (declination, equation of time) in degrees for an array of Julian days.
+    """
+    n = jd - J2000_JD
+    mean_lon = 280.460 + 0.9856474 * n
+    anomaly = np.radians(357.528 + 0.9856003 * n)
+    lam = np.radians(mean_lon + 1.915 * np.sin(anomaly) + 0.020 * np.sin(2 * anomaly))
+    eps = np.radians(23.439 - 0.0000004 * n)
+    sin_lam = np.sin(lam)
+    ra = np.degrees(np.arctan2(np.cos(eps) * sin_lam, np.cos(lam)))
+    dec = np.degrees(np.arcsin(np.sin(eps) * sin_lam))
+    eot = (mean_lon - ra + 180.0) % 360.0 - 180.0
+    return dec, eot
+
+
+def _hour_angle(dec, sin_phi, cos_phi):
+    """Half the day arc in days; NaN where the Sun stays above or below the horizon."""
+    dec = np.radians(dec)
+    cos_h = (np.sin(np.radians(SUNRISE_ALTITUDE)) - sin_phi * np.sin(dec)) / (cos_phi * np.cos(dec))
+    with np.errstate(invalid="ignore"):
+        return np.degrees(np.arccos(np.where(np.abs(cos_h) <= 1.0, cos_h, np.nan))) / 360.0
+
+
+def sunrise_sunset(local_noon, latitudes, iterations=2):
+    """
+    local_noon: (C, D) Julian days of local mean noon (UT)
+    latitudes: (C,) degrees north
+    Returns (sunrise, sunset, transit) as (C, D) Julian days (UT).
+    """
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))[:, None]
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    dec, eot = solar_coordinates(local_noon)
+    transit = local_noon - eot / 360.0
+    half = _hour_angle(dec, sin_phi, cos_phi)
+    rise, set_ = transit - half, transit + half
+    # Refine each event with the Sun's position at that event
+    for _ in range(iterations):
+        valid = np.isfinite(rise)
+        at_rise = np.where(valid, rise, local_noon)
+        at_set = np.where(valid, set_, local_noon)
+        dec, eot = solar_coordinates(at_rise)
+        rise = local_noon - eot / 360.0 - _hour_angle(dec, sin_phi, cos_phi)
+        dec, eot = solar_coordinates(at_set)
+        set_ = local_noon - eot / 360.0 + _hour_angle(dec, sin_phi, cos_phi)
+    return rise, set_, transit
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def daily_panchang(start, days, latitudes, longitudes, ayanamsa=None, backend="auto"):
+    """
+    Panchang for C locations over days consecutive local dates from start.
+
+    start: date, datetime or "YYYY-MM-DD"
+    latitudes, longitudes: (C,) degrees (east positive)
+    ayanamsa: degrees subtracted for nakshatra and yoga (scalar); Lahiri at
+        each sunrise when None
+    Returns a dict of (C, D) arrays: sunrise, sunset (UT Julian days),
+    tithi, yoga, karana, nakshatra, pada, vara (int8); plus dates (D,)
+    datetime64[D].
+    """
+    lats = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+    lons = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+    dates = np.datetime64(_as_date(start), "D") + np.arange(days)
+    midnight = julian_days(dates)                                   # UT midnight of each date
+    local_noon = midnight[None, :] + 0.5 - lons[:, None] / 360.0     # local mean noon, (C, D)
+
+    sunrise, sunset, transit = sunrise_sunset(local_noon, lats)
+    when = np.where(np.isfinite(sunrise), sunrise, transit).ravel()
+
+    sun = body_positions("Sun", when, backend)[0]
+    moon = body_positions("Moon", when, backend)[0]
+    ayanamsa = resolve_ayanamsa(ayanamsa, when)
+    elongation = (moon - sun) % 360.0
+    half_tithi = np.minimum((elongation / KARANA_SPAN).astype(np.intp), 59)
+    yoga = (((sun + moon - 2.0 * ayanamsa) % 360.0) / NAKSHATRA_SPAN).astype(np.int8)
+    nakshatra, pada, _ = nakshatra_pada(moon, ayanamsa)
+
+    shape = local_noon.shape
+    # Julian day 0 began on a Monday
+    vara = ((np.floor(midnight + 0.5).astype(np.int64) + 1) % 7).astype(np.int8)
+    return {
+        "dates": dates,
+        "sunrise": sunrise,
+        "sunset": sunset,
+        "tithi": (half_tithi // 2 + 1).astype(np.int8).reshape(shape),
+        "yoga": np.minimum(yoga, 26).reshape(shape),
+        "karana": KARANA_OF_HALF[half_tithi].reshape(shape),
+        "nakshatra": nakshatra.reshape(shape),
+        "pada": pada.reshape(shape),
+        "vara": np.broadcast_to(vara, shape),
+    }
+
+
+def panchang_day(panchang, location, day):
+    """One location's day as names: {"date", "vara", "tithi", "paksha", ...}."""
+    tithi = int(panchang["tithi"][location, day])
+    sunrise = panchang["sunrise"][location, day]
+    sunset = panchang["sunset"][location, day]
+    return {
+        "date": str(panchang["dates"][day]),
+        "vara": VARAS[int(panchang["vara"][location, day])],
+        "tithi": TITHI_NAMES[tithi - 1],
+        "paksha": "Shukla" if tithi <= 15 else "Krishna",
+        "nakshatra": NAKSHATRAS[int(panchang["nakshatra"][location, day])],
+        "pada": int(panchang["pada"][location, day]),
+        "yoga": YOGAS[int(panchang["yoga"][location, day])],
+        "karana": KARANAS[int(panchang["karana"][location, day])],
+        "sunrise": None if np.isnan(sunrise) else str(datetimes_from_jd(sunrise)),
+        "sunset": None if np.isnan(sunset) else str(datetimes_from_jd(sunset)),
+    }
@@ -0,0 +1,309 @@
+# AstroAgent/charts/rectification.py
+"""
+Birth-time rectification: sweep candidate birth times around an approximate
+one, find the exact moments the chart changes, and rank the candidates
+against known life events.
+
+    result = rectify(datetime(1990, 5, 17, 4, 30), 25.32, 82.97, window_minutes=120,
+                     events=[("2016-11-20", "marriage"), ("2012-07-01", "career")])
+
+Positions are computed once at the approximate time; over a window of hours
+the slow bodies are carried along by their speeds and only the Moon is
+evaluated per candidate, with house cusps computed per candidate
+(charts.ephemeris.house_cusps). A candidate's state is its lagna sign,
+the house of every planet, the varga signs of the lagna and planets, the
+Moon's nakshatra and the dasha lords on every event date. Wherever two
+neighbouring candidates differ, the change is bisected to within
+precision_seconds, so the window splits into segments of constant state;
+each segment is scored once, at its midpoint.
+
+Scoring (EVENT_SIGNIFICATORS): for each event, every dasha lord running
+on its date scores when it occupies, or rules the sign on, a house
+signifying the event, or is its karaka, weighted by DASHA_LEVEL_WEIGHTS.
+Large sweeps can be spread over a process pool with workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from config import PLANETS, ZODIAC_SIGNS, NAKSHATRAS, SIGN_LORDS
+from charts.ephemeris import (PLANET_INDEX, assign_houses, body_positions, datetimes_from_jd, house_cusps,
+                              julian_days, planet_positions)
+from charts.panchang import lahiri_ayanamsa, nakshatra_pada
+from charts.vargas import chart_vargas, BODIES
+from rules_engine.dashas import DASHA_SEQUENCE, dasha_lords
+
+MOON = PLANET_INDEX["Moon"]
+DEFAULT_VARGAS = ("D9", "D10")
+DASHA_DEPTH = 3
+DASHA_LEVEL_WEIGHTS = np.array([1.0, 2.0, 1.0])      # mahadasha, antardasha, pratyantardasha
+# Candidates per worker task; smaller sweeps run in-process
+PARALLEL_CHUNK = 20_000
+
+# event kind -> (houses signifying it, karaka planets)
+EVENT_SIGNIFICATORS = {
+    "marriage": ((2, 7, 11), ("Venus", "Jupiter")),
+    "divorce": ((6, 8, 12), ("Venus", "Mars", "Rahu")),
+    "career": ((2, 6, 10, 11), ("Sun", "Saturn", "Mercury")),
+    "promotion": ((10, 11), ("Sun", "Jupiter")),
+    "job_loss": ((6, 8, 12), ("Saturn", "Rahu")),
+    "children": ((2, 5, 11), ("Jupiter",)),
+    "education": ((4, 5, 9), ("Mercury", "Jupiter")),
+    "relocation": ((3, 4, 9, 12), ("Rahu", "Moon")),
+    "travel": ((3, 9, 12), ("Rahu", "Moon")),
+    "property": ((4, 11), ("Mars", "Venus")),
+    "wealth": ((2, 11), ("Jupiter", "Venus")),
+    "illness": ((6, 8, 12), ("Saturn", "Mars")),
+    "accident": ((6, 8), ("Mars", "Rahu")),
+    "parent_death": ((4, 8, 9, 10), ("Sun", "Moon", "Saturn")),
+    "spirituality": ((5, 9, 12), ("Jupiter", "Ketu")),
+}
+
+_DASHA_TO_PLANET = np.array([PLANET_INDEX[p] for p in DASHA_SEQUENCE], dtype=np.intp)
+_SIGN_LORD = np.array([PLANET_INDEX[lord] for lord in SIGN_LORDS], dtype=np.intp)
+
+
+def _significator_table(kinds):
+    """(K, 12) house mask and (K, 9) karaka mask for the given event kinds."""
+    houses = np.zeros((len(kinds), 12), dtype=bool)
+    karakas = np.zeros((len(kinds), len(PLANETS)), dtype=bool)
+    for k, kind in enumerate(kinds):
+        if kind not in EVENT_SIGNIFICATORS:
+            raise ValueError(f"Unknown event kind {kind!r}; expected one of {sorted(EVENT_SIGNIFICATORS)}")
+        event_houses, event_karakas = EVENT_SIGNIFICATORS[kind]
+        houses[k, [h - 1 for h in event_houses]] = True
+        karakas[k, [PLANET_INDEX[p] for p in event_karakas]] = True
+    return houses, karakas
+
+
+def _parse_events(events):
+    """[(date, kind, weight)] from (date, kind[, weight]) tuples or {"date", "kind", "weight"} dicts."""
+    parsed = []
+    for event in events or ():
+        if isinstance(event, dict):
+            when, kind, weight = event["date"], event["kind"], event.get("weight", 1.0)
+        else:
+            when, kind, weight = (tuple(event) + (1.0,))[:3]
+        if not isinstance(when, datetime):
+            when = datetime.strptime(str(when)[:10], "%Y-%m-%d")
+        parsed.append((when, kind, float(weight)))
+    return parsed
+
+
+class Sweep:
+    """
+    Chart state at arbitrary instants near a reference time for one place.
+    The reference positions are shared by every evaluation.
+    """
+
+    def __init__(self, reference_jd, latitude, longitude, event_jd=(), vargas=DEFAULT_VARGAS,
+                 house_system=b"P", backend="auto"):
+        self.reference_jd = float(reference_jd)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.event_jd = np.asarray(event_jd, dtype=np.float64)
+        self.vargas = tuple(vargas)
+        self.house_system = house_system
+        self.backend = backend
+        lons, speeds = planet_positions(np.array([self.reference_jd]), backend)
+        self.reference_longitudes, self.speeds = lons[0], speeds[0]
+
+    def longitudes(self, jd):
+        """(N, 9): the Moon from the ephemeris, other bodies moved by their speeds."""
+        dt = jd - self.reference_jd
+        lons = (self.reference_longitudes + dt[:, None] * self.speeds) % 360.0
+        lons[:, MOON] = body_positions("Moon", jd, self.backend)[0]
+        return lons
+
+    def state(self, jd):
+        """
+        Discrete chart state per instant, each value an int array with N rows:
+        lagna (N,), houses (N, 9), vargas (N, 10, V), nakshatra (N,),
+        dashas (N, E, DASHA_DEPTH).
+        """
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        lons = self.longitudes(jd)
+        ascendant, cusps = house_cusps(jd, self.latitude, self.longitude, self.house_system)
+        state = {
+            "lagna": (ascendant // 30).astype(np.int8),
+            "houses": assign_houses(lons, cusps),
+            "nakshatra": nakshatra_pada(lons[:, MOON], lahiri_ayanamsa(jd))[0],
+        }
+        if self.vargas:
+            state["vargas"] = chart_vargas(lons, ascendant, self.vargas, with_degrees=False)[0]
+        if len(self.event_jd):
+            state["dashas"] = dasha_lords(lons[:, MOON], jd, self.event_jd, DASHA_DEPTH)
+        return state
+
+
+def _changed(values, a, b):
+    """(N,) True where rows a and b of a state array differ."""
+    diff = values[a] != values[b]
+    return diff.reshape(len(diff), -1).any(axis=1)
+
+
+def _describe_change(feature, before, after, vargas, event_labels):
+    """Human-readable {"feature", "from", "to"} entries for one changed state array."""
+    changes = []
+    if feature == "lagna":
+        changes.append({"feature": "lagna", "from": ZODIAC_SIGNS[before], "to": ZODIAC_SIGNS[after]})
+    elif feature == "nakshatra":
+        changes.append({"feature": "nakshatra", "from": NAKSHATRAS[before], "to": NAKSHATRAS[after]})
+    elif feature == "houses":
+        for p in np.nonzero(before != after)[0]:
+            changes.append({"feature": f"house:{PLANETS[p]}", "from": int(before[p]), "to": int(after[p])})
+    elif feature == "vargas":
+        for body, v in zip(*np.nonzero(before != after)):
+            changes.append({"feature": f"{vargas[v]}:{BODIES[body]}",
+                            "from": ZODIAC_SIGNS[before[body, v]], "to": ZODIAC_SIGNS[after[body, v]]})
+    elif feature == "dashas":
+        for e in np.nonzero((before != after).any(axis=1))[0]:
+            changes.append({"feature": f"dasha:{event_labels[e]}",
+                            "from": [DASHA_SEQUENCE[l] for l in before[e] if l >= 0],
+                            "to": [DASHA_SEQUENCE[l] for l in after[e] if l >= 0]})
+    return changes
+
+
+def find_boundaries(sweep, jd, state=None, precision_seconds=1.0):
+    """
+    Exact instants where the state changes between consecutive candidates
+    jd (sorted). All brackets are bisected together, one state evaluation
+    per iteration. Returns a sorted list of (julian_day, feature, before, after).
+    """
+    state = state if state is not None else sweep.state(jd)
+    left, features = [], []
+    for feature, values in state.items():
+        idx = np.nonzero(_changed(values, slice(None, -1), slice(1, None)))[0]
+        left.append(idx)
+        features.extend([feature] * len(idx))
+    if not features:
+        return []
+    idx = np.concatenate(left)
+    lo, hi = jd[idx].copy(), jd[idx + 1].copy()
+    before = {feature: values[idx] for feature, values in state.items()}
+
+    width = float(np.max(hi - lo)) * 86400.0
+    iterations = max(int(np.ceil(np.log2(width / precision_seconds))), 0)
+    feature_of = np.array(features)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        mid_state = sweep.state(mid)
+        moved = np.zeros(len(mid), dtype=bool)
+        for feature, values in mid_state.items():
+            rows = feature_of == feature
+            if rows.any():
+                moved[rows] = (values[rows] != before[feature][rows]).reshape(rows.sum(), -1).any(axis=1)
+        lo = np.where(moved, lo, mid)
+        hi = np.where(moved, mid, hi)
+
+    after_state = sweep.state(hi)
+    boundaries = []
+    for i, feature in enumerate(features):
+        boundaries.append((float(hi[i]), feature, before[feature][i], after_state[feature][i]))
+    boundaries.sort(key=lambda b: b[0])
+    return boundaries
+
+
+def score_states(state, kinds, weights):
+    """
+    (N,) event scores of candidate states (see module docstring); 0 without events.
+    kinds and weights are per event, matching the dashas axis of the state.
+    """
+    n = len(state["lagna"])
+    if not kinds:
+        return np.zeros(n)
+    event_houses, karakas = _significator_table(kinds)            # (E, 12), (E, 9)
+    lords = state["dashas"]                                         # (N, E, L)
+    active = lords >= 0
+    planet = _DASHA_TO_PLANET[np.where(active, lords, 0)]           # (N, E, L) column in PLANETS
+    occupied = np.take_along_axis(state["houses"].astype(np.intp) - 1,
+                                  planet.reshape(n, -1), axis=1).reshape(planet.shape)   # house index 0-11
+    e = np.arange(len(kinds))[None, :, None]
+    score = event_houses[e, occupied].astype(np.float64)
+    # houses whose sign (whole signs from the lagna) the lord rules
+    house_sign = (state["lagna"][:, None].astype(np.intp) + np.arange(12)) % 12          # (N, 12)
+    rules = _SIGN_LORD[house_sign][:, None, None, :] == planet[..., None]               # (N, E, L, 12)
+    score += (rules & event_houses[None, :, None, :]).any(axis=-1)
+    score += karakas[e, planet]
+    score *= active
+    levels = DASHA_LEVEL_WEIGHTS[:lords.shape[-1]]
+    return (score * levels).sum(axis=2) @ np.asarray(weights, dtype=np.float64)
+
+
+def _sweep_chunk(args):
+    """Worker task: boundaries within one slice of the candidate grid."""
+    reference_jd, latitude, longitude, event_jd, vargas, house_system, backend, jd, precision = args
+    sweep = Sweep(reference_jd, latitude, longitude, event_jd, vargas, house_system, backend)
+    return find_boundaries(sweep, jd, precision_seconds=precision)
+
+
+def rectify(approximate_time, latitude, longitude, window_minutes=120, step_seconds=60, events=(),
+            vargas=DEFAULT_VARGAS, precision_seconds=1.0, top=10, house_system=b"P", backend="auto",
+            workers=1):
+    """
+    Sweep approximate_time (naive UT) +/- window_minutes in steps of step_seconds.
+
+    events: (date, kind[, weight]) tuples or {"date", "kind", "weight"} dicts;
+        kind is a key of EVENT_SIGNIFICATORS
+    workers: processes for sweeps of more than PARALLEL_CHUNK candidates
+        (None = every core)
+
+    Returns {"candidates", "boundaries", "segments"}: boundaries are the
+    instants where lagna, a planet's house, a varga sign, the Moon's
+    nakshatra or a dasha lord on an event date changes; segments are the
+    spans between them, each scored at its midpoint, best first (top of them).
+    States only change at boundaries, so a change shorter than step_seconds
+    may be missed.
+    """
+    events = _parse_events(events)
+    kinds = [kind for _, kind, _ in events]
+    weights = [weight for _, _, weight in events]
+    _significator_table(kinds)
+    labels = [f"{when.date()} {kind}" for when, kind, _ in events]
+    event_jd = julian_days([when for when, _, _ in events]) if events else np.empty(0)
+    vargas = tuple(vargas)
+
+    reference_jd = float(julian_days([approximate_time])[0])
+    steps = int(window_minutes * 60 // step_seconds)
+    jd = reference_jd + np.arange(-steps, steps + 1) * (step_seconds / 86400.0)
+    sweep = Sweep(reference_jd, latitude, longitude, event_jd, vargas, house_system, backend)
+
+    if workers != 1 and len(jd) > PARALLEL_CHUNK:
+        # Slices share their edge candidate so no change falls between them
+        edges = list(range(0, len(jd) - 1, PARALLEL_CHUNK)) + [len(jd) - 1]
+        jobs = [(reference_jd, latitude, longitude, event_jd, vargas, house_system, backend,
+                 jd[a:b + 1], precision_seconds) for a, b in zip(edges[:-1], edges[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            boundaries = [b for part in pool.map(_sweep_chunk, jobs) for b in part]
+    else:
+        boundaries = find_boundaries(sweep, jd, precision_seconds=precision_seconds)
+
+    # Segments between distinct boundary instants, scored at their midpoints
+    cuts = np.array([b[0] for b in boundaries])
+    if len(cuts):
+        cuts = cuts[np.concatenate([[True], np.diff(cuts) * 86400.0 > precision_seconds])]
+    edges = np.concatenate([[jd[0]], cuts, [jd[-1]]])
+    middle = 0.5 * (edges[:-1] + edges[1:])
+    state = sweep.state(middle)
+    scores = score_states(state, kinds, weights)
+    starts, ends = datetimes_from_jd(edges[:-1]).tolist(), datetimes_from_jd(edges[1:]).tolist()
+    segments = [{
+        "start": starts[i],
+        "end": ends[i],
+        "minutes": float((edges[i + 1] - edges[i]) * 1440.0),
+        "score": float(scores[i]),
+        "lagna": ZODIAC_SIGNS[state["lagna"][i]],
+        "nakshatra": NAKSHATRAS[state["nakshatra"][i]],
+    } for i in range(len(middle))]
+    segments.sort(key=lambda seg: (-seg["score"], abs((seg["start"] - approximate_time).total_seconds())))
+
+    return {
+        "candidates": len(jd),
+        "boundaries": [{"time": datetimes_from_jd(t).item(),
+                        "offset_minutes": (t - reference_jd) * 1440.0,
+                        "changes": _describe_change(feature, before, after, vargas, labels)}
+                       for t, feature, before, after in boundaries],
+        "segments": segments[:top] if top else segments,
+    }
@@ -0,0 +1,288 @@
+# AstroAgent/charts/shadbala.py
+"""
+Shadbala (six-fold planetary strength) for any number of charts as float
+arrays, in virupas (60 virupas = 1 rupa), for the seven planets Sun-Saturn.
+
+    sthana      positional: uchcha (distance from debilitation / 3),
+                saptavargaja (dignity in D1, D2, D3, D7, D9, D12, D30 by
+                compound friendship with the sign lord), ojhayugma (odd /
+                even sign in D1 and D9), kendradi and drekkana bala
+    dig         directional: 60 at the planet's strong angle, 0 opposite
+    kala        temporal: nathonnatha, paksha, ayana and vara bala
+    cheshta     motional: from the daily motion relative to the mean
+                (vakra 60 ... sama 7.5); Sun's is its ayana, Moon's its
+                paksha bala
+    naisargika  natural, fixed per planet
+    drik        aspectual: a quarter of the sphuta drishti received from
+                benefics less that from malefics
+
+Hora, abda and masa lords, tribhaga and yuddha bala need sunrise and
+calendar data the charts do not carry, so they are left out of kala bala.
+Declinations for ayana bala use the longitudes as given (tropical, as
+charts.ephemeris returns them).
+
+Every fixed relationship (dignities, friendships, strong points, drishti
+breakpoints, motion bands) is a small table built once at import; a batch
+of N charts is a fixed number of array operations:
+
+    result = shadbala_batch(longitudes, speeds, ascendant, julian_day)
+    result["total"]   # (N, 7) virupas; also each component, "rupas", "ratio"
+"""
+
+import numpy as np
+
+from config import PLANETS, SIGN_LORDS
+from charts.vargas import varga_positions
+
+GRAHAS = tuple(PLANETS[:7])
+_G = {planet: i for i, planet in enumerate(GRAHAS)}
+COMPONENTS = ("sthana", "dig", "kala", "cheshta", "naisargika", "drik")
+
+# Deep exaltation points (longitude); debilitation is opposite
+EXALTATION = np.array([10.0, 33.0, 298.0, 165.0, 95.0, 357.0, 200.0])
+# Moolatrikona (sign, start degree, end degree)
+MOOLATRIKONA = ((4, 0, 20), (1, 3, 30), (0, 0, 12), (5, 15, 20), (8, 0, 10), (6, 0, 15), (10, 0, 20))
+# Classical dignity signs of the seven grahas, from the tables above:
+# {planet: {"exalted": sign, "debilitated": sign, "moolatrikona": sign, "own_sign": [signs]}}
+DIGNITY_SIGNS = {
+    planet: {
+        "exalted": int(EXALTATION[p] // 30),
+        "debilitated": int(EXALTATION[p] // 30 + 6) % 12,
+        "moolatrikona": MOOLATRIKONA[p][0],
+        "own_sign": [s for s, lord in enumerate(SIGN_LORDS) if lord == planet],
+    }
+    for p, planet in enumerate(GRAHAS)
+}
+NAISARGIKA = np.array([60.0, 51.43, 17.14, 25.70, 34.28, 42.85, 8.57])
+# Required strength in virupas (BPHS)
+REQUIRED = np.array([390.0, 360.0, 300.0, 420.0, 390.0, 330.0, 300.0])
+# Mean daily motion in degrees, for cheshta bala
+MEAN_MOTION = np.array([0.9856, 13.1764, 0.5240, 0.9856, 0.0831, 0.9856, 0.0335])
+
+# Natural friendship: +1 friend, 0 neutral, -1 enemy
+_FRIENDS = {
+    "Sun": ("Moon", "Mars", "Jupiter"), "Moon": ("Sun", "Mercury"), "Mars": ("Sun", "Moon", "Jupiter"),
+    "Mercury": ("Sun", "Venus"), "Jupiter": ("Sun", "Moon", "Mars"), "Venus": ("Mercury", "Saturn"),
+    "Saturn": ("Mercury", "Venus"),
+}
+_ENEMIES = {
+    "Sun": ("Venus", "Saturn"), "Moon": (), "Mars": ("Mercury",), "Mercury": ("Moon",),
+    "Jupiter": ("Mercury", "Venus"), "Venus": ("Sun", "Moon"), "Saturn": ("Sun", "Moon", "Mars"),
+}
+NATURAL = np.zeros((7, 7), dtype=np.int8)
+for _p, _planet in enumerate(GRAHAS):
+    NATURAL[_p, [_G[f] for f in _FRIENDS[_planet]]] = 1
+    NATURAL[_p, [_G[e] for e in _ENEMIES[_planet]]] = -1
+# Temporal friendship: the other planet in the 2nd-4th or 10th-12th sign
+TEMPORAL = np.array([-1, 1, 1, 1, -1, -1, -1, -1, -1, 1, 1, 1], dtype=np.int8)
+# Compound relationship -2..2 (great enemy .. great friend) -> saptavargaja virupas
+RELATION_POINTS = np.array([1.875, 3.75, 7.5, 15.0, 22.5])
+
+SAPTAVARGA = ("D1", "D2", "D3", "D7", "D9", "D12", "D30")
+SIGN_LORD = np.array([_G[lord] for lord in SIGN_LORDS], dtype=np.intp)
+
+
+def _dignity_table():
+    """
+    Saptavargaja virupas of planet p in varga sign s whose lord sits k signs
+    from p in the rasi chart: 30 in its own sign, else by compound
+    relationship. Flat [p, s, k] so a batch needs one gather.
+    """
+    table = np.empty((7, 12, 12))
+    for p in range(7):
+        for s in range(12):
+            lord = SIGN_LORD[s]
+            table[p, s] = 30.0 if lord == p else RELATION_POINTS[NATURAL[p, lord] + TEMPORAL + 2]
+    return table.ravel()
+
+
+DIGNITY = _dignity_table()
+
+# Moon and Venus are strong in even signs, the rest in odd signs
+_EVEN_SIGN_PLANETS = np.array([p in ("Moon", "Venus") for p in GRAHAS])
+# Drekkana (0, 1, 2) in which each planet gains 15: male 1st, neuter 2nd, female 3rd
+DREKKANA = np.array([0, 2, 0, 1, 0, 2, 1])
+# Kendradi by house - 1: kendra 60, panaphara 30, apoklima 15
+KENDRADI = np.array([60.0, 30.0, 15.0] * 4)
+# Angle (degrees from the ascendant) where each planet has full dig bala
+DIG_POINT = np.array([270.0, 90.0, 270.0, 0.0, 0.0, 90.0, 180.0])  # MC, IC, MC, Asc, Asc, IC, Desc
+_DAY_PLANETS = np.array([p in ("Sun", "Jupiter", "Venus") for p in GRAHAS])
+_NIGHT_PLANETS = np.array([p in ("Moon", "Mars", "Saturn") for p in GRAHAS])
+BENEFIC = np.array([-1.0, 1.0, -1.0, 1.0, 1.0, 1.0, -1.0])             # natural benefic (+1) / malefic (-1)
+# Ayana bala: +1 strong with north declination, -1 with south, 0 with either (Mercury)
+AYANA_DIRECTION = np.array([1.0, -1.0, 1.0, 0.0, 1.0, 1.0, -1.0])
+OBLIQUITY = np.radians(23.44)
+# Vara lord by weekday (0 = Sunday)
+WEEKDAY_LORD = np.array([_G[p] for p in ("Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn")])
+
+# Sphuta drishti (virupas) by the angle from the aspecting to the aspected planet
+DRISHTI_ANGLES = np.array([0.0, 30.0, 60.0, 90.0, 120.0, 150.0, 180.0, 300.0, 360.0])
+DRISHTI_VALUES = np.array([0.0, 0.0, 15.0, 45.0, 30.0, 0.0, 60.0, 0.0, 0.0])
+# Extra drishti for the special aspects, by the 30° sector of the angle
+SPECIAL_DRISHTI = np.zeros((7, 12))
+SPECIAL_DRISHTI[_G["Mars"], [3, 7]] = 15.0       # 4th and 8th
+SPECIAL_DRISHTI[_G["Jupiter"], [4, 8]] = 30.0    # 5th and 9th
+SPECIAL_DRISHTI[_G["Saturn"], [2, 9]] = 45.0     # 3rd and 10th
+
+
+def _drishti_tables():
+    """
+    Drishti is linear inside every 1° cell, so per aspecting planet and whole
+    degree keep the value at the cell start and the slope: flat (7 * 360,) tables.
+    """
+    degrees = np.arange(360.0)
+    start = np.interp(degrees, DRISHTI_ANGLES, DRISHTI_VALUES)
+    slope = np.interp(degrees + 1.0, DRISHTI_ANGLES, DRISHTI_VALUES) - start
+    base = start[None, :] + np.repeat(SPECIAL_DRISHTI, 30, axis=1)
+    return base.ravel(), np.broadcast_to(slope, (7, 360)).ravel().copy()
+
+
+DRISHTI_BASE, DRISHTI_SLOPE = _drishti_tables()
+
+# Cheshta bala by daily motion / mean motion (upper band edges)
+MOTION_EDGES = np.array([0.0, 0.1, 0.5, 0.9, 1.1, 1.5])
+MOTION_POINTS = np.array([60.0, 15.0, 30.0, 15.0, 7.5, 30.0, 45.0])  # vakra, vikala, mandatara, manda, sama, chara, atichara
+
+
+def _arc(a, b):
+    """Shortest angular distance 0-180."""
+    return np.abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+def sthana_bala(lons, ascendant):
+    """(N, 7) positional strength and its five parts as a dict."""
+    n = len(lons)
+    uchcha = _arc(lons, EXALTATION + 180.0) / 3.0
+
+    signs, _ = varga_positions(lons, SAPTAVARGA, with_degrees=False)   # (N, 7, 7 vargas)
+    signs = signs.astype(np.intp)
+    d1 = signs[:, :, 0]
+    lord_d1 = np.take_along_axis(d1, SIGN_LORD[signs].reshape(n, -1), axis=1).reshape(signs.shape)
+    offset = (lord_d1 - d1[:, :, None]) % 12
+    points = DIGNITY[offset + 12 * signs + 144 * np.arange(7)[:, None]]
+    degree = lons % 30.0
+    for p, (sign, start, end) in enumerate(MOOLATRIKONA):
+        in_mt = (d1[:, p] == sign) & (degree[:, p] >= start) & (degree[:, p] < end)
+        points[:, p, 0] = np.where(in_mt, 45.0, points[:, p, 0])
+    saptavargaja = points.sum(axis=2)
+
+    even = (signs[:, :, [0, 4]] % 2 == 1)
+    ojhayugma = 15.0 * (even == _EVEN_SIGN_PLANETS[None, :, None]).sum(axis=2)
+
+    lagna_sign = (np.asarray(ascendant, dtype=np.float64).reshape(n) // 30).astype(np.intp)
+    kendradi = KENDRADI[(d1 - lagna_sign[:, None]) % 12]
+    drekkana = np.where((degree // 10).astype(np.intp) == DREKKANA, 15.0, 0.0)
+
+    parts = {"uchcha": uchcha, "saptavargaja": saptavargaja, "ojhayugma": ojhayugma,
+             "kendradi": kendradi, "drekkana": drekkana}
+    return uchcha + saptavargaja + ojhayugma + kendradi + drekkana, parts
+
+
+def dig_bala(lons, ascendant, midheaven=None):
+    """(N, 7) directional strength; midheaven defaults to ascendant - 90°."""
+    asc = np.asarray(ascendant, dtype=np.float64).reshape(-1, 1)
+    points = asc + DIG_POINT
+    if midheaven is not None:
+        mc = np.asarray(midheaven, dtype=np.float64).reshape(-1, 1)
+        angle_mc = DIG_POINT == 270.0
+        angle_ic = DIG_POINT == 90.0
+        points = np.where(angle_mc, mc, np.where(angle_ic, mc + 180.0, points))
+    return (180.0 - _arc(lons, points)) / 3.0
+
+
+def declination(lons):
+    return np.degrees(np.arcsin(np.sin(OBLIQUITY) * np.sin(np.radians(lons))))
+
+
+def kala_bala(lons, ascendant, julian_day=None, geo_longitudes=None, midheaven=None):
+    """(N, 7) temporal strength and its parts as a dict."""
+    n = len(lons)
+    asc = np.asarray(ascendant, dtype=np.float64).reshape(n)
+    ic = (asc + 90.0) if midheaven is None else np.asarray(midheaven, dtype=np.float64).reshape(n) + 180.0
+    # Sun's distance from the lower meridian stands in for time from midnight
+    from_midnight = _arc(lons[:, 0], ic)[:, None] / 3.0
+    nathonnatha = np.where(_DAY_PLANETS, from_midnight, np.where(_NIGHT_PLANETS, 60.0 - from_midnight, 60.0))
+
+    elongation = _arc(lons[:, 1], lons[:, 0])[:, None] / 3.0
+    paksha = np.where(BENEFIC > 0, elongation, 60.0 - elongation)
+    paksha[:, 1] *= 2.0
+
+    dec = declination(lons)
+    ayana = (24.0 + np.where(AYANA_DIRECTION == 0, np.abs(dec), AYANA_DIRECTION * dec)) / 48.0 * 60.0
+    ayana[:, 0] *= 2.0
+
+    vara = np.zeros((n, 7))
+    if julian_day is not None:
+        jd = np.asarray(julian_day, dtype=np.float64).reshape(n)
+        if geo_longitudes is not None:
+            jd = jd + np.asarray(geo_longitudes, dtype=np.float64) / 360.0
+        weekday = (np.floor(jd + 0.5).astype(np.int64) + 1) % 7
+        vara[np.arange(n), WEEKDAY_LORD[weekday]] = 45.0
+
+    parts = {"nathonnatha": nathonnatha, "paksha": paksha, "ayana": ayana, "vara": vara}
+    return nathonnatha + paksha + ayana + vara, parts
+
+
+def cheshta_bala(speeds, ayana, paksha):
+    """(N, 7) motional strength from daily motions (None: zero for Mars-Saturn)."""
+    n = len(ayana)
+    result = np.zeros((n, 7))
+    if speeds is not None:
+        ratio = np.asarray(speeds, dtype=np.float64)[:, :7] / MEAN_MOTION
+        result = MOTION_POINTS[np.searchsorted(MOTION_EDGES, ratio, side="right")]
+    result[:, 0] = ayana[:, 0] / 2.0
+    result[:, 1] = paksha[:, 1] / 2.0
+    return result
+
+
+def drishti(angles):
+    """Sphuta drishti in virupas for angles (..., 7 aspecting, 7 aspected)."""
+    angles = angles % 360.0
+    cell = angles.astype(np.intp)
+    flat = cell + 360 * np.arange(7)[:, None]
+    return DRISHTI_BASE[flat] + DRISHTI_SLOPE[flat] * (angles - cell)
+
+
+def drik_bala(lons):
+    """(N, 7) aspectual strength from the seven planets' drishti."""
+    angles = lons[:, None, :] - lons[:, :, None]          # [n, aspecting, aspected]
+    values = drishti(angles)
+    values[:, np.arange(7), np.arange(7)] = 0.0
+    return np.einsum("s,nst->nt", BENEFIC, values) / 4.0
+
+
+def shadbala_batch(longitudes, speeds=None, ascendant=None, julian_day=None, geo_longitudes=None,
+                   midheaven=None):
+    """
+    longitudes, speeds: (N, 9) or (N, 7) ordered as config.PLANETS
+    ascendant: (N,) lagna longitudes (required)
+    julian_day: (N,) for vara bala; geo_longitudes (N,) east-positive shift it to the local day
+    midheaven: (N,) MC longitudes (e.g. cusps[:, 9]); ascendant - 90° when None
+    Returns a dict of (N, 7) float64 arrays: each of COMPONENTS, "total"
+    (virupas), "rupas" and "ratio" (total / required strength).
+    """
+    lons = np.atleast_2d(np.asarray(longitudes, dtype=np.float64))[:, :7] % 360.0
+    if ascendant is None:
+        raise ValueError("Shadbala needs the ascendant")
+    sthana, _ = sthana_bala(lons, ascendant)
+    kala, kala_parts = kala_bala(lons, ascendant, julian_day, geo_longitudes, midheaven)
+    result = {
+        "sthana": sthana,
+        "dig": dig_bala(lons, ascendant, midheaven),
+        "kala": kala,
+        "cheshta": cheshta_bala(speeds, kala_parts["ayana"], kala_parts["paksha"]),
+        "naisargika": np.broadcast_to(NAISARGIKA, lons.shape).copy(),
+        "drik": drik_bala(lons),
+    }
+    total = sum(result[name] for name in COMPONENTS)
+    result["total"] = total
+    result["rupas"] = total / 60.0
+    result["ratio"] = total / REQUIRED
+    return result
+
+
+def shadbala_to_dict(result, i=0):
+    """Chart i of a shadbala_batch result as {planet: {component: virupas, ...}}."""
+    names = COMPONENTS + ("total", "rupas", "ratio")
+    return {planet: {name: round(float(result[name][i, p]), 2) for name in names}
+            for p, planet in enumerate(GRAHAS)}
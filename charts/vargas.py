@@ -0,0 +1,163 @@
+# AstroAgent/charts/vargas.py
+"""
+Shodashvarga engine: all sixteen Parashari divisional charts (D1-D60) for any
+number of longitudes in one NumPy gather.
+
+Every varga is described by tables indexed [varga, rasi sign, cell], where a
+rasi sign is cut into VARGA_CELLS[v] equal cells:
+    SIGN_TABLE   varga sign (0 = Aries) of the part covering the cell
+    PART_START   start of that part, in degrees within the rasi sign
+    PART_WIDTH   width of that part in degrees
+For equal-part vargas a cell is one part. The Trimsamsa (D30) has unequal
+parts, so it uses 1° cells and repeats each part's entry over its cells.
+The degree inside the varga sign is the position within the part stretched
+to 30°. Lookups flatten [varga, sign, cell] to one int32 index, so a batch
+costs one gather per output array.
+"""
+
+import numpy as np
+
+from config import PLANETS
+
+SHODASHVARGA = ("D1", "D2", "D3", "D4", "D7", "D9", "D10", "D12",
+                "D16", "D20", "D24", "D27", "D30", "D40", "D45", "D60")
+VARGA_INDEX = {name: i for i, name in enumerate(SHODASHVARGA)}
+
+# Planets followed by the lagna, the column order of every result
+BODIES = tuple(PLANETS) + ("Lagna",)
+
+_ODD = 0  # s % 2 == 0 is an odd sign (Aries = 0); s % 3 is movable / fixed / dual
+
+# Equal-part vargas as (parts, first, step): part k of rasi sign s falls in
+# first(s) + step * k (step is a function of s only for the Hora)
+_EQUAL_VARGAS = {
+    "D1": (1, lambda s: s, 1),
+    "D2": (2, lambda s: 4 if s % 2 == _ODD else 3,         # Hora: Leo, Cancer / Cancer, Leo
+           lambda s: -1 if s % 2 == _ODD else 1),
+    "D3": (3, lambda s: s, 4),                             # Drekkana: 1st, 5th, 9th
+    "D4": (4, lambda s: s, 3),                             # Chaturthamsa: 1st, 4th, 7th, 10th
+    "D7": (7, lambda s: s if s % 2 == _ODD else s + 6, 1),
+    "D9": (9, lambda s: s * 9, 1),                         # movable / fixed / dual: 1st, 9th, 5th
+    "D10": (10, lambda s: s if s % 2 == _ODD else s + 8, 1),
+    "D12": (12, lambda s: s, 1),
+    "D16": (16, lambda s: (0, 4, 8)[s % 3], 1),            # Aries, Leo, Sagittarius
+    "D20": (20, lambda s: (0, 8, 4)[s % 3], 1),            # Aries, Sagittarius, Leo
+    "D24": (24, lambda s: 4 if s % 2 == _ODD else 3, 1),   # Leo / Cancer
+    "D27": (27, lambda s: s * 27, 1),                      # fire, earth, air, water: Aries, Cancer, Libra, Capricorn
+    "D40": (40, lambda s: 0 if s % 2 == _ODD else 6, 1),   # Aries / Libra
+    "D45": (45, lambda s: (0, 4, 8)[s % 3], 1),            # Aries, Leo, Sagittarius
+    "D60": (60, lambda s: s, 1),
+}
+
+# Trimsamsa parts as (end degree, sign) for odd and even signs
+_TRIMSAMSA = {
+    "odd": ((5, 0), (10, 10), (18, 8), (25, 2), (30, 6)),   # Mars, Saturn, Jupiter, Mercury, Venus
+    "even": ((5, 1), (12, 5), (20, 11), (25, 9), (30, 7)),  # Venus, Mercury, Jupiter, Saturn, Mars
+}
+
+
+def _varga_tables(name):
+    """(cells, sign table, part start, part width) for one varga, as nested lists."""
+    if name == "D30":
+        signs, starts, widths = [], [], []
+        for s in range(12):
+            parts = _TRIMSAMSA["odd" if s % 2 == _ODD else "even"]
+            row_sign, row_start, row_width = [], [], []
+            begin = 0
+            for end, sign in parts:
+                row_sign += [sign] * (end - begin)
+                row_start += [begin] * (end - begin)
+                row_width += [end - begin] * (end - begin)
+                begin = end
+            signs.append(row_sign)
+            starts.append(row_start)
+            widths.append(row_width)
+        return 30, signs, starts, widths
+
+    n, first, step = _EQUAL_VARGAS[name]
+    steps = [step(s) if callable(step) else step for s in range(12)]
+    table = [[(first(s) + steps[s] * k) % 12 for k in range(n)] for s in range(12)]
+    width = 30.0 / n
+    starts = [[k * width for k in range(n)] for _ in range(12)]
+    widths = [[width] * n for _ in range(12)]
+    return n, table, starts, widths
+
+
+def _build():
+    cells = np.zeros(len(SHODASHVARGA), dtype=np.int64)
+    max_cells = 60
+    sign_table = np.zeros((len(SHODASHVARGA), 12, max_cells), dtype=np.int8)
+    part_start = np.zeros((len(SHODASHVARGA), 12, max_cells))
+    part_width = np.ones((len(SHODASHVARGA), 12, max_cells))
+    for v, name in enumerate(SHODASHVARGA):
+        n, signs, starts, widths = _varga_tables(name)
+        cells[v] = n
+        sign_table[v, :, :n] = signs
+        part_start[v, :, :n] = starts
+        part_width[v, :, :n] = widths
+    for table in (sign_table, part_start, part_width):
+        table.setflags(write=False)
+    return cells, sign_table, part_start, part_width
+
+
+VARGA_CELLS, SIGN_TABLE, PART_START, PART_WIDTH = _build()
+_MAX_CELLS = SIGN_TABLE.shape[2]
+_SIGN_FLAT = SIGN_TABLE.ravel()
+# degree in varga sign = within * _SCALE - _OFFSET
+_SCALE_FLAT = (30.0 / PART_WIDTH).ravel()
+_OFFSET_FLAT = (PART_START * 30.0 / PART_WIDTH).ravel()
+
+
+def varga_positions(longitudes, vargas=SHODASHVARGA, with_degrees=True):
+    """
+    Divisional positions of an array of ecliptic longitudes (any shape,
+    degrees). Returns (signs, degrees) with the varga axis appended last:
+        signs    int8 0-11 (0 = Aries), shape longitudes.shape + (V,)
+        degrees  float64 degree within the varga sign, same shape
+                 (None when with_degrees=False, e.g. for sign-only scoring)
+    """
+    v = np.array([VARGA_INDEX[name] for name in vargas], dtype=np.int32)
+    cells = VARGA_CELLS[v].astype(np.int32)
+    lon = np.asarray(longitudes, dtype=np.float64) % 360.0
+    rasi = (lon // 30.0).astype(np.int32)[..., None]
+    within = (lon - 30.0 * rasi[..., 0])[..., None]
+    cell = np.minimum((within * (cells / 30.0)).astype(np.int32), cells - 1)
+    flat = (v * 12 + rasi) * _MAX_CELLS + cell
+
+    signs = _SIGN_FLAT[flat]
+    if not with_degrees:
+        return signs, None
+    degrees = within * _SCALE_FLAT[flat] - _OFFSET_FLAT[flat]
+    np.clip(degrees, 0.0, np.nextafter(30.0, 0.0), out=degrees)
+    return signs, degrees
+
+
+def chart_vargas(longitudes, ascendant=None, vargas=SHODASHVARGA, with_degrees=True):
+    """
+    All vargas for a batch of charts in one pass.
+        longitudes  (N, 9) or (9,) planet longitudes in config.PLANETS order
+        ascendant   (N,) or scalar lagna longitude; adds a tenth "Lagna" column
+    Returns (signs, degrees) of shape (N, bodies, V) (no N axis for one chart).
+    """
+    lons = np.asarray(longitudes, dtype=np.float64)
+    if ascendant is not None:
+        asc = np.asarray(ascendant, dtype=np.float64)
+        lons = np.concatenate([lons, asc[..., None]], axis=-1)
+    return varga_positions(lons, vargas, with_degrees)
+
+
+def vargas_to_dict(signs, degrees, vargas=SHODASHVARGA, bodies=BODIES):
+    """
+    One chart's arrays from chart_vargas() as
+    {varga: {body: {"longitude", "sign", "degree"}}}, the shape
+    DivisionalCharts.get_divisional_chart() returns.
+    """
+    result = {}
+    for j, name in enumerate(vargas):
+        chart = {}
+        for i in range(signs.shape[0]):
+            sign = int(signs[i, j])
+            degree = float(degrees[i, j])
+            chart[bodies[i]] = {"longitude": sign * 30 + degree, "sign": sign, "degree": degree}
+        result[name] = chart
+    return result
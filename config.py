@@ -12,6 +12,21 @@ ZODIAC_SIGNS = [
     "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
 ]
 
+# Sign lords, indexed like ZODIAC_SIGNS
+SIGN_LORDS = [
+    "Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury",
+    "Venus", "Mars", "Jupiter", "Saturn", "Saturn", "Jupiter"
+]
+
+# Nakshatras (lunar mansions), 13°20' each from 0° Aries
+NAKSHATRAS = [
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
+    "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni",
+    "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha",
+    "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"
+]
+
 # Houses
 HOUSES = [
     "1st House", "2nd House", "3rd House", "4th House", "5th House", "6th House",
@@ -21,10 +36,21 @@ HOUSES = [
 # Divisional charts
 DIVISIONAL_CHARTS = {
     "D1": "Rasi / Natal chart",
+    "D2": "Hora chart (Wealth)",
+    "D3": "Drekkana chart (Siblings)",
+    "D4": "Chaturthamsa chart (Property)",
+    "D7": "Saptamsa chart (Children)",
     "D9": "Navamsa chart",
     "D10": "Dasamsa chart (Career)",
     "D12": "Dwadashamsa chart (Parents)",
-    "D24": "Siddhamsa chart (Education / Skills)"
+    "D16": "Shodashamsa chart (Vehicles / Comforts)",
+    "D20": "Vimshamsa chart (Spiritual pursuits)",
+    "D24": "Siddhamsa chart (Education / Skills)",
+    "D27": "Bhamsa chart (Strengths / Weaknesses)",
+    "D30": "Trimsamsa chart (Misfortunes)",
+    "D40": "Khavedamsa chart (Maternal legacy)",
+    "D45": "Akshavedamsa chart (Paternal legacy)",
+    "D60": "Shashtiamsa chart (Past karma)"
 }
 
 # Yogas to detect (starter)
@@ -53,5 +79,20 @@ VIMSHOTTARI_DASHA = {
     "Mercury": 17
 }
 
+# Precomputed Chebyshev ephemeris tables (see charts/chebyshev_ephemeris.py)
+EPHEMERIS_TABLE_PATH = "data/ephemeris"
+
+# Offline gazetteer (GeoNames-style CSV) used by utils/geocode_utils.py
+GAZETTEER_PATH = "data/geo/cities.csv"
+# Fall back to Nominatim (network) for cities missing from the gazetteer
+GEOCODE_ALLOW_NETWORK = False
+
+# Prebuilt rules, compiled yogas, gazetteer and ephemeris tables in one
+# memory-mapped file (python -m rules_engine.snapshot compile)
+ENGINE_SNAPSHOT_PATH = "engine.snapshot"
+
+# Stage timers and counters (utils/metrics.py); near-zero cost while off
+METRICS_ENABLED = False
+
 # Logging level
 LOG_LEVEL = "INFO"
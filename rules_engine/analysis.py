@@ -1,17 +1,21 @@
 # AstroAgent/rules_engine/analysis.py
 
+from charts.aspects import aspect_records, with_orbs
 from rules_engine.house_analysis import HouseAnalysis
 from rules_engine.planet_analysis import PlanetAnalysis
 from rules_engine.yogas import Yogas
 from rules_engine.dashas import Dashas
+from rules_engine.rule_registry import get_rules
 from datetime import datetime
 from utils.geocode_utils import get_lat_lon  # helper to fetch latitude/longitude from city
+from utils import metrics
 
 class AstrologyAnalysis:
-    def __init__(self, data_path="data", birth_date=None, birth_city=None):
+    def __init__(self, data_path="data", birth_date=None, birth_city=None, cache=None):
         """
         birth_date: datetime object
         birth_city: string for latitude/longitude
+        cache: optional ReportCache (rules_engine.report_cache) for full_analysis
         """
         self.birth_date = birth_date or datetime(1997, 7, 11, 7, 2)
         self.birth_city = birth_city or "Varanasi"
@@ -19,53 +23,93 @@ class AstrologyAnalysis:
         # Get latitude and longitude
         latitude, longitude = get_lat_lon(self.birth_city)
 
-        # Initialize modules
-        self.house_analyzer = HouseAnalysis(data_path=f"{data_path}/house_rules")
-        self.planet_analyzer = PlanetAnalysis(data_path=f"{data_path}/planetary_rules")
-        self.yogas = Yogas(data_path=f"{data_path}/house_rules")
+        self.data_path = data_path
+        self.cache = cache
+        self.load_rules()
 
-        # Dashas only needs birth_date now (no moon_nakshatra_index required)
+        # The Moon's nakshatra and dasha balance come from the ephemeris at birth
         self.dashas = Dashas(birth_date=self.birth_date)
 
+    def load_rules(self, revalidate=False):
+        """
+        Initialize modules with the process-wide rule sets (loaded once, shared
+        by reference). revalidate=True picks up rule files changed on disk.
+        """
+        house_rules = get_rules(f"{self.data_path}/house_rules", revalidate=revalidate)
+        planetary_rules = get_rules(f"{self.data_path}/planetary_rules", revalidate=revalidate)
+        self.house_analyzer = HouseAnalysis(data_path=f"{self.data_path}/house_rules", rules=house_rules)
+        self.planet_analyzer = PlanetAnalysis(data_path=f"{self.data_path}/planetary_rules", rules=planetary_rules)
+        self.yogas = Yogas(data_path=f"{self.data_path}/house_rules", rules=house_rules)
+
+    def set_birth(self, birth_date, moon_longitude=None):
+        """
+        Point the dasha calculation at another birth while keeping the loaded
+        analyzers, so one instance can serve many charts.
+        """
+        self.birth_date = birth_date
+        self.dashas = Dashas(birth_date=birth_date, moon_longitude=moon_longitude)
+
     def analyze_career(self, planets_in_houses):
-        return {h: self.house_analyzer.analyze_house(h, p).get("career") for h, p in planets_in_houses.items()}
+        return self.house_analyzer.analyze_domain("career", planets_in_houses)
 
     def analyze_marriage(self, planets_in_houses):
-        return {h: self.house_analyzer.analyze_house(h, p).get("marriage") for h, p in planets_in_houses.items()}
+        return self.house_analyzer.analyze_domain("marriage", planets_in_houses)
 
     def analyze_wealth(self, planets_in_houses):
-        return {h: self.house_analyzer.analyze_house(h, p).get("wealth") for h, p in planets_in_houses.items()}
+        return self.house_analyzer.analyze_domain("wealth", planets_in_houses)
 
     def analyze_spirituality(self, planets_in_houses):
-        return {h: self.house_analyzer.analyze_house(h, p).get("spirituality") for h, p in planets_in_houses.items()}
+        return self.house_analyzer.analyze_domain("spirituality", planets_in_houses)
+
+    def analyze_houses(self, planets_in_houses):
+        """All life domains ({domain: {house: description}}) in a single pass."""
+        return self.house_analyzer.analyze_all(planets_in_houses)
 
     def analyze_planet_strengths(self, planets_with_signs):
+        metrics.incr("rule_evaluations_total", len(planets_with_signs), analyzer="strengths")
         return {pl: self.planet_analyzer.get_planet_strength(pl, sign) for pl, sign in planets_with_signs.items()}
 
-    def analyze_aspects(self, planets_with_signs):
-        aspects_report = []
-        planets = list(planets_with_signs.keys())
-        for i in range(len(planets)):
-            for j in range(i+1, len(planets)):
-                influence = self.planet_analyzer.get_aspect_influence(planets[i], planets[j])
-                if "No significant" not in influence:
-                    aspects_report.append(influence)
-        return aspects_report
+    def analyze_aspects(self, planets_with_signs, planet_longitudes=None):
+        """
+        Structured aspect records (see charts.aspects.aspect_records); orb checks
+        are applied when exact longitudes are given.
+        """
+        records = aspect_records(planets_with_signs, planet_longitudes,
+                                 aspect_rules=self.planet_analyzer.aspect_rules)
+        metrics.incr("rule_evaluations_total", len(records), analyzer="aspects")
+        return records
 
-    def analyze_yogas(self, planets_in_houses):
-        return self.yogas.detect_yogas(planets_in_houses)
+    def analyze_yogas(self, planets_in_houses, planets_with_signs=None):
+        return self.yogas.detect_yogas(planets_in_houses, planets_with_signs)
 
     def analyze_dashas(self):
         return self.dashas.get_current_dasha()
 
-    def full_analysis(self, planets_in_houses, planets_with_signs):
-        return {
-            "career": self.analyze_career(planets_in_houses),
-            "marriage": self.analyze_marriage(planets_in_houses),
-            "wealth": self.analyze_wealth(planets_in_houses),
-            "spirituality": self.analyze_spirituality(planets_in_houses),
-            "planet_strengths": self.analyze_planet_strengths(planets_with_signs),
-            "aspects": self.analyze_aspects(planets_with_signs),
-            "yogas": self.analyze_yogas(planets_in_houses),
-            "current_dasha": self.analyze_dashas()
-        }
+    def placement_report(self, planets_in_houses, planets_with_signs, planet_longitudes=None):
+        """Everything in full_analysis that depends only on the placements."""
+        with metrics.stage("houses"):
+            report = self.analyze_houses(planets_in_houses)
+        with metrics.stage("strengths"):
+            report["planet_strengths"] = self.analyze_planet_strengths(planets_with_signs)
+        with metrics.stage("aspects"):
+            report["aspects"] = self.analyze_aspects(planets_with_signs, planet_longitudes)
+        with metrics.stage("yogas"):
+            report["yogas"] = self.analyze_yogas(planets_in_houses, planets_with_signs)
+        return report
+
+    @metrics.timed("full_analysis")
+    def full_analysis(self, planets_in_houses, planets_with_signs, planet_longitudes=None):
+        if self.cache is None:
+            report = self.placement_report(planets_in_houses, planets_with_signs, planet_longitudes)
+        else:
+            if self.cache.check_version():
+                self.load_rules(revalidate=True)
+            # cached without longitudes so births sharing placements share an entry
+            report = dict(self.cache.get_or_compute(
+                planets_in_houses, planets_with_signs,
+                lambda: self.placement_report(planets_in_houses, planets_with_signs)))
+            if planet_longitudes is not None:
+                report["aspects"] = with_orbs(report["aspects"], planet_longitudes)
+        with metrics.stage("dashas"):
+            report["current_dasha"] = self.analyze_dashas()
+        return report
@@ -1,5 +1,12 @@
+from bisect import bisect_right
+from collections import namedtuple
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from charts.ephemeris import julian_days
+from charts.panchang import moon_longitude as ephemeris_moon_longitude, nakshatra_pada, resolve_ayanamsa
+
 # Vimshottari Dasha years
 VIMSHOTTARI_DASHA_YEARS = {
     "Ketu": 7,
@@ -16,55 +23,243 @@ VIMSHOTTARI_DASHA_YEARS = {
 # Vimshottari Dasha sequence
 DASHA_SEQUENCE = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
 
+LEVEL_NAMES = ["mahadasha", "antardasha", "pratyantardasha", "sookshma", "prana"]
+
+TOTAL_YEARS = 120
+DAYS_PER_YEAR = 365.25
+
+_YEARS = np.array([VIMSHOTTARI_DASHA_YEARS[p] for p in DASHA_SEQUENCE], dtype=np.float64)
+# SUB_ORDER[l]: lord indexes of the nine sub-periods of a period ruled by l
+SUB_ORDER = np.array([[(l + k) % 9 for k in range(9)] for l in range(9)], dtype=np.int8)
+# SUB_BOUNDS[l]: cumulative fractions (10 values, 0 to 1) of those sub-periods
+SUB_BOUNDS = np.concatenate(
+    [np.zeros((9, 1)), np.cumsum(_YEARS[SUB_ORDER] / TOTAL_YEARS, axis=1)], axis=1
+)
+SUB_BOUNDS[:, -1] = 1.0
+_SUB_ORDER_LISTS = SUB_ORDER.tolist()
+_SUB_BOUNDS_LISTS = SUB_BOUNDS.tolist()
+
+
+class Period(namedtuple("Period", ["lords", "start", "end"])):
+    """
+    One dasha period. lords holds the ruling planet at each level, e.g.
+    ("Rahu", "Jupiter") for Rahu mahadasha / Jupiter antardasha.
+    """
+    __slots__ = ()
+
+    @property
+    def level(self):
+        return LEVEL_NAMES[len(self.lords) - 1]
+
+    @property
+    def lord(self):
+        return self.lords[-1]
+
+
+def dasha_lords(moon_longitudes, birth_jd, on_jd, depth=2, ayanamsa=None):
+    """
+    Active dasha lords for N births (tropical Moon longitude and Julian day
+    at each birth) on E dates, as array operations: (N, E, depth) int8
+    indexes into DASHA_SEQUENCE, -1 outside the 120 years. Used to compare
+    many candidate births at once without building a Dashas per birth.
+    ayanamsa (degrees, scalar or (N,)) defaults to Lahiri at each birth.
+    """
+    moon = np.atleast_1d(np.asarray(moon_longitudes, dtype=np.float64))
+    index, _, elapsed = nakshatra_pada(moon, resolve_ayanamsa(ayanamsa, birth_jd))
+    start_lord = index.astype(np.intp) % 9
+    cycle = TOTAL_YEARS * DAYS_PER_YEAR
+    # fraction of the 120-year cycle since the first mahadasha began
+    t = ((np.asarray(on_jd, dtype=np.float64)[None, :] - np.asarray(birth_jd, dtype=np.float64).reshape(-1, 1))
+         + (elapsed * _YEARS[start_lord] * DAYS_PER_YEAR)[:, None]) / cycle
+    lords = np.full(t.shape + (depth,), -1, dtype=np.int8)
+    valid = (t >= 0.0) & (t < 1.0)
+    lord = np.broadcast_to(start_lord[:, None], t.shape)
+    s, e = np.zeros_like(t), np.ones_like(t)
+    for level in range(depth):
+        span = e - s
+        bounds = SUB_BOUNDS[lord]
+        k = np.clip((bounds <= ((t - s) / span)[..., None]).sum(axis=-1) - 1, 0, 8)
+        s, e = s + np.take_along_axis(bounds, k[..., None], -1)[..., 0] * span, \
+            s + np.take_along_axis(bounds, k[..., None] + 1, -1)[..., 0] * span
+        lord = SUB_ORDER[lord, k]
+        lords[..., level] = lord
+    lords[~valid] = -1
+    return lords
+
+
 class Dashas:
     """
     Calculate Vimshottari Dasha periods based on Moon Nakshatra at birth
+
+    The nakshatra, pada and balance of the first dasha come from the Moon's
+    tropical longitude (moon_longitude when given, else the ephemeris at
+    birth_date, naive UT) less the ayanamsa: Lahiri at birth by default, 0.0
+    when moon_longitude is already sidereal. An explicit
+    moon_nakshatra_index, or no ephemeris backend (index 12, the old
+    default), starts the first dasha at birth.
+
+    The 9^5 periods down to prana level are never materialized:
+    iter_periods() expands them lazily and date lookups walk the levels
+    with bisect over precomputed sub-period boundaries.
     """
-    def __init__(self, birth_date: datetime, moon_nakshatra_index: int = 12):
+    def __init__(self, birth_date: datetime, moon_nakshatra_index: int = None, moon_longitude: float = None,
+                 ayanamsa: float = None):
         self.birth_date = birth_date
+        if moon_longitude is None and moon_nakshatra_index is None:
+            moon_longitude = ephemeris_moon_longitude(birth_date)
+        self.moon_longitude = moon_longitude
+        self.moon_pada = None
+        if moon_longitude is not None:
+            ayanamsa = resolve_ayanamsa(ayanamsa, julian_days([birth_date])[0])
+            index, pada, elapsed = nakshatra_pada(moon_longitude, ayanamsa)
+            moon_nakshatra_index, self.moon_pada, elapsed = int(index), int(pada), float(elapsed)
+        else:
+            if moon_nakshatra_index is None:
+                moon_nakshatra_index = 12
+            elapsed = 0.0
         self.moon_nakshatra_index = moon_nakshatra_index  # 0-26 (27 Nakshatras)
+        self.start_lord = moon_nakshatra_index % 9
+
+        # The first mahadasha began before birth by the elapsed part of the nakshatra
+        first_days = _YEARS[self.start_lord] * DAYS_PER_YEAR
+        self.epoch = birth_date - timedelta(days=elapsed * first_days)
+        self.balance_years = (1 - elapsed) * _YEARS[self.start_lord]
+
+        order = _SUB_ORDER_LISTS[self.start_lord]
+        self._maha_lords = order
+        self._maha_bounds = [b * TOTAL_YEARS * DAYS_PER_YEAR for b in _SUB_BOUNDS_LISTS[self.start_lord]]
+
         self.dasha_planets = []
         self.dasha_start_dates = []
 
+    def _days(self, when):
+        if not isinstance(when, datetime):
+            when = datetime(when.year, when.month, when.day)
+        return (when - self.epoch).total_seconds() / 86400.0
+
+    def _date(self, days):
+        return self.epoch + timedelta(days=days)
+
     def calculate_dashas(self):
         """
         Compute Dasha start and end dates for the sequence
         """
-        # Starting planet based on Moon Nakshatra
-        starting_index = self.moon_nakshatra_index % 9
-        self.dasha_planets = DASHA_SEQUENCE[starting_index:] + DASHA_SEQUENCE[:starting_index]
+        self.dasha_planets = [DASHA_SEQUENCE[l] for l in self._maha_lords]
+        self.dasha_start_dates = [
+            (DASHA_SEQUENCE[l], self._date(self._maha_bounds[i]), self._date(self._maha_bounds[i + 1]))
+            for i, l in enumerate(self._maha_lords)
+        ]
+        return self.dasha_start_dates
 
-        current_date = self.birth_date
-        self.dasha_start_dates = []
+    def iter_periods(self, depth=2, start=None, end=None):
+        """
+        Lazily yield Period tuples at the given depth (1 = mahadasha ... 5 = prana),
+        in chronological order, restricted to those overlapping [start, end).
+        Subtrees outside the window are never expanded.
+        """
+        lo = float("-inf") if start is None else self._days(start)
+        hi = float("inf") if end is None else self._days(end)
 
-        for planet in self.dasha_planets:
-            years = VIMSHOTTARI_DASHA_YEARS[planet]
-            start_date = current_date
-            end_date = start_date + timedelta(days=int(years * 365.25))
-            self.dasha_start_dates.append((planet, start_date, end_date))
-            current_date = end_date
+        def expand(lords, lord, s, e, level):
+            if e <= lo or s >= hi:
+                return
+            lords = lords + (DASHA_SEQUENCE[lord],)
+            if level == depth:
+                yield Period(lords, self._date(s), self._date(e))
+                return
+            span = e - s
+            bounds = _SUB_BOUNDS_LISTS[lord]
+            for k, sub in enumerate(_SUB_ORDER_LISTS[lord]):
+                yield from expand(lords, sub, s + bounds[k] * span, s + bounds[k + 1] * span, level + 1)
 
-        return self.dasha_start_dates
+        for i, lord in enumerate(self._maha_lords):
+            yield from expand((), lord, self._maha_bounds[i], self._maha_bounds[i + 1], 1)
+
+    def period_at(self, on_date, depth=3):
+        """
+        Periods active on a date, one per level down to depth: a bisect per
+        level over nine precomputed boundaries. Returns [] outside the 120 years.
+        """
+        t = self._days(on_date)
+        i = bisect_right(self._maha_bounds, t) - 1
+        if i < 0 or i >= 9:
+            return []
+        lord = self._maha_lords[i]
+        s, e = self._maha_bounds[i], self._maha_bounds[i + 1]
+        lords = (DASHA_SEQUENCE[lord],)
+        periods = [Period(lords, self._date(s), self._date(e))]
+        for _ in range(depth - 1):
+            span = e - s
+            bounds = _SUB_BOUNDS_LISTS[lord]
+            k = min(bisect_right(bounds, (t - s) / span) - 1, 8)
+            lord = _SUB_ORDER_LISTS[lord][k]
+            s, e = s + bounds[k] * span, s + bounds[k + 1] * span
+            lords = lords + (DASHA_SEQUENCE[lord],)
+            periods.append(Period(lords, self._date(s), self._date(e)))
+        return periods
+
+    def periods_at(self, dates, depth=3):
+        """
+        Batch lookup for N dates as array operations.
+        Returns a dict:
+            lords: (N, depth) int8 indexes into DASHA_SEQUENCE (-1 outside the timeline)
+            start, end: (N, depth) datetime64[s] bounds of each active period
+        """
+        stamps = np.asarray(dates, dtype="datetime64[s]")
+        t = (stamps - np.datetime64(self.epoch, "s")).astype(np.float64) / 86400.0
+        n = len(t)
+        rows = np.arange(n)
+        lords = np.full((n, depth), -1, dtype=np.int8)
+        starts = np.zeros((n, depth))
+        ends = np.zeros((n, depth))
+
+        maha_bounds = np.array(self._maha_bounds)
+        i = np.searchsorted(maha_bounds, t, side="right") - 1
+        valid = (i >= 0) & (i < 9)
+        i = np.clip(i, 0, 8)
+        lord = np.array(self._maha_lords, dtype=np.int8)[i]
+        s, e = maha_bounds[i], maha_bounds[i + 1]
+        for level in range(depth):
+            if level > 0:
+                span = e - s
+                bounds = SUB_BOUNDS[lord]
+                k = np.clip((bounds <= ((t - s) / span)[:, None]).sum(axis=1) - 1, 0, 8)
+                s, e = s + bounds[rows, k] * span, s + bounds[rows, k + 1] * span
+                lord = SUB_ORDER[lord, k]
+            lords[:, level] = lord
+            starts[:, level], ends[:, level] = s, e
+
+        lords[~valid] = -1
+        epoch = np.datetime64(self.epoch, "s")
+
+        def to_stamp(days):
+            return epoch + np.round(days * 86400).astype("timedelta64[s]")
+
+        return {"lords": lords, "start": to_stamp(starts), "end": to_stamp(ends)}
 
     def get_current_dasha(self, on_date: datetime = None):
         if on_date is None:
             on_date = datetime.now()
 
-        if not self.dasha_start_dates:
-            self.calculate_dashas()
-
-        for planet, start, end in self.dasha_start_dates:
-            if start <= on_date <= end:
-                return {
-                    "current_mahadasha": planet,
-                    "start_date": start.date(),
-                    "end_date": end.date()
-                }
+        periods = self.period_at(on_date, depth=2)
+        if not periods:
+            return {
+                "current_mahadasha": None,
+                "start_date": None,
+                "end_date": None,
+                "current_antardasha": None,
+                "antardasha_start_date": None,
+                "antardasha_end_date": None
+            }
 
+        maha, antar = periods
         return {
-            "current_mahadasha": None,
-            "start_date": None,
-            "end_date": None
+            "current_mahadasha": maha.lord,
+            "start_date": maha.start.date(),
+            "end_date": maha.end.date(),
+            "current_antardasha": antar.lord,
+            "antardasha_start_date": antar.start.date(),
+            "antardasha_end_date": antar.end.date()
         }
 
     def print_dashas(self):
@@ -1,83 +1,165 @@
 # AstroAgent/rules_engine/explanation_layer.py
+"""
+Renders AstrologyAnalysis.full_analysis() reports as text.
 
-from config import PLANETS, HOUSES, YOGAS
+A report has one {house: description} dict per life domain (career,
+marriage, ...), planet_strengths, aspects, yogas and current_dasha.
+Sections are rendered from templates compiled once at import, in this order:
+
+    === Planetary Strengths ===
+    === Yogas ===
+    === Current Dasha ===
+    === House Analysis ===
+    === Aspects ===
+
+iter_report() yields one section at a time, so a batch job can write
+millions of reports to a file without holding any of them whole:
+
+    stream.writelines(llm.iter_polished(explainer.iter_report(report)))
+"""
+
+from config import PLANETS, YOGAS
+from utils.chart_utils import house_number
 from utils.logger import setup_logger
+from utils import metrics
 
 logger = setup_logger("ExplanationLayer")
 
+HEADER = "=== {} ==="
+SECTION_TITLES = ("Planetary Strengths", "Yogas", "Current Dasha", "House Analysis", "Aspects")
+# full_analysis keys that are not life domains
+REPORT_KEYS = frozenset({"planet_strengths", "aspects", "yogas", "current_dasha"})
+
+# Line templates, bound once; each renders one line of a section body
+_STRENGTH_LINES = {
+    "strong": "{} is well-placed and provides positive influence.".format,
+    "weak": "{} is weak or debilitated; challenges may arise.".format,
+    "neutral": "{} has neutral influence.".format,
+}
+_CLASSICAL_YOGA = "{} is present in the chart, which brings special results.".format
+_OTHER_YOGA = "{} is detected.".format
+_NO_YOGAS = "No yogas detected."
+_DASHA = "Current Mahadasha: {}, Antardasha: {}".format
+_DASHA_PERIOD = "{} Mahadasha: {} to {}".format
+_ANTARDASHA_PERIOD = "{} Antardasha: {} to {}".format
+_DOMAIN = "{}:".format
+_HOUSE = "  {}: {}".format
+_ASPECT = "{} -> {}: {}{}".format
+_CLASSICAL = frozenset(YOGAS)
+_PLANET_ORDER = {planet: i for i, planet in enumerate(PLANETS)}
+
+
+def _compile_headers():
+    """Section title -> header text, the first without and the rest with a leading blank line."""
+    return {title: (HEADER.format(title) + "\n", "\n" + HEADER.format(title) + "\n") for title in SECTION_TITLES}
+
+
+_HEADERS = _compile_headers()
+
+
 class ExplanationLayer:
     """
     Converts raw astrology analysis into human-readable astrological interpretations.
     """
 
     def __init__(self):
-        pass
+        # (title, report key or None for the domains, body renderer)
+        self.sections = (
+            ("Planetary Strengths", "planet_strengths", self.interpret_planetary_strengths),
+            ("Yogas", "yogas", self.interpret_yogas),
+            ("Current Dasha", "current_dasha", self.interpret_dashas),
+            ("House Analysis", None, self.interpret_house_analysis),
+            ("Aspects", "aspects", self.interpret_aspects),
+        )
 
     def interpret_planetary_strengths(self, planetary_report):
         """
-        Converts planetary strengths dict into readable sentences.
+        Converts planet_strengths ({planet: sentence from PlanetAnalysis}) into
+        readable lines in config.PLANETS order. "strong" / "weak" / "neutral"
+        labels are expanded into sentences.
         """
         lines = []
-        for planet, strength in planetary_report.items():
-            if strength == "strong":
-                lines.append(f"{planet} is well-placed and provides positive influence.")
-            elif strength == "weak":
-                lines.append(f"{planet} is weak or debilitated; challenges may arise.")
-            else:
-                lines.append(f"{planet} has neutral influence.")
+        for planet in sorted(planetary_report, key=lambda p: _PLANET_ORDER.get(p, len(PLANETS))):
+            strength = planetary_report[planet]
+            template = _STRENGTH_LINES.get(strength)
+            lines.append(template(planet) if template is not None else str(strength))
         return "\n".join(lines)
 
     def interpret_yogas(self, yogas_report):
         """
         Converts detected yogas list into human-readable descriptions.
         """
-        lines = []
-        for yoga in yogas_report:
-            if yoga in YOGAS:
-                lines.append(f"{yoga} is present in the chart, which brings special results.")
-            else:
-                lines.append(f"{yoga} is detected.")
-        return "\n".join(lines)
+        if not yogas_report:
+            return _NO_YOGAS
+        return "\n".join(_CLASSICAL_YOGA(yoga) if yoga in _CLASSICAL else _OTHER_YOGA(yoga)
+                         for yoga in yogas_report)
 
     def interpret_dashas(self, dashas_report):
         """
-        Converts current Dasha info into readable form.
+        Converts current_dasha (Dashas.get_current_dasha) into readable form.
         """
-        mahadasha = dashas_report.get("Mahadasha", "Unknown")
-        antardasha = dashas_report.get("Antardasha", "Unknown")
-        return f"Current Mahadasha: {mahadasha}, Antardasha: {antardasha}"
+        mahadasha = dashas_report.get("current_mahadasha") or "Unknown"
+        antardasha = dashas_report.get("current_antardasha") or "Unknown"
+        lines = [_DASHA(mahadasha, antardasha)]
+        if dashas_report.get("start_date"):
+            lines.append(_DASHA_PERIOD(mahadasha, dashas_report["start_date"], dashas_report["end_date"]))
+        if dashas_report.get("antardasha_start_date"):
+            lines.append(_ANTARDASHA_PERIOD(antardasha, dashas_report["antardasha_start_date"],
+                                            dashas_report["antardasha_end_date"]))
+        return "\n".join(lines)
 
     def interpret_house_analysis(self, house_report):
         """
-        Converts house-specific analysis (career, marriage, wealth, spirituality)
-        into readable form.
+        Converts the life-domain part of a report ({domain: {house: description}},
+        career, marriage, wealth, spirituality, ...) into readable form,
+        houses in order.
         """
         lines = []
-        for key, desc in house_report.items():
-            lines.append(f"{key.capitalize()}: {desc}")
+        for domain, houses in house_report.items():
+            lines.append(_DOMAIN(domain.capitalize()))
+            for house in sorted(houses, key=house_number):
+                lines.append(_HOUSE(house, houses[house]))
         return "\n".join(lines)
 
+    def interpret_aspects(self, aspect_report):
+        """
+        Converts aspect records (charts.aspects.aspect_records) into lines,
+        with the distance from exact when longitudes were known.
+        """
+        lines = []
+        for record in aspect_report:
+            deviation = record.get("deviation")
+            if deviation is None:
+                detail = ""
+            else:
+                detail = f" ({deviation:.2f}° from exact{', within orb' if record.get('within_orb') else ''})"
+            lines.append(_ASPECT(record["from"], record["to"], record["type"], detail))
+        return "\n".join(lines)
+
+    def iter_report(self, full_analysis_dict):
+        """
+        Yield the report section by section; each chunk is a header line and
+        its body, ending with a newline. Sections missing from the report are
+        skipped.
+        """
+        first = True
+        for title, key, render in self.sections:
+            if key is None:
+                value = {k: v for k, v in full_analysis_dict.items()
+                         if k not in REPORT_KEYS and isinstance(v, dict)}
+                if not value:
+                    continue
+            elif key in full_analysis_dict:
+                value = full_analysis_dict[key]
+            else:
+                continue
+            yield _HEADERS[title][0 if first else 1] + render(value) + "\n"
+            first = False
+
+    @metrics.timed("explanation")
     def generate_full_report(self, full_analysis_dict):
         """
         Takes the unified dict from AstrologyAnalysis.full_analysis() and
         returns a readable astrology report.
         """
-        report_sections = []
-
-        if "planetary_strengths" in full_analysis_dict:
-            report_sections.append("=== Planetary Strengths ===")
-            report_sections.append(self.interpret_planetary_strengths(full_analysis_dict["planetary_strengths"]))
-
-        if "yogas" in full_analysis_dict:
-            report_sections.append("\n=== Yogas ===")
-            report_sections.append(self.interpret_yogas(full_analysis_dict["yogas"]))
-
-        if "dashas" in full_analysis_dict:
-            report_sections.append("\n=== Current Dasha ===")
-            report_sections.append(self.interpret_dashas(full_analysis_dict["dashas"]))
-
-        if "house_analysis" in full_analysis_dict:
-            report_sections.append("\n=== House Analysis ===")
-            report_sections.append(self.interpret_house_analysis(full_analysis_dict["house_analysis"]))
-
-        return "\n".join(report_sections)
+        return "".join(self.iter_report(full_analysis_dict))
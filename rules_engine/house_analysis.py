@@ -1,53 +1,90 @@
 # AstroAgent/rules_engine/house_analysis.py
 
-import json
 from pathlib import Path
+from rules_engine.rule_registry import get_rules
+from utils.chart_utils import house_number as to_house_number
+from utils import metrics
+
+DOMAIN_SUFFIX = "_rules.json"
 
 class HouseAnalysis:
-    def __init__(self, data_path="data/house_rules"):
+    def __init__(self, data_path="data/house_rules", rules=None):
+        """
+        rules: frozen {filename: rules} mapping from the shared RuleRegistry;
+        looked up by data_path when not given
+
+        Life domains are discovered from the *_rules.json files present
+        (career_rules.json -> "career"), so a new domain is one new file.
+        """
         self.data_path = Path(data_path)
+        self.rules = rules if rules is not None else get_rules(data_path)
         self.house_meanings = self.load_json("houses_meanings.json")
-        self.career_rules = self.load_json("career_rules.json")
-        self.marriage_rules = self.load_json("marriage_rules.json")
-        self.wealth_rules = self.load_json("wealth_rules.json")
-        self.spirituality_rules = self.load_json("spirituality_rules.json")
+
+        self.domain_rules = {}
+        for filename in sorted(self.rules):
+            if filename.endswith(DOMAIN_SUFFIX):
+                domain = filename[:-len(DOMAIN_SUFFIX)]
+                self.domain_rules[domain] = self.rules[filename]
+                setattr(self, f"{domain}_rules", self.rules[filename])
+        self.domains = tuple(self.domain_rules)
+
+        # house number -> ((domain, rule entry or None), ...) for the fused pass
+        self.house_table = {
+            h: tuple((domain, rules.get(str(h))) for domain, rules in self.domain_rules.items())
+            for h in range(1, 13)
+        }
 
     def load_json(self, filename):
-        file_path = self.data_path / filename
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.rules[filename]
 
     def get_house_meaning(self, house_number):
-        return self.house_meanings.get(str(house_number), "No meaning found")
+        return self.house_meanings.get(str(to_house_number(house_number)), "No meaning found")
 
     def analyze_house(self, house_number, planets_in_house):
         """
         Analyze house with planets present.
-        Returns a dict with analysis for career, marriage, wealth, spirituality
+        Returns a dict with the house meaning and one entry per domain
+        (career, marriage, wealth, spirituality, ...)
         """
-        house_number = str(house_number)
-        analysis = {}
-
-        # Generic house meaning
-        analysis["meaning"] = self.get_house_meaning(house_number)
+        analysis = {"meaning": self.get_house_meaning(house_number)}
+        for domain, rule in self.house_table[to_house_number(house_number)]:
+            analysis[domain] = self._describe(planets_in_house, rule)
+        return analysis
 
-        # Check positive and negative influence
-        analysis["career"] = self.check_planet_effect(house_number, planets_in_house, self.career_rules)
-        analysis["marriage"] = self.check_planet_effect(house_number, planets_in_house, self.marriage_rules)
-        analysis["wealth"] = self.check_planet_effect(house_number, planets_in_house, self.wealth_rules)
-        analysis["spirituality"] = self.check_planet_effect(house_number, planets_in_house, self.spirituality_rules)
+    def analyze_all(self, planets_in_houses):
+        """
+        Fused evaluation: visits each occupied house once and fills every domain.
+        Returns {domain: {house: description}} keyed like planets_in_houses.
+        """
+        results = {domain: {} for domain in self.domains}
+        evaluated = 0
+        for house, planets in planets_in_houses.items():
+            entries = self.house_table[to_house_number(house)]
+            evaluated += len(entries)
+            for domain, rule in entries:
+                results[domain][house] = self._describe(planets, rule)
+        metrics.incr("rule_evaluations_total", evaluated, analyzer="houses")
+        return results
 
-        return analysis
+    def analyze_domain(self, domain, planets_in_houses):
+        rules = self.domain_rules[domain]
+        return {h: self.check_planet_effect(h, p, rules) for h, p in planets_in_houses.items()}
 
     def check_planet_effect(self, house_number, planets_in_house, rules):
         """
         Returns a string describing positive/negative effects based on rules
         """
-        if house_number not in rules:
+        return self._describe(planets_in_house, rules.get(str(to_house_number(house_number))))
+
+    @staticmethod
+    def _describe(planets_in_house, rule):
+        if rule is None:
             return "No specific rules"
 
-        pos = [p for p in planets_in_house if p in rules[house_number].get("planets_positive", [])]
-        neg = [p for p in planets_in_house if p in rules[house_number].get("planets_negative", [])]
+        positive = rule.get("planets_positive", ())
+        negative = rule.get("planets_negative", ())
+        pos = [p for p in planets_in_house if p in positive]
+        neg = [p for p in planets_in_house if p in negative]
 
         result = ""
         if pos:
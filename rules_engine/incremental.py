@@ -0,0 +1,355 @@
+# AstroAgent/rules_engine/incremental.py
+"""
+Incremental re-evaluation of stored reports when rule files change.
+
+Reports of the charts in a ChartStore (charts/chart_store.py) are kept per
+section in reports.sqlite inside the store, together with the rule files
+they were built from (the baseline). After an edit under data/,
+refresh() diffs the baseline against the files on disk rule by rule and
+recomputes only the sections those rules feed, for only the charts they
+can reach:
+
+    rule changed                        section            charts re-evaluated
+    <domain>_rules.json, house "10"     <domain>           a planet whose 10th-house verdict changed in the 10th
+    planet_strength.json, "Jupiter"     planet_strengths   Jupiter in a sign whose verdict changed
+    aspects_rules.json, "Mars"          aspects            a Mars aspect whose rule label changed
+    yogas.json, "Gajakesari Yoga"       yogas              detection (old vs new rules) differs
+    <domain>_rules.json added/removed   <domain>           every chart (added) / none, section dropped
+
+The store's bitmap indexes are the dependency index for the house and
+sign rules; yoga rules are compared by running both compiled rule sets
+over the stored signs and houses. houses_meanings.json and
+planet_meanings.json feed no stored section, so edits there cost nothing.
+
+    reports = IncrementalReports(store)
+    reports.build()                 # once: every section of every chart
+    summary = reports.refresh()     # after rule edits
+
+    python -m rules_engine.incremental STORE plan   # what the pending edits would touch
+"""
+
+import json
+import sqlite3
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from config import PLANETS, ZODIAC_SIGNS
+from charts.aspects import compute_aspects_batch, rule_category
+from charts.chart_store import HOUSE_ROWS
+from rules_engine.house_analysis import DOMAIN_SUFFIX
+from rules_engine.planet_analysis import PlanetAnalysis
+from rules_engine.rule_registry import freeze_rules, read_rule_files
+from rules_engine.yoga_compiler import compile_yogas, encode_batch
+from utils.chart_utils import house_number
+from utils.logger import setup_logger
+
+logger = setup_logger("IncrementalReports")
+
+RULE_DIRS = ("house_rules", "planetary_rules")
+REPORTS_DB = "reports.sqlite"
+PLACEMENT_SECTIONS = ("planet_strengths", "aspects", "yogas")
+
+# One changed rule: folder, file, top-level key (None for a whole file) and
+# "added" / "removed" / "modified"
+RuleChange = namedtuple("RuleChange", ["folder", "filename", "key", "change"])
+
+
+def diff_rules(old, new):
+    """
+    RuleChanges between two {folder: {filename: parsed JSON}} rule sets, at
+    the granularity of top-level keys (a house, a planet, a yoga).
+    """
+    changes = []
+    for folder in sorted(set(old) | set(new)):
+        old_files, new_files = old.get(folder, {}), new.get(folder, {})
+        for filename in sorted(set(old_files) | set(new_files)):
+            if filename not in new_files:
+                changes.append(RuleChange(folder, filename, None, "removed"))
+            elif filename not in old_files:
+                changes.append(RuleChange(folder, filename, None, "added"))
+            else:
+                a, b = old_files[filename], new_files[filename]
+                if not (isinstance(a, dict) and isinstance(b, dict)):
+                    if a != b:
+                        changes.append(RuleChange(folder, filename, None, "modified"))
+                    continue
+                for key in list(a) + [k for k in b if k not in a]:
+                    if key not in b:
+                        changes.append(RuleChange(folder, filename, key, "removed"))
+                    elif key not in a:
+                        changes.append(RuleChange(folder, filename, key, "added"))
+                    elif a[key] != b[key]:
+                        changes.append(RuleChange(folder, filename, key, "modified"))
+                if [k for k in a if k in b] != [k for k in b if k in a]:
+                    changes.append(RuleChange(folder, filename, None, "reordered"))
+    return changes
+
+
+class IncrementalReports:
+    """Per-section reports of a ChartStore's charts, kept current with the rule files."""
+
+    def __init__(self, store, data_path=None):
+        from rules_engine.analysis import AstrologyAnalysis
+
+        self.store = store
+        self.data_path = data_path or store.data_path
+        self.analysis = AstrologyAnalysis(data_path=self.data_path)
+        self.db = sqlite3.connect(store.path / REPORTS_DB)
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS sections "
+                            "(id INTEGER, section TEXT, value TEXT, PRIMARY KEY (id, section))")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # ---- rules ----
+
+    def current_rules(self):
+        return {folder: read_rule_files(f"{self.data_path}/{folder}") for folder in RULE_DIRS}
+
+    def baseline(self):
+        """Rule files the stored sections were built from, or None before build()."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _save_baseline(self, rules):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (json.dumps(rules),))
+
+    # ---- sections ----
+
+    def _section_values(self, section, segment, rows, analysis):
+        """[(id, JSON text)] of one section evaluated for rows of a segment."""
+        batch = self.store.charts(segment, rows)
+        ids = np.asarray(segment.columns["ids"][rows]).tolist()
+        values = []
+        for i, chart_id in enumerate(ids):
+            planets_in_houses, planets_with_signs = batch.to_dicts(i)
+            if section == "planet_strengths":
+                value = analysis.analyze_planet_strengths(planets_with_signs)
+            elif section == "aspects":
+                value = analysis.analyze_aspects(planets_with_signs, batch[i].planet_longitudes())
+            elif section == "yogas":
+                value = analysis.analyze_yogas(planets_in_houses, planets_with_signs)
+            else:
+                value = analysis.house_analyzer.analyze_domain(section, planets_in_houses)
+            values.append((chart_id, section, json.dumps(value)))
+        return values
+
+    def _write(self, section, selection, analysis):
+        count = 0
+        for segment, rows in selection:
+            if len(rows):
+                values = self._section_values(section, segment, rows, analysis)
+                self.db.executemany("INSERT OR REPLACE INTO sections VALUES (?, ?, ?)", values)
+                count += len(values)
+        return count
+
+    def sections(self):
+        return tuple(self.analysis.house_analyzer.domains) + PLACEMENT_SECTIONS
+
+    def build(self):
+        """Evaluate every section of every live chart and record the rule baseline."""
+        rules = self.current_rules()
+        self.analysis.load_rules(revalidate=True)
+        selection = self.store.live_rows()
+        with self.db:
+            self.db.execute("DELETE FROM sections")
+            counts = {section: self._write(section, selection, self.analysis) for section in self.sections()}
+            self._save_baseline(rules)
+        return counts
+
+    def report(self, chart_id):
+        """Stored placement report of one chart, shaped like placement_report()."""
+        rows = self.db.execute("SELECT section, value FROM sections WHERE id = ?", (int(chart_id),)).fetchall()
+        return {section: json.loads(value) for section, value in rows}
+
+    # ---- dependency resolution ----
+
+    def _placement_rows(self, planes):
+        """Live rows set in any of the (bitmap row, column) planes of the store bitmaps."""
+        selection = []
+        for segment in self.store.segments:
+            bits = np.zeros_like(segment.live)
+            for row, column in planes:
+                bits |= segment.bitmaps[row, column]
+            selection.append((segment, segment.rows_of(bits & segment.live)))
+        return selection
+
+    @staticmethod
+    def _house_placements(old_rules, new_rules, keys):
+        """
+        (planet index, house 1-12) whose description changes between two
+        versions of a domain's rules: every planet of a house whose entry was
+        added or removed, else the planets moved in or out of its lists.
+        """
+        placements = []
+        for key in keys:
+            h = house_number(key)
+            a, b = old_rules.get(key), new_rules.get(key)
+            for p, planet in enumerate(PLANETS):
+                if a is None or b is None or (
+                        (planet in a.get("planets_positive", ())) != (planet in b.get("planets_positive", ()))
+                        or (planet in a.get("planets_negative", ())) != (planet in b.get("planets_negative", ()))):
+                    placements.append((p, h))
+        return placements
+
+    def _scan_rows(self, predicate):
+        """Live rows where predicate(segment, rows) -> bool mask holds."""
+        return [(segment, rows[predicate(segment, rows)]) for segment, rows in self.store.live_rows()]
+
+    def _strength_placements(self, old, new, planets):
+        old_analyzer = PlanetAnalysis(rules=old)
+        new_analyzer = PlanetAnalysis(rules=new)
+        return [(PLANETS.index(planet), s) for planet in planets if planet in PLANETS
+                for s, sign in enumerate(ZODIAC_SIGNS)
+                if old_analyzer.get_planet_strength(planet, sign) != new_analyzer.get_planet_strength(planet, sign)]
+
+    def _aspect_pairs(self, old, new, planets):
+        """(source, target, house) whose rule label (charts.aspects.rule_category) changed."""
+        old_rules, new_rules = old.get("aspects_rules.json", {}), new.get("aspects_rules.json", {})
+        return [(PLANETS.index(source), PLANETS.index(target), house)
+                for source in planets if source in PLANETS for target in PLANETS for house in range(1, 13)
+                if rule_category(old_rules, source, target, house) != rule_category(new_rules, source, target, house)]
+
+    def _aspect_rows(self, triples):
+        sources, targets, houses = (np.array(column) for column in zip(*triples))
+
+        def touched(segment, rows):
+            signs = np.asarray(segment.columns["signs"][rows], dtype=np.int64)
+            result = compute_aspects_batch(None, signs)
+            conjunct = result["conjunction"][:, sources, targets] & (sources < targets)
+            distance = (signs[:, targets] - signs[:, sources]) % 12 + 1
+            return ((conjunct | result["drishti"][:, sources, targets]) & (distance == houses)).any(axis=1)
+        return self._scan_rows(touched)
+
+    def _yoga_rows(self, old, new, names, reordered):
+        old_compiled, new_compiled = compile_yogas(old["yogas.json"]), compile_yogas(new["yogas.json"])
+
+        def detected(compiled, batch):
+            # lagna unset, as Yogas.detect_yogas sees the reports' charts
+            mask = compiled.detect_batch(encode_batch(batch.signs, batch.houses))
+            picked = np.zeros((len(mask), len(names)), dtype=bool)
+            for i, name in enumerate(names):
+                if name in compiled.names:
+                    picked[:, i] = mask[:, compiled.names.index(name)]
+            return picked, mask.any(axis=1)
+
+        def touched(segment, rows):
+            batch = self.store.charts(segment, rows)
+            old_mask, _ = detected(old_compiled, batch)
+            new_mask, any_yoga = detected(new_compiled, batch)
+            differs = (old_mask != new_mask).any(axis=1)
+            # a reordering changes the listed order wherever a yoga is found
+            return differs | any_yoga if reordered else differs
+        return self._scan_rows(touched)
+
+    def plan(self, old, new, changes):
+        """
+        {section: [(segment, rows)]} to re-evaluate, plus the list of
+        sections to drop, for changes between rule sets old and new
+        ({folder: {filename: parsed JSON}}).
+        """
+        old_frozen = {folder: freeze_rules(files) for folder, files in old.items()}
+        new_frozen = {folder: freeze_rules(files) for folder, files in new.items()}
+        plan, dropped = {}, []
+        by_file = {}
+        for change in changes:
+            by_file.setdefault((change.folder, change.filename), []).append(change)
+
+        for (folder, filename), file_changes in by_file.items():
+            whole = any(c.key is None for c in file_changes)
+            keys = [c.key for c in file_changes if c.key is not None]
+            if folder == "house_rules" and filename.endswith(DOMAIN_SUFFIX):
+                domain = filename[:-len(DOMAIN_SUFFIX)]
+                if filename not in new[folder]:
+                    dropped.append(domain)
+                elif whole:
+                    plan[domain] = self.store.live_rows()
+                else:
+                    placements = self._house_placements(old[folder][filename], new[folder][filename], keys)
+                    plan[domain] = self._placement_rows([(HOUSE_ROWS + p, h - 1) for p, h in placements])
+            elif (folder, filename) == ("house_rules", "yogas.json"):
+                names = list(dict.fromkeys(keys + (list(new[folder].get(filename, {})) if whole else [])))
+                plan["yogas"] = self._yoga_rows(old_frozen[folder], new_frozen[folder], names,
+                                                any(c.change == "reordered" for c in file_changes))
+            elif (folder, filename) == ("planetary_rules", "planet_strength.json"):
+                planets = PLANETS if whole else keys
+                plan["planet_strengths"] = self._placement_rows(
+                    self._strength_placements(old_frozen[folder], new_frozen[folder], planets))
+            elif (folder, filename) == ("planetary_rules", "aspects_rules.json"):
+                triples = self._aspect_pairs(old_frozen[folder], new_frozen[folder], PLANETS if whole else keys)
+                if triples:
+                    plan["aspects"] = self._aspect_rows(triples)
+        return plan, dropped
+
+    def refresh(self):
+        """
+        Re-evaluate the sections affected by rule edits since the baseline.
+        Returns {"changes": [...], "sections": {section: charts re-evaluated},
+        "dropped": [...], "seconds"}.
+        """
+        started = time.perf_counter()
+        old = self.baseline()
+        if old is None:
+            counts = self.build()
+            return {"changes": [], "sections": counts, "dropped": [], "rebuilt": True,
+                    "seconds": time.perf_counter() - started}
+        new = self.current_rules()
+        changes = diff_rules(old, new)
+        if not changes:
+            return {"changes": [], "sections": {}, "dropped": [], "seconds": time.perf_counter() - started}
+
+        plan, dropped = self.plan(old, new, changes)
+        self.analysis.load_rules(revalidate=True)
+        if "yogas" in plan:
+            self.store.rebuild_yogas()
+            # segments were reopened; map the planned rows onto the new objects
+            by_path = {segment.path: segment for segment in self.store.segments}
+            plan = {section: [(by_path[segment.path], rows) for segment, rows in selection]
+                    for section, selection in plan.items()}
+        with self.db:
+            for section in dropped:
+                self.db.execute("DELETE FROM sections WHERE section = ?", (section,))
+            counts = {section: self._write(section, selection, self.analysis) for section, selection in plan.items()}
+            self._save_baseline(new)
+        logger.info(f"{len(changes)} rule changes: re-evaluated {counts}, dropped {dropped}")
+        return {
+            "changes": [change._asdict() for change in changes],
+            "sections": counts,
+            "dropped": dropped,
+            "seconds": time.perf_counter() - started,
+        }
+
+
+def main(argv=None):
+    import argparse
+    from charts.chart_store import ChartStore
+
+    parser = argparse.ArgumentParser(description="Build or refresh the stored reports of a chart store.")
+    parser.add_argument("store")
+    parser.add_argument("command", choices=("build", "refresh", "plan"))
+    parser.add_argument("--data", default="data")
+    args = parser.parse_args(argv)
+
+    reports = IncrementalReports(ChartStore(args.store, data_path=args.data))
+    if args.command == "build":
+        result = {"sections": reports.build()}
+    elif args.command == "refresh":
+        result = reports.refresh()
+    else:
+        old, new = reports.baseline(), reports.current_rules()
+        if old is None:
+            result = {"error": "no baseline; run build first"}
+        else:
+            changes = diff_rules(old, new)
+            plan, dropped = reports.plan(old, new, changes)
+            result = {"changes": [change._asdict() for change in changes],
+                      "sections": {section: sum(len(rows) for _, rows in selection)
+                                   for section, selection in plan.items()},
+                      "dropped": dropped}
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# AstroAgent/rules_engine/llm_backends.py
+"""
+Model backends for LLMLayer.
+
+A backend turns report texts into polished texts. It implements
+complete_batch(), one round trip for many reports, and may override
+stream() to hand out tokens as the model produces them:
+
+    class MyBackend(LLMBackend):
+        name = "my-model"
+        max_batch_size = 32
+
+        async def complete_batch(self, prompts):
+            return await client.polish(prompts)   # one request for the batch
+
+LLMLayer does the batching, caching and concurrency limiting, so backends
+stay thin. LocalBackend is a deterministic offline stand-in with
+configurable latency for measuring throughput without a model.
+"""
+
+import asyncio
+import re
+from abc import ABC, abstractmethod
+
+# Whitespace-delimited tokens, keeping the whitespace so tokens join back exactly
+TOKEN_PATTERN = re.compile(r"\s*\S+|\s+")
+
+
+class LLMBackend(ABC):
+    """Base class; subclasses implement complete_batch() (checked at construction)."""
+
+    name = "backend"
+    max_batch_size = 16
+
+    @abstractmethod
+    async def complete_batch(self, prompts):
+        """Polished text for every prompt, in order."""
+
+    async def stream(self, prompt):
+        """Async iterator of text tokens for one prompt; by default one batch call, then split."""
+        (text,) = await self.complete_batch([prompt])
+        for token in TOKEN_PATTERN.findall(text):
+            yield token
+
+
+class LocalBackend(LLMBackend):
+    """
+    Deterministic stand-in: the placeholder polish of rules_engine.llm_layer,
+    after a simulated round trip of latency seconds per call plus
+    token_latency seconds per streamed token.
+    """
+
+    name = "local"
+
+    def __init__(self, latency=0.0, token_latency=0.0, max_batch_size=16):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.max_batch_size = max_batch_size
+        self.calls = 0
+        self.prompts = 0
+
+    def _polish(self, prompt):
+        from rules_engine.llm_layer import polish_text
+        return polish_text(prompt)
+
+    async def complete_batch(self, prompts):
+        self.calls += 1
+        self.prompts += len(prompts)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._polish(prompt) for prompt in prompts]
+
+    async def stream(self, prompt):
+        self.calls += 1
+        self.prompts += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in TOKEN_PATTERN.findall(self._polish(prompt)):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield token
+
+
+class CallableBackend(LLMBackend):
+    """
+    Adapts a blocking function func(list of prompts) -> list of texts, e.g. a
+    vendor SDK call, by running it in the loop's default executor.
+    """
+
+    def __init__(self, func, name="callable", max_batch_size=16):
+        self.func = func
+        self.name = name
+        self.max_batch_size = max_batch_size
+
+    async def complete_batch(self, prompts):
+        return list(await asyncio.get_running_loop().run_in_executor(None, self.func, list(prompts)))
@@ -1,32 +1,224 @@
 # AstroAgent/rules_engine/llm_layer.py
+"""
+Polishing of rendered reports (rules_engine/explanation_layer.py).
 
+Without a model the polish is a deterministic header rewrite. With a model
+(an LLMBackend from rules_engine/llm_backends.py, or a plain function over
+a list of texts) LLMLayer:
+    - caches polished text by a hash of the report text, since many charts
+      render to the same report
+    - shares one model call between identical reports in flight
+    - micro-batches: reports arriving within max_wait seconds go to the
+      model in one complete_batch() call of up to max_batch_size
+    - allows at most concurrency model calls at once
+    - streams tokens to the caller with stream_polish()
+
+    llm = LLMLayer(LocalBackend(latency=0.05))
+    texts = asyncio.run(llm.polish_many(reports))
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from rules_engine.explanation_layer import HEADER
 from utils.logger import setup_logger
+from utils import metrics
 
 logger = setup_logger("LLMLayer")
 
+INTRO = "Here is your personalized astrology report based on your chart:\n\n"
+# Section title -> polished heading
+HEADINGS = {
+    "Planetary Strengths": "\n🌟 Planetary Strengths 🌟",
+    "Yogas": "\n✨ Yogas ✨",
+    "Current Dasha": "\n⏳ Current Dasha ⏳",
+    "House Analysis": "\n🏠 House Analysis 🏠",
+    "Aspects": "\n🔭 Aspects 🔭",
+}
+_REPLACEMENTS = {HEADER.format(title): heading for title, heading in HEADINGS.items()}
+# Every header in one alternation, so a report is rewritten in a single scan
+_HEADER_PATTERN = re.compile("|".join(re.escape(header) for header in _REPLACEMENTS))
+
+
+def _substitute(text):
+    return _HEADER_PATTERN.sub(lambda match: _REPLACEMENTS[match.group()], text)
+
+
+def polish_text(report_text):
+    """The deterministic placeholder polish: introduction plus rewritten headers."""
+    return INTRO + _substitute(report_text)
+
+
 class LLMLayer:
     """
     Polishes deterministic astrology reports into conversational, human-friendly text.
     """
 
-    def __init__(self, model=None):
+    def __init__(self, model=None, max_batch_size=None, max_wait=0.005, concurrency=4, cache_size=10_000):
         """
-        model: Optional LLM instance or API client
+        model: Optional LLMBackend, or a function list of texts -> list of texts
+        max_batch_size: reports per model call (default: the backend's max_batch_size)
+        max_wait: seconds a report waits for others to fill its batch
+        concurrency: model calls in flight at once
+        cache_size: polished reports kept (LRU)
         """
+        if model is not None and not hasattr(model, "complete_batch"):
+            from rules_engine.llm_backends import CallableBackend
+            model = CallableBackend(model)
         self.model = model
+        self.max_batch_size = max_batch_size or getattr(model, "max_batch_size", 16)
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._loop = None
+        self.stats = {"hits": 0, "misses": 0, "calls": 0, "batched": 0, "coalesced": 0}
 
-    def polish_report(self, report_text):
+    # ---- cache ----
+
+    def _key(self, report_text):
+        return hashlib.sha1(report_text.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                metrics.incr("llm_cache_requests_total", result="hit")
+                return value
+        self.stats["misses"] += 1
+        metrics.incr("llm_cache_requests_total", result="miss")
+        return None
+
+    def _cache_put(self, key, value):
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---- batching ----
+
+    def _bind(self):
+        """Per event loop state: queue, in-flight futures, concurrency slots."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = []          # (key, text) waiting for a batch
+            self._inflight = {}       # key -> future of the polished text
+            self._tasks = set()
+            self._timer = None
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return loop
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch_size], self._queue[self.max_batch_size:]
+            task = self._loop.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        async with self._slots:
+            self.stats["calls"] += 1
+            self.stats["batched"] += len(batch)
+            metrics.incr("llm_calls_total")
+            metrics.incr("llm_reports_total", len(batch))
+            try:
+                with metrics.stage("llm_call"):
+                    texts = await self.model.complete_batch([text for _, text in batch])
+                if len(texts) != len(batch):
+                    raise ValueError(f"Backend returned {len(texts)} texts for {len(batch)} reports")
+            except Exception as e:
+                for key, _ in batch:
+                    self._inflight.pop(key).set_exception(e)
+                return
+        for (key, _), text in zip(batch, texts):
+            self._cache_put(key, text)
+            self._inflight.pop(key).set_result(text)
+
+    async def apolish(self, report_text):
+        """Polish one report through the cache and the micro-batcher."""
+        if self.model is None:
+            return polish_text(report_text)
+        key = self._key(report_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        loop = self._bind()
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = loop.create_future()
+        self._queue.append((key, report_text))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await asyncio.shield(future)
+
+    async def polish_many(self, report_texts):
+        """Polish many reports concurrently; results in input order."""
+        return await asyncio.gather(*(self.apolish(text) for text in report_texts))
+
+    async def stream_polish(self, report_text):
         """
-        Converts structured report into polished, human-readable astrology explanation.
-        For now, a placeholder deterministic style is used. Later can connect to real LLM.
+        Async iterator of polished text pieces for one report: the model's
+        tokens as they arrive, or the whole text at once from the cache.
         """
-        # Example simple polishing:
-        polished = report_text.replace("=== Planetary Strengths ===", "\n🌟 Planetary Strengths 🌟")
-        polished = polished.replace("=== Yogas ===", "\n✨ Yogas ✨")
-        polished = polished.replace("=== Current Dasha ===", "\n⏳ Current Dasha ⏳")
-        polished = polished.replace("=== House Analysis ===", "\n🏠 House Analysis 🏠")
+        if self.model is None:
+            yield polish_text(report_text)
+            return
+        key = self._key(report_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+        self._bind()
+        parts = []
+        async with self._slots:
+            self.stats["calls"] += 1
+            metrics.incr("llm_calls_total")
+            async for token in self.model.stream(report_text):
+                parts.append(token)
+                yield token
+        self._cache_put(key, "".join(parts))
 
-        # Optional: add friendly introductory sentence
-        polished = "Here is your personalized astrology report based on your chart:\n\n" + polished
+    def iter_polished(self, chunks):
+        """
+        Polish a report streamed as text chunks (e.g. ExplanationLayer.iter_report)
+        with the placeholder polish: yields the introduction, then each chunk
+        with its headers rewritten. Headers must not be split across chunks.
+        """
+        yield INTRO
+        for chunk in chunks:
+            yield _substitute(chunk)
 
-        return polished
+    @metrics.timed("polish")
+    def polish_report(self, report_text):
+        """
+        Converts structured report into polished, human-readable astrology explanation.
+        Uses the deterministic placeholder style unless a model is configured;
+        from async code, await apolish() instead.
+        """
+        if self.model is None:
+            return polish_text(report_text)
+        key = self._key(report_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        self.stats["calls"] += 1
+        metrics.incr("llm_calls_total")
+        text = asyncio.run(self.model.complete_batch([report_text]))[0]
+        self._cache_put(key, text)
+        return text
@@ -1,19 +1,22 @@
 # AstroAgent/rules_engine/planet_analysis.py
 
-import json
 from pathlib import Path
+from rules_engine.rule_registry import get_rules
 
 class PlanetAnalysis:
-    def __init__(self, data_path="data/planetary_rules"):
+    def __init__(self, data_path="data/planetary_rules", rules=None):
+        """
+        rules: frozen {filename: rules} mapping from the shared RuleRegistry;
+        looked up by data_path when not given
+        """
         self.data_path = Path(data_path)
+        self.rules = rules if rules is not None else get_rules(data_path)
         self.planet_strength = self.load_json("planet_strength.json")
         self.planet_meanings = self.load_json("planet_meanings.json")
         self.aspect_rules = self.load_json("aspects_rules.json")
 
     def load_json(self, filename):
-        file_path = self.data_path / filename
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.rules[filename]
 
     def get_planet_meaning(self, planet):
         return self.planet_meanings.get(planet, "No meaning found")
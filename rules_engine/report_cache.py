@@ -0,0 +1,186 @@
+# AstroAgent/rules_engine/report_cache.py
+"""
+Content-addressed cache of the placement-dependent part of full_analysis.
+
+Everything in a report except current_dasha and the aspects' orb fields is
+a function of the placements (house and sign of each planet) and the rule
+files, so entries are keyed by a SHA-1 over the normalized placements and a
+version hash of every file under data/. Exact longitudes are deliberately
+not part of the key, or no two births would ever share an entry: the caller
+fills deviation/within_orb in from them (charts.aspects.with_orbs) and
+computes the dasha, which depends on the birth and today's date, fresh.
+
+Two tiers:
+    memory  an LRU bounded by max_entries, per process
+    sqlite  optional file shared by every worker on the machine (WAL mode)
+The data version is re-checked at most every check_interval seconds; when a
+file changes, the LRU is dropped, stale SQLite rows are deleted and the
+shared rule registry is refreshed. AstrologyAnalysis then rebuilds its
+analyzers, so new reports are built from the new rules.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from config import PLANETS, ZODIAC_SIGNS
+from rules_engine.rule_registry import registry
+from utils.chart_utils import house_number, sign_index
+from utils import metrics
+
+_PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+_SIGN_INDEX = {sign: i for i, sign in enumerate(ZODIAC_SIGNS)}
+
+
+def data_version(data_path="data"):
+    """Hash of (relative path, size, mtime_ns) of every file under data_path."""
+    root = Path(data_path)
+    digest = hashlib.sha1()
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(root).as_posix()}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def placement_key(planets_in_houses, planets_with_signs, version=""):
+    """
+    Canonical hash of a chart's placements: independent of dict order, house
+    label format ("1st House", "1", 1) and sign spelling (name or index).
+    """
+    houses = [0] * len(PLANETS)
+    for house, planets in planets_in_houses.items():
+        number = house_number(house)
+        for planet in planets:
+            houses[_PLANET_INDEX[planet]] = number
+    signs = [255] * len(PLANETS)
+    for planet, sign in planets_with_signs.items():
+        signs[_PLANET_INDEX[planet]] = _SIGN_INDEX[sign] if sign in _SIGN_INDEX else sign_index(sign)
+    digest = hashlib.sha1(version.encode())
+    digest.update(bytes(houses) + bytes(signs))
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Two-tier cache of placement reports. Values are returned as stored;
+    callers copy before adding per-birth fields (full_analysis does).
+    """
+
+    def __init__(self, data_path="data", max_entries=100_000, sqlite_path=None, check_interval=1.0):
+        self.data_path = data_path
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self.check_interval = check_interval
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self._checked = 0.0
+        self.version = data_version(data_path)
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0}
+
+    # ---- versioning ----
+
+    def check_version(self, force=False):
+        """Re-hash data/ (at most every check_interval seconds); True if it changed."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        version = data_version(self.data_path)
+        if version == self.version:
+            return False
+        with self._lock:
+            self.version = version
+            self._lru.clear()
+            self.stats["invalidations"] += 1
+        metrics.incr("report_cache_invalidations_total")
+        registry.refresh()
+        db = self._connection()
+        if db is not None:
+            with db:
+                db.execute("DELETE FROM reports WHERE version != ?", (version,))
+        return True
+
+    # ---- sqlite tier ----
+
+    def _connection(self):
+        if self.sqlite_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():   # never share a connection across fork
+            self._db = sqlite3.connect(self.sqlite_path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reports (key TEXT PRIMARY KEY, version TEXT, value TEXT)")
+            self._db_pid = os.getpid()
+        return self._db
+
+    # ---- lookups ----
+
+    def key(self, planets_in_houses, planets_with_signs):
+        return placement_key(planets_in_houses, planets_with_signs, self.version)
+
+    def get(self, key):
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.stats["hits"] += 1
+                metrics.incr("report_cache_requests_total", result="hit")
+                return value
+        db = self._connection()
+        if db is not None:
+            row = db.execute("SELECT value FROM reports WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(key, value)
+                self.stats["disk_hits"] += 1
+                metrics.incr("report_cache_requests_total", result="disk_hit")
+                return value
+        self.stats["misses"] += 1
+        metrics.incr("report_cache_requests_total", result="miss")
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        db = self._connection()
+        if db is not None:
+            with db:
+                db.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?)",
+                           (key, self.version, json.dumps(value)))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get_or_compute(self, planets_in_houses, planets_with_signs, compute):
+        """
+        Cached value for the placements, calling compute() on a miss.
+        Call check_version() first (AstrologyAnalysis does, reloading its rules).
+        """
+        key = self.key(planets_in_houses, planets_with_signs)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+        db = self._connection()
+        if db is not None:
+            with db:
+                db.execute("DELETE FROM reports")
+
+    def __len__(self):
+        return len(self._lru)
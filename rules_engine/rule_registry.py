@@ -0,0 +1,130 @@
+# AstroAgent/rules_engine/rule_registry.py
+
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+# Lists under these keys are only ever used for membership tests
+SET_KEYS = {"planets_positive", "planets_negative", "own_sign"}
+
+
+def freeze(value, key=None):
+    """
+    Recursively convert parsed JSON into read-only structures:
+    dicts -> MappingProxyType, lists -> tuples (frozensets for SET_KEYS).
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v, k) for k, v in value.items()})
+    if isinstance(value, list):
+        if key in SET_KEYS:
+            return frozenset(value)
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _frozen(mapping):
+    return MappingProxyType(mapping)
+
+
+def reduce_frozen(proxy):
+    """Pickle reducer for the frozen mappings (MappingProxyType is not picklable itself)."""
+    return _frozen, (dict(proxy),)
+
+
+def read_rule_files(path):
+    """{filename: parsed JSON} of every *.json file in a rule directory."""
+    files = {}
+    for file_path in sorted(Path(path).glob("*.json")):
+        with open(file_path, "r", encoding="utf-8") as f:
+            files[file_path.name] = json.load(f)
+    return files
+
+
+def freeze_rules(files):
+    """The frozen {filename: rules} mapping the registry serves for parsed rule files."""
+    rules = {}
+    for filename, data in files.items():
+        if filename == "aspects_rules.json":
+            # planet lists here are only searched, never iterated
+            data = {planet: {kind: frozenset(others) for kind, others in kinds.items()}
+                    for planet, kinds in data.items()}
+        rules[filename] = freeze(data)
+    return MappingProxyType(rules)
+
+
+class RuleRegistry:
+    """
+    Loads every *.json file of a rule directory once per process and hands the
+    same frozen mapping {filename: rules} to every analyzer.
+
+    Entries are keyed by (directory, mtime signature). get() does no file I/O
+    once a directory is loaded; pass revalidate=True (or call refresh()) to
+    stat the files and reload only if one of them changed.
+    """
+
+    def __init__(self):
+        self._entries = {}   # (path, signature) -> frozen rules
+        self._current = {}   # path -> signature currently served
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(path):
+        """Tuple of (filename, mtime_ns) for every JSON file in the directory."""
+        return tuple(sorted((f.name, f.stat().st_mtime_ns) for f in Path(path).glob("*.json")))
+
+    @staticmethod
+    def _load(path):
+        return freeze_rules(read_rule_files(path))
+
+    def get(self, path, revalidate=False):
+        path = str(Path(path).resolve())
+        signature = self._current.get(path)
+        if signature is not None and not revalidate:
+            return self._entries[(path, signature)]
+
+        with self._lock:
+            signature = self.signature(path)
+            key = (path, signature)
+            if key not in self._entries:
+                stale = self._current.get(path)
+                if stale is not None:
+                    self._entries.pop((path, stale), None)
+                self._entries[key] = self._load(path)
+            self._current[path] = signature
+            return self._entries[key]
+
+    def install(self, path, signature, rules):
+        """Serve prebuilt frozen rules for path (e.g. from rules_engine/snapshot.py)."""
+        path = str(Path(path).resolve())
+        with self._lock:
+            stale = self._current.get(path)
+            if stale is not None and stale != signature:
+                self._entries.pop((path, stale), None)
+            self._entries[(path, signature)] = rules
+            self._current[path] = signature
+
+    def loaded(self):
+        """{path: (signature, frozen rules)} for every directory currently served."""
+        return {path: (signature, self._entries[(path, signature)]) for path, signature in self._current.items()}
+
+    def refresh(self):
+        """Revalidate every loaded directory; returns the paths that were reloaded."""
+        changed = []
+        for path, signature in list(self._current.items()):
+            if self.get(path, revalidate=True) is not self._entries.get((path, signature)):
+                changed.append(path)
+        return changed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+
+
+# Process-wide registry shared by all analyzers
+registry = RuleRegistry()
+
+
+def get_rules(path, revalidate=False):
+    return registry.get(path, revalidate=revalidate)
@@ -0,0 +1,265 @@
+# AstroAgent/rules_engine/snapshot.py
+"""
+Prebuilt engine snapshot for fast worker start-up.
+
+    python -m rules_engine.snapshot compile [--data-path data] [-o engine.snapshot]
+    python -m rules_engine.snapshot measure [--runs 5]
+
+compile builds everything a worker would otherwise build on first use and
+writes it to one file:
+    - the frozen rule sets of data/house_rules and data/planetary_rules
+    - the compiled yogas (rules_engine/yoga_compiler.py)
+    - the gazetteer with its name index and KD-tree (utils/gazetteer.py)
+    - the Chebyshev tables with their derivative coefficients, when built
+
+Layout: an 8-byte magic, the lengths of a JSON header and of a pickle
+(protocol 5), then both, then the pickle's out-of-band buffers aligned to
+64 bytes. load_snapshot() memory-maps the file and hands those buffers to
+the unpickler, so NumPy tables are read-only views of the mapped pages and
+are shared between all workers on the machine instead of being copied.
+
+The header holds a version hash of the data files; a snapshot older than
+data/ is ignored and workers build everything as usual. measure runs fresh
+interpreters and reports the time from the first import to the first
+full_analysis report, with and without the snapshot.
+"""
+
+import copyreg
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from config import ENGINE_SNAPSHOT_PATH, GAZETTEER_PATH, EPHEMERIS_TABLE_PATH
+
+MAGIC = b"ASTRSNP1"
+HEADER = struct.Struct("<8sQQ")   # magic, header JSON length, pickle length
+ALIGN = 64
+RULE_DIRS = ("house_rules", "planetary_rules")
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def snapshot_version(data_path="data"):
+    """Version hash over the rule, gazetteer and ephemeris files a snapshot is built from."""
+    from rules_engine.report_cache import data_version
+    roots = {Path(data_path).resolve(), Path(GAZETTEER_PATH).parent.resolve(),
+             Path(EPHEMERIS_TABLE_PATH).resolve()}
+    roots = sorted(r for r in roots if r.exists() and not any(o != r and o in r.parents for o in roots))
+    digest = hashlib.sha1()
+    for root in roots:
+        digest.update(f"{root}\0{data_version(root)}\n".encode())
+    return digest.hexdigest()
+
+
+def build_state(data_path="data"):
+    """Load and build every table a worker needs; returns the picklable state dict."""
+    import numpy as np
+    from charts import chebyshev_ephemeris
+    from rules_engine.rule_registry import RuleRegistry, registry
+    from rules_engine.yoga_compiler import compile_yogas
+    from utils.gazetteer import Gazetteer
+
+    rules = {}
+    for name in RULE_DIRS:
+        path = Path(data_path) / name
+        if path.is_dir():
+            rules[name] = (RuleRegistry.signature(path), registry.get(path, revalidate=True))
+    yogas = None
+    if "house_rules" in rules and "yogas.json" in rules["house_rules"][1]:
+        yoga_rules = rules["house_rules"][1]["yogas.json"]
+        yogas = (yoga_rules, compile_yogas(yoga_rules))
+
+    ephemeris = None
+    if (Path(EPHEMERIS_TABLE_PATH) / "index.json").exists():
+        ephemeris = chebyshev_ephemeris.ChebyshevEphemeris(EPHEMERIS_TABLE_PATH)
+        for planet in list(ephemeris.coeffs):
+            coeffs = np.ascontiguousarray(np.asarray(ephemeris.coeffs[planet]))  # plain array, not memmap
+            ephemeris.coeffs[planet] = coeffs
+            ephemeris.deriv_coeffs[planet] = np.polynomial.chebyshev.chebder(coeffs, axis=1)
+
+    return {"rules": rules, "yogas": yogas, "gazetteer": Gazetteer(GAZETTEER_PATH), "ephemeris": ephemeris}
+
+
+def compile_snapshot(data_path="data", output=ENGINE_SNAPSHOT_PATH):
+    """Build the engine state and write it to output atomically; returns the header dict."""
+    from rules_engine.rule_registry import reduce_frozen
+    version = snapshot_version(data_path)
+    state = build_state(data_path)
+
+    buffers = []
+    stream = io.BytesIO()
+    pickler = pickle.Pickler(stream, protocol=5, buffer_callback=buffers.append)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[MappingProxyType] = reduce_frozen
+    pickler.dump(state)
+    payload = stream.getvalue()
+
+    header = {"version": version, "data_path": str(Path(data_path).resolve()),
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "buffers": []}
+    views = [buffer.raw() for buffer in buffers]
+    offset = 0   # relative to the first aligned byte after the pickle
+    for view in views:
+        header["buffers"].append([offset, view.nbytes])
+        offset = _aligned(offset + view.nbytes)
+    header_bytes = json.dumps(header).encode()
+    base = _aligned(HEADER.size + len(header_bytes) + len(payload))
+
+    tmp = Path(f"{output}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(header_bytes), len(payload)))
+        f.write(header_bytes)
+        f.write(payload)
+        for (start, _), view in zip(header["buffers"], views):
+            f.write(b"\0" * (base + start - f.tell()))
+            f.write(view)
+    os.replace(tmp, output)
+    return header
+
+
+def read_header(path=ENGINE_SNAPSHOT_PATH):
+    """The JSON header of a snapshot file, without loading the rest."""
+    with open(path, "rb") as f:
+        magic, header_len, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an engine snapshot")
+        return json.loads(f.read(header_len))
+
+
+def load_snapshot(path=ENGINE_SNAPSHOT_PATH, data_path="data"):
+    """
+    Memory-map a snapshot and install its rules, compiled yogas, gazetteer
+    and ephemeris tables as this process's shared instances.
+    Returns False (installing nothing) when the file is missing, unreadable
+    or older than the data files.
+    """
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len, payload_len = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            return False
+        header = json.loads(mapped[HEADER.size:HEADER.size + header_len])
+    except (OSError, ValueError, struct.error):
+        return False
+    if header["version"] != snapshot_version(data_path):
+        return False
+
+    start = HEADER.size + header_len
+    base = _aligned(start + payload_len)
+    view = memoryview(mapped)
+    state = pickle.loads(view[start:start + payload_len],
+                         buffers=[view[base + offset:base + offset + size] for offset, size in header["buffers"]])
+
+    from charts import chebyshev_ephemeris
+    from rules_engine.rule_registry import registry
+    from rules_engine.yoga_compiler import install_compiled
+    from utils.gazetteer import set_gazetteer
+
+    for name, (signature, rules) in state["rules"].items():
+        registry.install(Path(data_path) / name, signature, rules)
+    if state["yogas"] is not None:
+        install_compiled(*state["yogas"])
+    set_gazetteer(state["gazetteer"])
+    if state["ephemeris"] is not None:
+        chebyshev_ephemeris.set_default(state["ephemeris"])
+    return True
+
+
+# ---- cold start measurement ----
+
+_FIRST_REPORT = """
+import time
+started = time.perf_counter()
+import json, sys
+from datetime import datetime
+data_path, snapshot = sys.argv[1], sys.argv[2]
+loaded = False
+if snapshot:
+    from rules_engine.snapshot import load_snapshot
+    loaded = load_snapshot(snapshot, data_path)
+from rules_engine.analysis import AstrologyAnalysis
+from run_analysis import compute_planet_positions
+birth = datetime(1990, 1, 1, 12, 0)
+analysis = AstrologyAnalysis(data_path=data_path, birth_date=birth, birth_city="Varanasi")
+planets_in_houses, planets_with_signs = compute_planet_positions(birth, 25.32, 82.97)
+analysis.full_analysis(planets_in_houses, planets_with_signs)
+print(json.dumps({"import_to_report_s": time.perf_counter() - started, "snapshot_loaded": loaded}))
+"""
+
+
+def first_report_time(data_path="data", snapshot=None):
+    """
+    Run one fresh interpreter to its first full_analysis report. Returns
+    {"import_to_report_s", "process_s", "snapshot_loaded"}; process_s
+    includes interpreter start-up.
+    """
+    import subprocess
+
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", _FIRST_REPORT, data_path, snapshot or ""],
+                            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parents[1])
+    elapsed = time.perf_counter() - started
+    timing = json.loads(result.stdout.strip().splitlines()[-1])
+    timing["process_s"] = elapsed
+    return timing
+
+
+def measure_cold_start(data_path="data", runs=5, snapshot=None):
+    """
+    Median import-to-first-report and process times over runs fresh
+    interpreters, without and with a snapshot. When snapshot is None a
+    temporary one is compiled for the measurement.
+    """
+    import statistics
+    import tempfile
+
+    data_path = str(Path(data_path).resolve())
+    with tempfile.TemporaryDirectory() as tmp:
+        if snapshot is None:
+            snapshot = os.path.join(tmp, "engine.snapshot")
+            compile_snapshot(data_path, snapshot)
+        result = {}
+        for label, path in (("no_snapshot", None), ("snapshot", str(Path(snapshot).resolve()))):
+            timings = [first_report_time(data_path, path) for _ in range(runs)]
+            result[label] = {
+                "import_to_report_s": statistics.median(t["import_to_report_s"] for t in timings),
+                "process_s": statistics.median(t["process_s"] for t in timings),
+                "snapshot_loaded": all(t["snapshot_loaded"] for t in timings),
+            }
+    return result
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or measure the prebuilt engine snapshot.")
+    parser.add_argument("command", choices=("compile", "measure"))
+    parser.add_argument("--data-path", default="data")
+    parser.add_argument("-o", "--output", default=ENGINE_SNAPSHOT_PATH, help="snapshot file (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters per measurement (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        header = compile_snapshot(args.data_path, args.output)
+        size = os.path.getsize(args.output)
+        print(f"Wrote {args.output}: {size / 1024:.0f} KiB, {len(header['buffers'])} mapped tables, "
+              f"version {header['version'][:12]}")
+    else:
+        snapshot = args.output if os.path.exists(args.output) else None
+        print(json.dumps(measure_cold_start(args.data_path, args.runs, snapshot), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# AstroAgent/rules_engine/yoga_compiler.py
+"""
+Compiles yogas.json into integer tests.
+
+A chart is encoded as a 12-word house occupancy vector and a 12-word sign
+occupancy vector, each word a 9-bit planet mask (bit i = config.PLANETS[i]),
+plus each planet's house/sign index and the lagna sign. Every condition
+becomes one or more atoms that are plain integer ANDs/shifts on that
+encoding; a yoga holds when all atoms of any one of its conditions hold.
+
+Condition types (a yoga's "conditions" list is OR-ed, "all" is AND-ed):
+    {"house": 1, "planets": ["Moon", "Jupiter"]}      planets together in house 1
+    {"house": "any", "planets": ["Moon", "Mars"]}     planets together in any house
+    {"sign": "Cancer", "planets": ["Jupiter"]}        planets together in a sign
+    {"planet": "Jupiter", "in_houses": [1, 4, 7, 10]} planet in one of the houses
+    {"planet": "Jupiter", "in_signs": ["Cancer"]}     planet in one of the signs
+    {"planet": "Jupiter", "from": "Moon", "houses": [1, 4, 7, 10]}
+                                                      house counted from another planet
+    {"aspect": {"from": "Jupiter", "to": "Moon"}}     graha drishti (charts.aspects)
+    {"lord_of": 9, "in_houses": [1, 5, 9]}            lordship placement
+    {"lord_of": 9, "with_lord_of": 10}                lords conjoined
+    {"all": [condition, ...]}                         conjunction of conditions
+"""
+
+from collections import Counter, OrderedDict, namedtuple
+
+import numpy as np
+
+from config import PLANETS, SIGN_LORDS
+from charts.aspects import VEDIC_ASPECTS
+from utils.chart_utils import house_number, sign_index
+
+PLANET_INDEX = {planet: i for i, planet in enumerate(PLANETS)}
+PLANET_BITS = np.left_shift(1, np.arange(len(PLANETS))).astype(np.uint16)
+
+# For each lagna sign, the planet index ruling each house 1-12
+LORD_TABLE = np.array(
+    [[PLANET_INDEX[SIGN_LORDS[(lagna + h) % 12]] for h in range(12)] for lagna in range(12)],
+    dtype=np.int8,
+)
+LORD_LISTS = LORD_TABLE.tolist()
+
+EncodedChart = namedtuple("EncodedChart", ["house_occ", "sign_occ", "planet_house", "planet_sign", "lagna"])
+EncodedBatch = namedtuple("EncodedBatch", ["house_occ", "sign_occ", "planet_house", "planet_sign", "lagna"])
+
+# Atoms:
+#   ("mask", space, index, mask)         space "house"/"sign", index -1 = any
+#   ("place", planet, space, allowed)    allowed: 12-bit mask of house/sign indexes
+#   ("rel", planet, from_planet, allowed) allowed: 12-bit mask of distances 0-11
+#   ("lord", house, allowed)             lord of house (0-11) placed in allowed houses
+#   ("lords", house_a, house_b)          lords of two houses in the same house
+
+
+def _planet_mask(planets):
+    mask = 0
+    for planet in planets:
+        mask |= 1 << PLANET_INDEX[planet]
+    return mask
+
+
+def _bits(indexes):
+    mask = 0
+    for i in indexes:
+        mask |= 1 << i
+    return mask
+
+
+def compile_condition(condition):
+    """Compile one condition dict into a tuple of atoms (AND-ed)."""
+    if "all" in condition:
+        return tuple(atom for sub in condition["all"] for atom in compile_condition(sub))
+
+    if "aspect" in condition:
+        aspect = condition["aspect"]
+        source = aspect["from"]
+        distances = _bits(n - 1 for n in VEDIC_ASPECTS.get(source, []))
+        return (("rel", PLANET_INDEX[aspect["to"]], PLANET_INDEX[source], distances),)
+
+    if "lord_of" in condition:
+        house = house_number(condition["lord_of"]) - 1
+        if "with_lord_of" in condition:
+            return (("lords", house, house_number(condition["with_lord_of"]) - 1),)
+        return (("lord", house, _bits(house_number(h) - 1 for h in condition["in_houses"])),)
+
+    if "planet" in condition:
+        planet = PLANET_INDEX[condition["planet"]]
+        if "from" in condition:
+            return (("rel", planet, PLANET_INDEX[condition["from"]],
+                     _bits(house_number(h) - 1 for h in condition["houses"])),)
+        if "in_houses" in condition:
+            return (("place", planet, "house", _bits(house_number(h) - 1 for h in condition["in_houses"])),)
+        if "in_signs" in condition:
+            return (("place", planet, "sign", _bits(sign_index(s) for s in condition["in_signs"])),)
+
+    if "planets" in condition:
+        mask = _planet_mask(condition["planets"])
+        if "sign" in condition:
+            return (("mask", "sign", sign_index(condition["sign"]), mask),)
+        house = condition.get("house", "any")
+        index = -1 if house == "any" else house_number(house) - 1
+        return (("mask", "house", index, mask),)
+
+    raise ValueError(f"Unsupported yoga condition: {dict(condition)}")
+
+
+def atom_matches(atom, chart):
+    kind = atom[0]
+    if kind == "mask":
+        _, space, index, mask = atom
+        occ = chart.house_occ if space == "house" else chart.sign_occ
+        if index < 0:
+            return any(word & mask == mask for word in occ)
+        return occ[index] & mask == mask
+    if kind == "place":
+        _, planet, space, allowed = atom
+        value = (chart.planet_house if space == "house" else chart.planet_sign)[planet]
+        return value >= 0 and (allowed >> value) & 1 == 1
+    if kind == "rel":
+        _, planet, source, allowed = atom
+        a, b = chart.planet_house[planet], chart.planet_house[source]
+        return a >= 0 and b >= 0 and (allowed >> ((a - b) % 12)) & 1 == 1
+    if chart.lagna < 0:
+        return False
+    lords = LORD_LISTS[chart.lagna]
+    if kind == "lord":
+        _, house, allowed = atom
+        value = chart.planet_house[lords[house]]
+        return value >= 0 and (allowed >> value) & 1 == 1
+    _, house_a, house_b = atom
+    value = chart.planet_house[lords[house_a]]
+    return value >= 0 and value == chart.planet_house[lords[house_b]]
+
+
+def encode_chart(planets_in_houses, planets_with_signs=None, lagna=None):
+    """
+    Encode the dict shapes used by the analyzers.
+    planets_in_houses keys may be 1, "1" or "1st House".
+    lagna: sign name/index of the ascendant; derived from the planets'
+        sign/house pairs (most common offset) when not given.
+    """
+    house_occ = [0] * 12
+    sign_occ = [0] * 12
+    planet_house = [-1] * len(PLANETS)
+    planet_sign = [-1] * len(PLANETS)
+
+    for label, planets in planets_in_houses.items():
+        h = house_number(label) - 1
+        for planet in planets:
+            i = PLANET_INDEX.get(planet)
+            if i is not None:
+                planet_house[i] = h
+                house_occ[h] |= 1 << i
+
+    for planet, sign in (planets_with_signs or {}).items():
+        i = PLANET_INDEX.get(planet)
+        if i is not None:
+            s = sign_index(sign)
+            planet_sign[i] = s
+            sign_occ[s] |= 1 << i
+
+    if lagna is not None:
+        lagna = sign_index(lagna)
+    else:
+        offsets = Counter((s - h) % 12 for s, h in zip(planet_sign, planet_house) if s >= 0 and h >= 0)
+        # ties go to the lowest offset, matching argmax in encode_batch
+        lagna = max(sorted(offsets), key=offsets.get) if offsets else -1
+
+    return EncodedChart(tuple(house_occ), tuple(sign_occ), tuple(planet_house), tuple(planet_sign), lagna)
+
+
+def encode_batch(signs, houses, lagna=None):
+    """
+    Encode a batch of charts from (N, 9) arrays as returned by
+    charts.ephemeris.compute_positions_batch: signs 0-11, houses 1-12.
+    lagna: (N,) sign indexes; derived per chart like encode_chart when None.
+    """
+    signs = np.asarray(signs, dtype=np.int8)
+    planet_house = np.asarray(houses, dtype=np.int8) - 1
+    slots = np.arange(12, dtype=np.int8)
+    bits = PLANET_BITS[None, :, None]
+    house_occ = ((planet_house[:, :, None] == slots) * bits).sum(axis=1).astype(np.uint16)
+    sign_occ = ((signs[:, :, None] == slots) * bits).sum(axis=1).astype(np.uint16)
+    if lagna is None:
+        offsets = (signs - planet_house) % 12
+        lagna = (offsets[:, :, None] == slots).sum(axis=1).argmax(axis=1)
+    return EncodedBatch(house_occ, sign_occ, planet_house, signs, np.asarray(lagna, dtype=np.int8))
+
+
+def _group_fields(atom):
+    """Batch group key and integer fields of an atom."""
+    kind = atom[0]
+    if kind == "mask":
+        _, space, index, mask = atom
+        return (("mask", space), (index, mask)) if index >= 0 else (("mask_any", space), (mask,))
+    if kind == "place":
+        _, planet, space, allowed = atom
+        return ("place", space), (planet, allowed)
+    return (kind,), atom[1:]
+
+
+class CompiledYogas:
+    """
+    yogas.json compiled once into atoms, clauses (AND of atoms) and yogas
+    (OR of clauses). detect() runs the atoms as Python integer ops;
+    detect_batch() evaluates every atom of every rule across N charts as
+    array operations and reduces with two small incidence matrix products.
+    """
+
+    def __init__(self, yoga_rules):
+        self.names = []
+        self.atoms = []
+        self.clauses = []  # (yoga index, atom indexes)
+        atom_ids = {}
+        for yoga_name, rules in yoga_rules.items():
+            yoga_index = len(self.names)
+            self.names.append(yoga_name)
+            for condition in rules.get("conditions", []):
+                try:
+                    atoms = compile_condition(condition)
+                except (KeyError, ValueError) as e:
+                    raise ValueError(f"Invalid condition in yoga '{yoga_name}': {e}") from e
+                ids = []
+                for atom in atoms:
+                    if atom not in atom_ids:
+                        atom_ids[atom] = len(self.atoms)
+                        self.atoms.append(atom)
+                    ids.append(atom_ids[atom])
+                self.clauses.append((yoga_index, tuple(ids)))
+        self._build_arrays()
+
+    def _build_arrays(self):
+        n_atoms, n_clauses = len(self.atoms), len(self.clauses)
+        self.clause_atoms = np.zeros((n_atoms, n_clauses), dtype=np.int32)
+        self.clause_sizes = np.zeros(n_clauses, dtype=np.int32)
+        self.clause_yogas = np.zeros((n_clauses, len(self.names)), dtype=np.int32)
+        for c, (yoga_index, ids) in enumerate(self.clauses):
+            self.clause_atoms[list(ids), c] = 1
+            self.clause_sizes[c] = len(ids)
+            self.clause_yogas[c, yoga_index] = 1
+
+        groups = {}
+        for column, atom in enumerate(self.atoms):
+            key, fields = _group_fields(atom)
+            groups.setdefault(key, ([], []))
+            groups[key][0].append(column)
+            groups[key][1].append(fields)
+        self.groups = {key: (np.array(columns), np.array(fields, dtype=np.int64))
+                       for key, (columns, fields) in groups.items()}
+
+    def detect(self, chart):
+        """Names of the yogas present in one EncodedChart."""
+        hits = [False] * len(self.names)
+        for yoga_index, ids in self.clauses:
+            if not hits[yoga_index] and all(atom_matches(self.atoms[i], chart) for i in ids):
+                hits[yoga_index] = True
+        return [name for name, hit in zip(self.names, hits) if hit]
+
+    def atom_hits(self, batch):
+        """(N, n_atoms) bool matrix of every atom evaluated on every chart."""
+        n = len(batch.lagna)
+        hits = np.zeros((n, len(self.atoms)), dtype=bool)
+        rows = np.arange(n)[:, None]
+        lagna = np.clip(batch.lagna, 0, 11)
+        known_lagna = (batch.lagna >= 0)[:, None]
+        for key, (columns, fields) in self.groups.items():
+            kind = key[0]
+            if kind == "mask":
+                occ = (batch.house_occ if key[1] == "house" else batch.sign_occ).astype(np.int64)
+                masks = fields[:, 1]
+                hits[:, columns] = (occ[:, fields[:, 0]] & masks) == masks
+            elif kind == "mask_any":
+                occ = (batch.house_occ if key[1] == "house" else batch.sign_occ).astype(np.int64)
+                masks = fields[:, 0]
+                hits[:, columns] = ((occ[:, :, None] & masks) == masks).any(axis=1)
+            elif kind == "place":
+                values = (batch.planet_house if key[1] == "house" else batch.planet_sign)[:, fields[:, 0]]
+                hits[:, columns] = (values >= 0) & (((fields[:, 1] >> np.clip(values, 0, 11)) & 1) == 1)
+            elif kind == "rel":
+                a = batch.planet_house[:, fields[:, 0]].astype(np.int64)
+                b = batch.planet_house[:, fields[:, 1]].astype(np.int64)
+                hits[:, columns] = (a >= 0) & (b >= 0) & (((fields[:, 2] >> ((a - b) % 12)) & 1) == 1)
+            elif kind == "lord":
+                lords = LORD_TABLE[lagna][:, fields[:, 0]]
+                values = batch.planet_house[rows, lords].astype(np.int64)
+                hits[:, columns] = known_lagna & (values >= 0) & (((fields[:, 1] >> np.clip(values, 0, 11)) & 1) == 1)
+            else:
+                table = LORD_TABLE[lagna]
+                a = batch.planet_house[rows, table[:, fields[:, 0]]]
+                b = batch.planet_house[rows, table[:, fields[:, 1]]]
+                hits[:, columns] = known_lagna & (a >= 0) & (a == b)
+        return hits
+
+    def detect_batch(self, batch):
+        """(N, n_yogas) bool matrix for an EncodedBatch; columns follow self.names."""
+        hits = self.atom_hits(batch).astype(np.int32)
+        clause_hits = (hits @ self.clause_atoms) == self.clause_sizes
+        return (clause_hits.astype(np.int32) @ self.clause_yogas) > 0
+
+
+# id(yoga_rules) -> (yoga_rules, CompiledYogas), most recently used last.
+# The registry's frozen mappings are mappingproxy objects, which cannot be
+# weakly referenced, so the cache is bounded instead: every rules reload
+# (revalidate, ChartStore.rebuild_yogas, incremental refreshes) makes a new
+# mapping, and the old ones are dropped once COMPILED_CACHE_SIZE newer exist.
+COMPILED_CACHE_SIZE = 8
+_compiled_cache = OrderedDict()
+
+
+def _remember(yoga_rules, compiled):
+    _compiled_cache[id(yoga_rules)] = (yoga_rules, compiled)
+    _compiled_cache.move_to_end(id(yoga_rules))
+    while len(_compiled_cache) > COMPILED_CACHE_SIZE:
+        _compiled_cache.popitem(last=False)
+
+
+def compile_yogas(yoga_rules):
+    """
+    Compile a yogas.json mapping once. The frozen mappings handed out by the
+    rule registry are long-lived, so results are cached by identity.
+    """
+    entry = _compiled_cache.get(id(yoga_rules))
+    if entry is None or entry[0] is not yoga_rules:
+        compiled = CompiledYogas(yoga_rules)
+        _remember(yoga_rules, compiled)
+        return compiled
+    _compiled_cache.move_to_end(id(yoga_rules))
+    return entry[1]
+
+
+def install_compiled(yoga_rules, compiled):
+    """Register an already compiled CompiledYogas (e.g. from a snapshot) for yoga_rules."""
+    _remember(yoga_rules, compiled)
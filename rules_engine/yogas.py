@@ -1,53 +1,50 @@
 # AstroAgent/rules_engine/yogas.py
 
-import json
 from pathlib import Path
+from rules_engine.rule_registry import get_rules
+from rules_engine.yoga_compiler import compile_yogas, compile_condition, atom_matches, encode_chart, encode_batch
+from utils import metrics
 
 class Yogas:
-    def __init__(self, data_path="data/house_rules"):
+    def __init__(self, data_path="data/house_rules", rules=None):
         """
         data_path: folder containing yoga rules JSON
         Example files: 'yogas.json'
+        rules: frozen {filename: rules} mapping from the shared RuleRegistry
         """
         self.data_path = Path(data_path)
+        self.rules = rules if rules is not None else get_rules(data_path)
         self.yoga_rules = self.load_json("yogas.json")
+        self.compiled = compile_yogas(self.yoga_rules)
 
     def load_json(self, filename):
-        file_path = self.data_path / filename
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.rules[filename]
 
-    def detect_yogas(self, planets_in_houses):
+    def detect_yogas(self, planets_in_houses, planets_with_signs=None, lagna=None):
         """
         Detect yogas based on planets in houses
-        planets_in_houses: dict {house_number: [planet1, planet2,...]}
+        planets_in_houses: dict {house: [planet1, planet2,...]}, house as 1 or "1st House"
+        planets_with_signs: optional {planet: sign}, needed for sign and lordship conditions
         Returns a list of detected yogas
         """
-        detected = []
+        chart = encode_chart(planets_in_houses, planets_with_signs, lagna)
+        metrics.incr("rule_evaluations_total", len(self.compiled.names), analyzer="yogas")
+        return self.compiled.detect(chart)
 
-        for yoga_name, rules in self.yoga_rules.items():
-            # Each yoga rule contains a list of conditions
-            conditions = rules.get("conditions", [])
-
-            for condition in conditions:
-                if self.check_condition(condition, planets_in_houses):
-                    detected.append(yoga_name)
-                    break  # Yoga detected, no need to check other conditions
-
-        return detected
+    def detect_yogas_batch(self, signs, houses, lagna=None):
+        """
+        Detect yogas for N charts at once.
+        signs, houses: (N, 9) arrays as returned by charts.ephemeris.compute_positions_batch
+        Returns (yoga names, (N, n_yogas) bool array)
+        """
+        metrics.incr("rule_evaluations_total", len(self.compiled.names) * len(signs), analyzer="yogas")
+        return self.compiled.names, self.compiled.detect_batch(encode_batch(signs, houses, lagna))
 
-    def check_condition(self, condition, planets_in_houses):
+    def check_condition(self, condition, planets_in_houses, planets_with_signs=None):
         """
         Check if a single yoga condition is satisfied
         Example condition: {"house": 1, "planets": ["Mars", "Sun"]}
-        Can be extended for multiple types of rules (e.g., lord combinations, aspects)
+        See rules_engine/yoga_compiler.py for the supported condition types
         """
-        house = str(condition.get("house"))
-        required_planets = condition.get("planets", [])
-
-        planets_here = planets_in_houses.get(int(house), [])
-
-        # Check if all required planets are present in the house
-        if all(p in planets_here for p in required_planets):
-            return True
-        return False
+        chart = encode_chart(planets_in_houses, planets_with_signs)
+        return all(atom_matches(atom, chart) for atom in compile_condition(condition))
@@ -3,43 +3,18 @@
 from rules_engine.analysis import AstrologyAnalysis
 from datetime import datetime
 from pprint import pprint
-
-try:
-    import swisseph as swe
-except ImportError:
-    swe = None
-    print("pyswisseph not installed. Planetary positions will use demo values.")
-
-try:
-    from geopy.geocoders import Nominatim
-except ImportError:
-    Nominatim = None
-    print("geopy not installed. Latitude/Longitude will use demo values.")
-
-
-def get_lat_lon(city_name):
-    if Nominatim is None or not city_name.strip():
-        return 0.0, 0.0
-    geolocator = Nominatim(user_agent="astroagent")
-    location = geolocator.geocode(city_name)
-    if location:
-        return location.latitude, location.longitude
-    else:
-        print(f"Could not find city '{city_name}', using demo coordinates.")
-        return 0.0, 0.0
+from charts.ephemeris import compute_positions_batch, batch_to_dicts, available_backend
+from utils.geocode_utils import get_lat_lon
 
 
 def compute_planet_positions(birth_datetime, latitude=0.0, longitude=0.0):
     """
     Return a tuple: (planets_in_houses_dict, planets_with_signs_dict)
-    Uses Swiss Ephemeris if available, else returns demo values.
+    Uses the precomputed Chebyshev tables or Swiss Ephemeris if available,
+    else returns demo values.
     """
-    planets = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
-    planets_in_houses = {}
-    planets_with_signs = {}
-
-    if swe is None:
-        # Demo values
+    if available_backend() is None:
+        # Demo values (no pyswisseph and no Chebyshev tables)
         planets_in_houses = {
             "1st House": ["Sun", "Mercury", "Venus"],
             "3rd House": ["Moon", "Mars"],
@@ -59,46 +34,16 @@ def compute_planet_positions(birth_datetime, latitude=0.0, longitude=0.0):
         }
         return planets_in_houses, planets_with_signs
 
-    # Compute Julian Day
-    jd_ut = swe.julday(
-        birth_datetime.year,
-        birth_datetime.month,
-        birth_datetime.day,
-        birth_datetime.hour + birth_datetime.minute / 60.0
-    )
-
-    # Get positions for each planet
-    for planet in planets:
-        if planet == "Rahu":
-            planet_id = swe.MEAN_NODE
-        elif planet == "Ketu":
-            planet_id = swe.MEAN_NODE
-        else:
-            planet_id = getattr(swe, planet.upper())
-
-        lon = swe.calc_ut(jd_ut, planet_id)[0][0] % 360
-        sign_index = int(lon // 30)
-        sign_name = ["Aries","Taurus","Gemini","Cancer","Leo","Virgo",
-                     "Libra","Scorpio","Sagittarius","Capricorn","Aquarius","Pisces"][sign_index]
-
-        planets_with_signs[planet] = sign_name
+    batch = compute_positions_batch([birth_datetime], latitude, longitude)
+    return batch_to_dicts(batch, 0)
 
-        # Compute house
-        if latitude is not None and longitude is not None:
-            # Using Placidus, can expand later
-            cusps, ascmc = swe.houses(jd_ut, latitude, longitude)
-            house_num = 1
-            for i, cusp in enumerate(cusps, 1):
-                if lon < cusp:
-                    house_num = i
-                    break
-            house_name = f"{house_num}th House"
-        else:
-            house_name = "1st House"
 
-        planets_in_houses.setdefault(house_name, []).append(planet)
-
-    return planets_in_houses, planets_with_signs
+def compute_planet_positions_batch(birth_datetimes, latitudes=None, longitudes=None):
+    """
+    Vectorized variant of compute_planet_positions for many births at once.
+    Returns NumPy arrays of longitudes, signs and houses (see charts.ephemeris).
+    """
+    return compute_positions_batch(birth_datetimes, latitudes, longitudes)
 
 
 if __name__ == "__main__":
@@ -112,6 +57,8 @@ if __name__ == "__main__":
     birth_datetime = datetime(year, month, day, hour, minute)
 
     latitude, longitude = get_lat_lon(birth_city)
+    if available_backend() is None:
+        print("pyswisseph not installed. Planetary positions will use demo values.")
 
     planets_in_houses, planets_with_signs = compute_planet_positions(birth_datetime, latitude, longitude)
 
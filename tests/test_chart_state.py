@@ -0,0 +1,47 @@
+# AstroAgent/tests/test_chart_state.py
+"""Round trips between ChartState and the analyzers' dict shapes."""
+
+import pytest
+
+from config import PLANETS, ZODIAC_SIGNS
+from charts.chart_state import NO_HOUSE, ChartState
+
+SIGNS = {planet: ZODIAC_SIGNS[i] for i, planet in enumerate(PLANETS)}
+
+
+def _sorted(planets_in_houses):
+    """Houses compared as sets; to_dicts() lists planets in config.PLANETS order."""
+    return {house: sorted(planets) for house, planets in planets_in_houses.items()}
+
+
+def test_full_dicts_round_trip():
+    houses = {"1st House": ["Sun", "Mercury"], "4th House": ["Moon"], "7th House": ["Mars", "Venus", "Jupiter"],
+              "10th House": ["Saturn"], "11th House": ["Rahu"], "5th House": ["Ketu"]}
+    planets_in_houses, planets_with_signs = ChartState.from_dicts(houses, SIGNS).to_dicts()
+    assert _sorted(planets_in_houses) == _sorted(houses)
+    assert planets_with_signs == SIGNS
+
+
+def test_partial_houses_round_trip():
+    houses = {"1st House": ["Sun", "Mercury"], "4th House": ["Moon"], "7th House": ["Mars", "Venus", "Jupiter"]}
+    state = ChartState.from_dicts(houses, SIGNS)
+    planets_in_houses, planets_with_signs = state.to_dicts()
+    assert _sorted(planets_in_houses) == _sorted(houses)
+    assert planets_with_signs == SIGNS
+    assert list(state.houses[[PLANETS.index(p) for p in ("Saturn", "Rahu", "Ketu")]]) == [NO_HOUSE] * 3
+
+
+def test_missing_sign_is_rejected():
+    signs = dict(SIGNS)
+    del signs["Saturn"]
+    with pytest.raises(ValueError, match="Saturn"):
+        ChartState.from_dicts({"1st House": ["Sun"]}, signs)
+
+
+def test_planet_position_errors_are_rejected():
+    positions = {planet: {"sign": SIGNS[planet], "longitude": 30.0 * i + 1.0, "house": i % 12 + 1}
+                 for i, planet in enumerate(PLANETS)}
+    assert ChartState.from_planet_positions(positions).to_planet_positions()["Moon"]["house"] == 2
+    positions["Rahu"] = {"error": "node not computed"}
+    with pytest.raises(ValueError, match="Rahu"):
+        ChartState.from_planet_positions(positions)
@@ -0,0 +1,68 @@
+# AstroAgent/tests/test_chebyshev_ephemeris.py
+"""
+Accuracy of the Chebyshev tables (charts/chebyshev_ephemeris.py) against
+swisseph on seeded random dates; skipped without pyswisseph or built tables.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from config import EPHEMERIS_TABLE_PATH, PLANETS
+
+swe = pytest.importorskip("swisseph")
+if not (Path(EPHEMERIS_TABLE_PATH) / "index.json").exists():
+    pytest.skip("Chebyshev tables not built", allow_module_level=True)
+
+from charts.chebyshev_ephemeris import ChebyshevEphemeris, _swe_body
+
+# body -> (longitude arcsec, speed arcsec/day); measured worst case is ~4" (Saturn)
+TOLERANCES = {planet: (5.0, 10.0) for planet in PLANETS}
+TOLERANCES.update({"Sun": (0.1, 1.0), "Moon": (0.1, 1.0), "Rahu": (0.1, 1.0), "Ketu": (0.1, 1.0)})
+SAMPLES = 200
+
+
+@pytest.fixture(scope="module")
+def ephemeris():
+    return ChebyshevEphemeris(EPHEMERIS_TABLE_PATH)
+
+
+@pytest.fixture(scope="module")
+def dates(ephemeris):
+    rng = np.random.default_rng(2024)
+    return rng.uniform(ephemeris.start_jd, ephemeris.end_jd, SAMPLES)
+
+
+def _reference(planet, jds):
+    body = _swe_body("Rahu" if planet == "Ketu" else planet)
+    rows = np.array([swe.calc_ut(float(jd), body, swe.FLG_SPEED)[0] for jd in jds])
+    lons = rows[:, 0] + (180.0 if planet == "Ketu" else 0.0)
+    return lons % 360.0, rows[:, 3]
+
+
+def _arcsec(a, b):
+    return np.abs((a - b + 180.0) % 360.0 - 180.0) * 3600.0
+
+
+@pytest.mark.parametrize("planet", PLANETS)
+def test_body_positions_match_swisseph(ephemeris, dates, planet):
+    lons, speeds = ephemeris.body_positions(planet, dates)
+    ref_lons, ref_speeds = _reference(planet, dates)
+    lon_tol, speed_tol = TOLERANCES[planet]
+    assert _arcsec(lons, ref_lons).max() < lon_tol
+    assert (np.abs(speeds - ref_speeds) * 3600.0).max() < speed_tol
+
+
+@pytest.mark.parametrize("planet", PLANETS)
+def test_scalar_path_matches_vectorized(ephemeris, dates, planet):
+    lons, speeds = ephemeris.body_positions(planet, dates[:20])
+    for jd, lon, speed in zip(dates[:20], lons, speeds):
+        scalar_lon, scalar_speed = ephemeris.longitude_speed(planet, jd)
+        assert _arcsec(scalar_lon, lon) < 1e-6
+        assert abs(scalar_speed - speed) < 1e-9
+
+
+def test_positions_reject_dates_outside_tables(ephemeris):
+    with pytest.raises(ValueError):
+        ephemeris.positions([ephemeris.end_jd + 1.0])
@@ -0,0 +1,36 @@
+# AstroAgent/utils/chart_utils.py
+
+import re
+
+from config import HOUSES, ZODIAC_SIGNS
+
+_DIGITS = re.compile(r"\d+")
+
+
+def house_number(label):
+    """
+    Normalize a house key to its number 1-12.
+    Accepts 10, "10", "10th House", "1st House" and the like.
+    """
+    if isinstance(label, int):
+        number = label
+    else:
+        match = _DIGITS.search(str(label))
+        if match is None:
+            raise ValueError(f"Not a house: {label!r}")
+        number = int(match.group())
+    if not 1 <= number <= 12:
+        raise ValueError(f"House out of range: {label!r}")
+    return number
+
+
+def house_label(number):
+    """Canonical label for a house number, e.g. 1 -> '1st House'."""
+    return HOUSES[number - 1]
+
+
+def sign_index(sign):
+    """Normalize a sign name or index to 0-11 (0 = Aries)."""
+    if isinstance(sign, int):
+        return sign % 12
+    return ZODIAC_SIGNS.index(sign)
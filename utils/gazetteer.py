@@ -0,0 +1,199 @@
+# AstroAgent/utils/gazetteer.py
+"""
+Offline city database for geocoding without network access.
+
+Cities are loaded once from a GeoNames-style CSV (see data/geo/cities.csv:
+name, asciiname, alternatenames, latitude, longitude, country_code,
+population, timezone) into:
+  - a hash index from normalized name (and every alternate name) to cities,
+  - a sorted key list for prefix and fuzzy lookups,
+  - a KD-tree over unit vectors for nearest-city reverse lookups.
+"""
+
+import bisect
+import csv
+import difflib
+import math
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+from config import GAZETTEER_PATH
+
+City = namedtuple("City", ["name", "latitude", "longitude", "country_code", "population", "timezone"])
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name):
+    """Lower-case, strip accents and punctuation, collapse whitespace."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+
+def _to_unit_vector(latitude, longitude):
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+class _KDNode:
+    __slots__ = ("point", "index", "axis", "left", "right")
+
+    def __init__(self, point, index, axis, left, right):
+        self.point = point
+        self.index = index
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+def _build_kdtree(items, depth=0):
+    """items: list of (unit_vector, city_index)"""
+    if not items:
+        return None
+    axis = depth % 3
+    items.sort(key=lambda item: item[0][axis])
+    mid = len(items) // 2
+    point, index = items[mid]
+    return _KDNode(point, index, axis,
+                   _build_kdtree(items[:mid], depth + 1),
+                   _build_kdtree(items[mid + 1:], depth + 1))
+
+
+class Gazetteer:
+    """
+    In-memory city index. Lookups are dict/bisect operations: microseconds.
+    """
+
+    def __init__(self, csv_path=GAZETTEER_PATH):
+        self.cities = []
+        self.name_index = {}
+        self._load(csv_path)
+        self.sorted_keys = sorted(self.name_index)
+        self.kdtree = _build_kdtree(
+            [(_to_unit_vector(c.latitude, c.longitude), i) for i, c in enumerate(self.cities)]
+        )
+
+    def _load(self, csv_path):
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                city = City(
+                    name=row["name"],
+                    latitude=float(row["latitude"]),
+                    longitude=float(row["longitude"]),
+                    country_code=row.get("country_code", ""),
+                    population=int(row.get("population") or 0),
+                    timezone=row.get("timezone", ""),
+                )
+                index = len(self.cities)
+                self.cities.append(city)
+                names = {row["name"], row.get("asciiname", "")}
+                names.update((row.get("alternatenames") or "").split(";"))
+                for alias in names:
+                    key = normalize_name(alias)
+                    if key:
+                        self.name_index.setdefault(key, []).append(index)
+
+        # Most populous city first when a name is ambiguous
+        for key, indexes in self.name_index.items():
+            indexes.sort(key=lambda i: -self.cities[i].population)
+
+    def _best(self, key, country_code=None):
+        for i in self.name_index.get(key, ()):
+            city = self.cities[i]
+            if country_code is None or city.country_code == country_code:
+                return city
+        return None
+
+    def lookup(self, name, country_code=None):
+        """Exact lookup on the normalized name. Returns a City or None."""
+        return self._best(normalize_name(name), country_code)
+
+    def prefix_search(self, prefix, limit=10):
+        """Cities whose normalized name starts with prefix, most populous first."""
+        prefix = normalize_name(prefix)
+        start = bisect.bisect_left(self.sorted_keys, prefix)
+        found = set()
+        for key in self.sorted_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            found.update(self.name_index[key])
+        ranked = sorted(found, key=lambda i: -self.cities[i].population)
+        return [self.cities[i] for i in ranked[:limit]]
+
+    def fuzzy_lookup(self, name, cutoff=0.8):
+        """
+        Closest spelling match (e.g. 'Varansi', 'Banglore'). Candidates are
+        narrowed to keys sharing the first letter through the prefix index.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+        start = bisect.bisect_left(self.sorted_keys, key[0])
+        end = bisect.bisect_left(self.sorted_keys, chr(ord(key[0]) + 1))
+        matches = difflib.get_close_matches(key, self.sorted_keys[start:end], n=1, cutoff=cutoff)
+        return self._best(matches[0]) if matches else None
+
+    def resolve(self, query):
+        """
+        Resolve free text such as 'Varanasi', 'Varanasi, India' or 'Paris, FR':
+        exact match on the full text, then on the part before the first comma
+        (qualified by country code when one is given), then a fuzzy match.
+        """
+        city = self.lookup(query)
+        if city is not None:
+            return city
+        parts = [p.strip() for p in query.split(",") if p.strip()]
+        if not parts:
+            return None
+        country_code = None
+        if len(parts) > 1 and len(parts[-1]) == 2:
+            country_code = parts[-1].upper()
+        city = self.lookup(parts[0], country_code) or self.lookup(parts[0])
+        return city or self.fuzzy_lookup(parts[0])
+
+    def nearest(self, latitude, longitude):
+        """Reverse lookup: the city nearest to a coordinate (great-circle)."""
+        target = _to_unit_vector(latitude, longitude)
+        best = [None, float("inf")]
+
+        def visit(node):
+            if node is None:
+                return
+            d = sum((a - b) ** 2 for a, b in zip(node.point, target))
+            if d < best[1]:
+                best[0], best[1] = node.index, d
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            visit(near)
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self.kdtree)
+        return self.cities[best[0]] if best[0] is not None else None
+
+
+_default_gazetteer = None
+
+
+def get_gazetteer():
+    """Process-wide Gazetteer for config.GAZETTEER_PATH, loaded on first use."""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        _default_gazetteer = Gazetteer(GAZETTEER_PATH)
+    return _default_gazetteer
+
+
+def set_gazetteer(gazetteer):
+    """Replace the process-wide Gazetteer (e.g. with one loaded from a snapshot)."""
+    global _default_gazetteer
+    _default_gazetteer = gazetteer
+    resolve_city.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def resolve_city(query):
+    """LRU-cached Gazetteer.resolve on the default gazetteer."""
+    return get_gazetteer().resolve(query)
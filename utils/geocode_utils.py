@@ -1,22 +1,41 @@
-try:
-    from geopy.geocoders import Nominatim
-except ImportError:
-    Nominatim = None
-    print("geopy not installed. Latitude/Longitude will use demo values.")
+from config import GEOCODE_ALLOW_NETWORK
+from utils.gazetteer import resolve_city
+from utils import metrics
+from utils.optional_imports import optional_module
 
 
-def get_lat_lon(city_name: str):
-    if Nominatim is None or not city_name.strip():
-        return 0.0, 0.0
-
+def _network_lat_lon(city_name: str):
     try:
-        geolocator = Nominatim(user_agent="astroagent")
+        geolocator = optional_module("geopy.geocoders").Nominatim(user_agent="astroagent")
         location = geolocator.geocode(city_name)
         if location:
             return location.latitude, location.longitude
-        else:
-            print(f"Could not find city '{city_name}', using demo coordinates.")
-            return 0.0, 0.0
     except Exception as e:
-        print(f"Error fetching coordinates for '{city_name}': {e}. Using demo values.")
+        print(f"Error fetching coordinates for '{city_name}': {e}.")
+    return None
+
+
+def get_lat_lon(city_name: str):
+    """
+    Resolve a city name to (latitude, longitude) from the bundled offline
+    gazetteer. Nominatim is only consulted for unknown cities when
+    config.GEOCODE_ALLOW_NETWORK is enabled and geopy is installed.
+    """
+    if not city_name or not city_name.strip():
         return 0.0, 0.0
+
+    city = resolve_city(city_name.strip())
+    if city is not None:
+        metrics.incr("geocode_calls_total", source="gazetteer")
+        return city.latitude, city.longitude
+
+    if GEOCODE_ALLOW_NETWORK and optional_module("geopy.geocoders") is not None:
+        with metrics.stage("geocode_network"):
+            coords = _network_lat_lon(city_name)
+        if coords is not None:
+            metrics.incr("geocode_calls_total", source="network")
+            return coords
+
+    metrics.incr("geocode_calls_total", source="unresolved")
+    print(f"Could not find city '{city_name}', using demo coordinates.")
+    return 0.0, 0.0
@@ -5,9 +5,9 @@ def mod360(degrees):
     return degrees % 360
 
 def distance_in_degrees(pos1, pos2):
-    """Return angular distance between two positions in degrees"""
-    diff = abs(pos1 - pos2)
-    return diff if diff <= 180 else 360 - diff
+    """Return angular distance between two positions in degrees (scalars or NumPy arrays)"""
+    diff = abs(pos1 - pos2) % 360
+    return 180 - abs(180 - diff)
 
 def is_within_orb(pos1, pos2, orb):
     """Check if two positions are within orb degrees"""
@@ -0,0 +1,299 @@
+# AstroAgent/utils/metrics.py
+"""
+Low-overhead instrumentation: counters, stage timers and a sampling profiler.
+
+Disabled by default (config.METRICS_ENABLED). While disabled every hook is a
+global flag test: incr() returns at once and stage() hands back a shared
+no-op context manager, so instrumented code pays well under a microsecond
+per call.
+
+    from utils import metrics
+    metrics.enable()
+    with metrics.stage("houses"):
+        ...
+    metrics.incr("geocode_calls_total", source="gazetteer")
+    metrics.snapshot()          # JSON-ready dict
+    metrics.prometheus_text()   # Prometheus exposition format
+
+Worker processes keep their own registry; drain() returns and resets it and
+merge() folds such a delta into the parent, which is how bulk_analysis.py
+and api_server.py aggregate metrics across their pools. start_profiler()
+adds sampled stacks to the same deltas.
+"""
+
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from config import METRICS_ENABLED
+
+PREFIX = "astro_"
+# Stage latency histogram bounds in seconds
+BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_counters = {}   # (name, labels) -> value
+_timers = {}     # (stage, labels) -> [count, sum, bucket counts...]
+_profile = Counter()  # collapsed stack -> samples merged from drain() results
+_profiler = None
+_NULL = nullcontext()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def incr(name, amount=1, **labels):
+    """Add amount to a counter, e.g. incr("rule_evaluations_total", 12, analyzer="houses")."""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(stage_name, seconds, **labels):
+    """Record one duration for a stage."""
+    if not _enabled:
+        return
+    key = (stage_name, tuple(sorted(labels.items())))
+    slot = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        timer = _timers.get(key)
+        if timer is None:
+            timer = _timers[key] = [0, 0.0] + [0] * (len(BUCKETS) + 1)
+        timer[0] += 1
+        timer[1] += seconds
+        timer[2 + slot] += 1
+
+
+@contextmanager
+def _timed(stage_name, labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - start, **labels)
+
+
+def stage(stage_name, **labels):
+    """Context manager timing a block as one observation of stage_name."""
+    if not _enabled:
+        return _NULL
+    return _timed(stage_name, labels)
+
+
+def timed(stage_name):
+    """Decorator form of stage()."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _timed(stage_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---- export ----
+
+def drain():
+    """Return this process's raw counters, timers and profile samples and reset them."""
+    with _lock:
+        delta = {"counters": dict(_counters), "timers": {k: list(v) for k, v in _timers.items()},
+                 "profile": dict(_profile)}
+        _counters.clear()
+        _timers.clear()
+        _profile.clear()
+    if _profiler is not None:
+        samples, _profiler.samples = _profiler.samples, Counter()
+        for stack, count in samples.items():
+            delta["profile"][stack] = delta["profile"].get(stack, 0) + count
+    return delta
+
+
+def merge(delta):
+    """Fold a drain() result (e.g. from a worker process) into this registry."""
+    if not delta:
+        return
+    with _lock:
+        for key, value in delta["counters"].items():
+            _counters[key] = _counters.get(key, 0) + value
+        for key, values in delta["timers"].items():
+            timer = _timers.get(key)
+            if timer is None:
+                _timers[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    timer[i] += value
+        _profile.update(delta.get("profile", {}))
+
+
+def reset():
+    """Discard everything recorded so far."""
+    drain()
+
+
+def _label_text(labels):
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+
+def snapshot():
+    """
+    JSON-ready view: counters, per-stage count / total / mean seconds, and
+    hit ratios for counters labelled result="hit"/"miss" (and "disk_hit").
+    """
+    with _lock:
+        counters = dict(_counters)
+        timers = {k: list(v) for k, v in _timers.items()}
+
+    result = {"counters": {}, "stages": {}, "ratios": {}}
+    for (name, labels), value in sorted(counters.items()):
+        result["counters"][name + (f"{{{_label_text(labels)}}}" if labels else "")] = value
+    for (name, labels), timer in sorted(timers.items()):
+        count, total = timer[0], timer[1]
+        result["stages"][name + (f"{{{_label_text(labels)}}}" if labels else "")] = {
+            "count": count, "total_s": total, "mean_us": total / count * 1e6 if count else 0.0,
+        }
+
+    outcomes = {}
+    for (name, labels), value in counters.items():
+        result_label = dict(labels).get("result")
+        if result_label is not None:
+            outcomes.setdefault(name, Counter())[result_label] += value
+    for name, counts in outcomes.items():
+        total = sum(counts.values())
+        hits = counts["hit"] + counts["disk_hit"]
+        result["ratios"][name.replace("_total", "") + "_hit_ratio"] = hits / total if total else 0.0
+    return result
+
+
+def prometheus_text():
+    """Counters and stage histograms in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        timers = {k: list(v) for k, v in _timers.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{name}{{{_label_text(labels)}}} {value}" if labels
+                             else f"{PREFIX}{name} {value}")
+    if timers:
+        metric = f"{PREFIX}stage_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), timer in sorted(timers.items()):
+            base = _label_text((("stage", name),) + labels)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), timer[2:]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{{base},le="{le}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{base}}} {timer[1]}")
+            lines.append(f"{metric}_count{{{base}}} {timer[0]}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- sampling profiler ----
+
+class SamplingProfiler:
+    """
+    Opt-in statistical profiler: a background thread samples the stacks of
+    the profiled thread every interval seconds. Results are collapsed stacks
+    ("outer;inner;leaf count"), ready for flamegraph tools.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top(self, limit=20):
+        """Functions by self samples (leaf frame), most frequent first."""
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def start_profiler(interval=0.005):
+    """Sample the calling thread until stop_profiler(); samples are included in drain()."""
+    global _profiler
+    stop_profiler()
+    _profiler = SamplingProfiler(interval).start()
+
+
+def stop_profiler():
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        with _lock:
+            _profile.update(_profiler.samples)
+        _profiler = None
+
+
+def collapsed_stacks():
+    """Every profile sample recorded or merged so far, as collapsed stacks."""
+    with _lock:
+        samples = Counter(_profile)
+    if _profiler is not None:
+        samples.update(_profiler.samples)
+    return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
+
+
+@contextmanager
+def profile(interval=0.005):
+    """Sample the calling thread for the duration of the block; yields the profiler."""
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
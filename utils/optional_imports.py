@@ -0,0 +1,24 @@
+# AstroAgent/utils/optional_imports.py
+"""
+Deferred imports of optional heavy dependencies (swisseph, geopy, flatlib).
+
+Modules that only need a dependency on some code paths call
+optional_module() there instead of importing at the top, so importing the
+engine stays cheap and prints nothing:
+
+    swe = optional_module("swisseph")
+    if swe is None:
+        ...fallback...
+"""
+
+import importlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def optional_module(name):
+    """The module imported on first call, or None when it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None